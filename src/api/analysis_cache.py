@@ -0,0 +1,161 @@
+"""
+Content-hash cache for vision analyses.
+
+Re-uploading the same photo (after a failed publish, a browser refresh, …)
+returns the stored analysis instead of paying for another vision call.
+Entries live in the ``analysis_cache`` SQLite table next to ``listings``;
+this module adds the key derivation, process-wide hit/miss counters and an
+in-memory BK-tree over the stored perceptual hashes, so a re-shot or
+re-saved photo of the same card can reuse the earlier analysis too.
+
+Perceptual hashes are indexed per ``scope`` (a model + prompt digest), so a
+near-duplicate hit never crosses a model or prompt change either.  Near
+hits come back tagged with ``_cache: "near"`` and ``_cache_distance``.
+"""
+import hashlib
+import logging
+import threading
+
+from src import database
+from src.utils.image_hash import BKTree
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'near_hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0}
+
+# Perceptual-hash index per scope, built lazily from the table and kept in step by store()
+_index_lock = threading.Lock()
+_index: dict[str, BKTree] = {}
+_index_source = None
+
+
+def cache_key(img_bytes: bytes, model: str, prompt: str) -> str:
+    """
+    SHA-256 of the image bytes, salted with the model and prompt so a model
+    or prompt change never serves analyses produced under the old one.
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(b'\0')
+    digest.update(hashlib.sha256(prompt.encode()).digest())
+    digest.update(b'\0')
+    digest.update(img_bytes)
+    return digest.hexdigest()
+
+
+def scope(model: str, prompt: str) -> str:
+    """Digest of the model and prompt that near-duplicate lookups are confined to."""
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(b'\0')
+    digest.update(hashlib.sha256(prompt.encode()).digest())
+    return digest.hexdigest()[:32]
+
+
+def lookup(
+    key: str,
+    ttl_seconds: float,
+    phash: int | None = None,
+    max_distance: int = -1,
+    scope: str | None = None,
+) -> dict | None:
+    """
+    Return the cached analysis for ``key``, or else — given a ``scope`` —
+    for the nearest image stored under the same scope whose perceptual hash
+    is within ``max_distance`` bits of ``phash``.  A near hit is tagged with
+    ``_cache: "near"`` and its ``_cache_distance``.
+
+    Counts one hit, near hit or miss per call.
+    """
+    analysis = database.get_cached_analysis(key, ttl_seconds)
+    if analysis is not None:
+        _count('hits')
+        logger.info("Analysis cache hit (%s…)", key[:12])
+        return analysis
+
+    if phash is not None and max_distance >= 0 and scope is not None:
+        for distance, similar_key in _phash_index(scope).search(phash, max_distance):
+            # Evicted or expired rows linger in the index; they just miss here
+            analysis = database.get_cached_analysis(similar_key, ttl_seconds)
+            if analysis is not None:
+                _count('near_hits')
+                logger.info(
+                    "Analysis cache near-duplicate hit (%s…, distance %d)", similar_key[:12], distance
+                )
+                return {**analysis, '_cache': 'near', '_cache_distance': distance}
+
+    _count('misses')
+    return None
+
+
+def store(
+    key: str, analysis: dict, max_entries: int, phash: int | None = None, scope: str | None = None
+) -> None:
+    """Store ``analysis``; its ``phash`` is indexed for near-duplicate lookups within ``scope``."""
+    if phash is None or scope is None:
+        phash = scope = None
+    hex_hash = format(phash, '016x') if phash is not None else None
+    if not database.put_cached_analysis(key, analysis, max_entries, phash=hex_hash, scope=scope):
+        return
+    _count('stores')
+    if phash is not None:
+        with _index_lock:
+            tree = _index.get(scope) if _index_source == database.DATABASE_PATH else None
+            if tree is not None:
+                tree.add(phash, key)
+                # Rebuild once stale (evicted) keys dominate the tree
+                if len(tree) > 2 * max(1, max_entries):
+                    del _index[scope]
+
+
+def clear() -> int:
+    """Delete every cached analysis; returns the number removed."""
+    removed = database.clear_analysis_cache()
+    _invalidate_index()
+    return removed
+
+
+def record_bypass() -> None:
+    _count('bypassed')
+
+
+def stats() -> dict:
+    """Counters since process start plus the current number of entries."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    served = snapshot['hits'] + snapshot['near_hits']
+    lookups = served + snapshot['misses']
+    snapshot['hit_rate'] = round(served / lookups, 4) if lookups else 0.0
+    snapshot['entries'] = database.get_analysis_cache_size()
+    return snapshot
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _phash_index(scope: str) -> BKTree:
+    global _index_source
+    with _index_lock:
+        if _index_source != database.DATABASE_PATH:
+            _index.clear()
+            _index_source = database.DATABASE_PATH
+        tree = _index.get(scope)
+        if tree is None:
+            tree = _index[scope] = BKTree()
+            for key, hex_hash in database.get_analysis_phashes(scope):
+                tree.add(int(hex_hash, 16), key)
+        return tree
+
+
+def _invalidate_index() -> None:
+    with _index_lock:
+        _index.clear()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
@@ -0,0 +1,107 @@
+"""
+Structured-output contract for vision analyses.
+
+``RESPONSE_FORMAT`` asks the chat-completions API for strict JSON-schema
+output: a ``cards`` array of items carrying exactly the fields
+``AnalysisValidator`` checks (optional card details are nullable, since
+strict mode requires every property).  Every reply — one item or a lot —
+therefore arrives in the ``{"cards": [...]}`` shape the stream parser
+already splits.
+
+``parse_analysis`` turns reply text back into the shape the rest of the app
+uses: a single item dict for one item, ``{"cards": [...]}`` for several,
+with null fields dropped, and validated before it is trusted.  ``validate``
+does the same for an analysis already decoded from a larger reply.
+"""
+import json
+
+from src.validators import AnalysisValidator
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "brand": {"type": "string"},
+        "model": {"type": "string"},
+        "category": {"type": "string"},
+        "condition": {"type": "string"},
+        "features": _STRING_LIST,
+        "estimated_value_range": {"type": "string"},
+        "grading_notes": _STRING_LIST,
+        "player_name": _NULLABLE_STRING,
+        "set_name": _NULLABLE_STRING,
+        "year": _NULLABLE_STRING,
+        "card_number": _NULLABLE_STRING,
+        "grade": _NULLABLE_STRING,
+    },
+    "additionalProperties": False,
+}
+ITEM_SCHEMA["required"] = list(ITEM_SCHEMA["properties"])
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {"cards": {"type": "array", "items": ITEM_SCHEMA}},
+    "required": ["cards"],
+    "additionalProperties": False,
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "listing_analysis", "strict": True, "schema": ANALYSIS_SCHEMA},
+}
+
+
+def parse_analysis(content: str) -> tuple[dict | None, str]:
+    """
+    Parse and validate a reply.
+
+    Returns ``(analysis, "")`` on success or ``(None, error)`` describing what
+    is wrong, so a repair request can be targeted at it.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        # Free-text reply (structured output off or ignored): try the embedded object
+        data = _embedded_object(content)
+        if data is None:
+            return None, "Reply is not valid JSON"
+    return validate(data)
+
+
+def validate(data) -> tuple[dict | None, str]:
+    """Normalise and validate an already-decoded analysis; same result shape as ``parse_analysis``."""
+    if not isinstance(data, dict):
+        return None, "Reply must be a JSON object"
+    analysis = normalize(data)
+    ok, error = AnalysisValidator.validate_analysis(analysis)
+    return (analysis, "") if ok else (None, error)
+
+
+def normalize(data: dict) -> dict:
+    """Drop null fields; unwrap a one-item ``cards`` array to the item itself."""
+    cards = data.get("cards")
+    if not isinstance(cards, list):
+        return clean(data)
+    cards = [clean(card) if isinstance(card, dict) else card for card in cards]
+    if len(cards) == 1 and isinstance(cards[0], dict):
+        return cards[0]
+    return {**data, "cards": cards}
+
+
+def clean(item: dict) -> dict:
+    """Copy of ``item`` without null-valued fields."""
+    return {key: value for key, value in item.items() if value is not None}
+
+
+def _embedded_object(content) -> dict | None:
+    if not isinstance(content, str):
+        return None
+    start, end = content.find("{"), content.rfind("}") + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(content[start:end])
+    except ValueError:
+        return None
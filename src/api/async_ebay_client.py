@@ -0,0 +1,206 @@
+"""
+Async eBay API client
+asyncio-native variants of get_ebay_token, search_ebay and publish_listing
+built on httpx.  Request building, parsing, the token cache, the rate
+limiters and the resilience layer are shared with ebay_client so both
+clients behave identically.
+"""
+import asyncio
+import logging
+import weakref
+
+import httpx
+
+from src.api import comps_index, ebay_search, resilience, search_cache
+from src.api.single_flight import SingleFlight
+from src.api.async_http import client_scope
+import src.api.ebay_client as ebay_client
+from src.api.mock_ebay import search_ebay_mock
+
+logger = logging.getLogger(__name__)
+
+# One refresh lock per event loop so concurrent callers share a single
+# OAuth round-trip (asyncio locks cannot be shared between loops).
+_token_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Identical searches awaited at the same time on one loop share one request
+_search_flight = SingleFlight("ebay.search_async")
+
+
+def _token_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _token_locks.get(loop)
+    if lock is None:
+        lock = _token_locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def _send(http: httpx.AsyncClient, method: str, url: str, limiter, max_attempts: int = 3, **kwargs):
+    """Async counterpart of ``ebay_client._send`` (same limiter, back-off, budget and breaker)."""
+    async def attempt():
+        await limiter.acquire_async()
+        response = await http.request(method.upper(), url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    return await resilience.call_async(attempt, resilience.host_of(url), max_attempts=max_attempts)
+
+
+def _use_mock() -> bool:
+    return (
+        ebay_client.USE_EBAY_MOCK
+        or not ebay_client.EBAY_CLIENT_ID
+        or not ebay_client.EBAY_CLIENT_SECRET
+    )
+
+
+async def get_ebay_token(client: httpx.AsyncClient | None = None) -> str:
+    """Async counterpart of ``ebay_client.get_ebay_token`` (shares its memory and persisted cache)."""
+    cached = ebay_client._fresh_cached_token()
+    if cached:
+        return cached
+
+    async with _token_lock():
+        cached = ebay_client._fresh_cached_token() or await asyncio.to_thread(_adopt_stored_token)
+        if cached:
+            return cached
+
+        headers, data = ebay_client._token_request()
+        async with client_scope(client) as http:
+            response = await _send(
+                http, "post", ebay_client.EBAY_OAUTH_ENDPOINT, ebay_client._oauth_limiter,
+                headers=headers, data=data, timeout=15,
+            )
+        return await asyncio.to_thread(_cache_token, response.json())
+
+
+def _adopt_stored_token() -> str | None:
+    with ebay_client._token_lock:
+        return ebay_client._adopt_stored_token()
+
+
+def _cache_token(token_data: dict) -> str:
+    with ebay_client._token_lock:
+        return ebay_client._cache_token(token_data)
+
+
+async def search_ebay(query: str, limit: int = 5, client: httpx.AsyncClient | None = None) -> list:
+    """
+    Async counterpart of ``ebay_client.search_ebay``.
+
+    Waits for a rate-limiter token with ``asyncio.sleep`` so other coroutines
+    keep running, shares the search cache, joins identical in-flight searches,
+    and falls back to mock data on the same conditions — a failed real
+    search returns ``[]``.
+    """
+    if _use_mock():
+        logger.info("Using MOCK eBay search (not consuming API calls)")
+        return search_ebay_mock(query, limit)
+
+    backend = ebay_search.get_backend()
+    key = ebay_client._search_cache_key(query, limit, backend)
+    cached = await asyncio.to_thread(search_cache.lookup, key)
+    if cached is not None:
+        return cached
+    local = await asyncio.to_thread(
+        comps_index.lookup, query, backend.max_results(limit), ebay_client._search_scope(backend)
+    )
+    if local is not None:
+        return local
+
+    async def fetch():
+        async with client_scope(client) as http:
+            results = await _run_search(http, backend, query, limit)
+        await asyncio.to_thread(search_cache.store, key, results)
+        await asyncio.to_thread(comps_index.record, results, ebay_client._search_scope(backend))
+        return results
+
+    try:
+        return ebay_client._copy_results(await _search_flight.do_async(key, fetch))
+    except Exception as e:
+        logger.warning("eBay API error: %s — returning no comparables", e)
+        return []
+
+
+async def _run_search(http: httpx.AsyncClient, backend, query: str, limit: int) -> list:
+    """Async counterpart of ``ebay_client._run_search`` (further pages gathered concurrently)."""
+    token = await get_ebay_token(http) if backend.needs_token else None
+    limiter = ebay_client._search_limiter(backend)
+    request = backend.first_request(query, limit, token)
+    first_page = (await _send(http, "get", request.url, limiter, **ebay_client._page_kwargs(request))).json()
+    pages = [backend.parse(first_page)]
+
+    more = backend.next_requests(query, limit, first_page, token)
+    if more:
+        slots = asyncio.Semaphore(max(1, ebay_client.EBAY_SEARCH_CONCURRENCY))
+        pages.extend(await asyncio.gather(*(_fetch_page(http, backend, r, limiter, slots) for r in more)))
+    return backend.collect(pages, limit)
+
+
+async def _fetch_page(http, backend, request, limiter, slots: asyncio.Semaphore) -> list:
+    async with slots:
+        try:
+            response = await _send(http, "get", request.url, limiter, **ebay_client._page_kwargs(request))
+            return backend.parse(response.json())
+        except Exception as exc:
+            logger.warning("eBay %s search page failed: %s — skipping it", backend.name, exc)
+            return []
+
+
+async def publish_listing(payload: dict, client: httpx.AsyncClient | None = None) -> dict:
+    """Async counterpart of ``ebay_client.publish_listing`` (inventory → offer → publish)."""
+    if _use_mock():
+        return ebay_client._mock_publish_result(payload)
+
+    async with client_scope(client) as http:
+        token = await get_ebay_token(http)
+        sku = payload["sku"]
+        base = f"{ebay_client.EBAY_API_ENDPOINT}/sell/inventory/v1"
+
+        # Step 1: Upsert inventory item
+        await _send(
+            http,
+            "put",
+            f"{base}/inventory_item/{sku}",
+            ebay_client._inventory_limiter,
+            headers=ebay_client._inventory_headers(token),
+            json=ebay_client._inventory_item_body(payload),
+            timeout=15,
+        )
+        logger.info("Upserted eBay inventory item for SKU %s", sku)
+
+        # Step 2: Create offer
+        price_value, price_currency = ebay_client._offer_price(payload)
+        response = await _send(
+            http,
+            "post",
+            f"{base}/offer",
+            ebay_client._inventory_limiter,
+            max_attempts=1,
+            headers=ebay_client._inventory_headers(token),
+            json=ebay_client._offer_body(sku, price_value, price_currency),
+            timeout=15,
+        )
+        offer_id = ebay_client._offer_id_from(response.json())
+        logger.info("Created eBay offer %s for SKU %s", offer_id, sku)
+
+        # Step 3: Publish offer → get live listing ID
+        response = await _send(
+            http,
+            "post",
+            f"{base}/offer/{offer_id}/publish",
+            ebay_client._inventory_limiter,
+            max_attempts=1,
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            timeout=15,
+        )
+        listing_id = ebay_client._listing_id_from(response.json())
+        logger.info("Published eBay offer %s → listing %s", offer_id, listing_id)
+
+    return {
+        "status": "published",
+        "external_listing_id": listing_id,
+        "mode": "real",
+    }
@@ -0,0 +1,16 @@
+"""
+Shared httpx helpers for the async API clients.
+"""
+import contextlib
+
+import httpx
+
+
+@contextlib.asynccontextmanager
+async def client_scope(client: httpx.AsyncClient | None):
+    """Yield the caller's client, or a short-lived one closed on exit."""
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient() as owned:
+        yield owned
@@ -0,0 +1,84 @@
+"""
+Async OpenAI API client
+asyncio-native variant of openai_client.describe_image built on httpx
+"""
+import asyncio
+import logging
+
+import httpx
+
+from src.api import resilience, vision_metrics
+from src.api.async_http import client_scope
+import src.api.openai_client as openai_client
+from src.api.mock_openai import describe_image_mock
+
+logger = logging.getLogger(__name__)
+
+
+async def describe_image(
+    image_path: str, client: httpx.AsyncClient | None = None, use_cache: bool = True
+) -> dict:
+    """
+    Async counterpart of ``openai_client.describe_image``.
+
+    Same request, cache, resilience and fallback behaviour, but the HTTP call
+    and the retry back-off never block the event loop.  Pass a shared
+    ``client`` to reuse its connection pool across many calls.
+    """
+    if openai_client.USE_OPENAI_MOCK or not openai_client.OPENAI_API_KEY:
+        logger.info("Using MOCK OpenAI (not consuming API calls)")
+        return describe_image_mock(image_path)
+
+    try:
+        img_bytes = await asyncio.to_thread(_read_bytes, image_path)
+    except FileNotFoundError:
+        logger.warning("Image not found: %s — falling back to mock data", image_path)
+        return describe_image_mock(image_path)
+
+    key = openai_client._cache_key(img_bytes)
+    phash = await asyncio.to_thread(openai_client._perceptual_hash, img_bytes)
+    cached = await asyncio.to_thread(openai_client._cached_analysis, key, phash, use_cache)
+    if cached is not None:
+        return cached
+
+    prepared = await asyncio.to_thread(openai_client._prepare_upload, img_bytes, image_path)
+    payload = openai_client._build_payload(*prepared)
+    call = vision_metrics.VisionCall(
+        "vision", openai_client.OPENAI_MODEL, image_bytes=len(prepared[0]),
+        cache=openai_client._cache_status(use_cache),
+    )
+
+    async with client_scope(client) as http:
+        async def send():
+            call.attempts += 1
+            response = await http.post(
+                openai_client._OPENAI_URL,
+                headers=openai_client._headers(),
+                json=payload,
+                timeout=openai_client._OPENAI_TIMEOUT,
+            )
+            response.raise_for_status()
+            return response
+
+        try:
+            response = await resilience.call_async(
+                send, openai_client._OPENAI_HOST, max_attempts=openai_client._MAX_RETRIES
+            )
+        except Exception as exc:
+            await asyncio.to_thread(call.finish, error=exc)
+            logger.warning("OpenAI API error: %s — falling back to mock data", exc)
+            return describe_image_mock(image_path)
+
+    data = response.json()
+    await asyncio.to_thread(call.finish, usage=data.get("usage"))
+    content = data["choices"][0]["message"]["content"]
+    analysis = await asyncio.to_thread(openai_client._analysis_from_reply, content)
+    if analysis is None:
+        return openai_client._parse_content(content)
+    await asyncio.to_thread(openai_client._store_analysis, key, analysis, phash)
+    return analysis
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,125 @@
+"""
+Local index of every comparable listing eBay has returned.
+
+Each real search result is upserted into the ``comps`` SQLite table
+(keyed by eBay item id, else URL, with the time it was last fetched) and
+its title into an FTS5 index.  Comps are scoped like ``search_cache`` keys
+— by search backend, and kept apart for the sandbox — so only comps the
+same backend fetched from the same environment answer a search.
+
+A new search is answered from the index when enough comps fetched within
+``COMPS_INDEX_MAX_AGE_SECONDS`` match every word of it: at least
+``COMPS_INDEX_MIN_MATCHES`` and ``COMPS_INDEX_MIN_COVERAGE`` of the results
+the search asks for, so a wide Browse search is not cut short by a few
+local matches.  Only thin coverage goes to the API.  Matching requires every query word, as eBay's
+keyword search does, so a local answer is the subset of the API's answer
+we have already seen.
+
+Unlike ``search_cache`` — exact repeats of one query for a short time —
+the index answers queries never sent before, from comps collected by
+other searches, so it saves more quota as history grows.  Rows not seen
+again within ``COMPS_INDEX_RETENTION_DAYS`` are dropped.
+
+Settings come from ``src.config`` at call time.
+"""
+import logging
+import math
+import re
+import threading
+import time
+
+import src.config as config
+from src import database
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'recorded': 0}
+
+
+def lookup(query: str, limit: int, source: str) -> list | None:
+    """
+    Up to ``limit`` fresh comps from ``source`` matching every word of
+    ``query``, best match first, or ``None`` when too few exist (see the
+    module docstring).  Counts one hit or miss.
+    """
+    if not config.COMPS_INDEX_ENABLED:
+        return None
+    match = _match_expression(query)
+    if not match:
+        return None
+
+    limit = max(int(limit), 1)
+    needed = max(1, config.COMPS_INDEX_MIN_MATCHES, math.ceil(limit * config.COMPS_INDEX_MIN_COVERAGE))
+    since = time.time() - config.COMPS_INDEX_MAX_AGE_SECONDS
+    rows = database.search_comps(match, since, max(limit, needed), source)
+    if len(rows) < needed:
+        _count('misses')
+        return None
+
+    _count('hits')
+    logger.debug("Answered %r from %d indexed comps", query, len(rows))
+    return [_as_result(row) for row in rows[:limit]]
+
+
+def record(results: list, source: str) -> int:
+    """Upsert real search results fetched by ``source`` into the index; returns the number written."""
+    if not config.COMPS_INDEX_ENABLED or not results:
+        return 0
+    comps = []
+    for item in results:
+        key = item.get('item_id') or item.get('url')
+        if not key or item.get('price') is None or not item.get('title'):
+            continue
+        comps.append({**item, 'comp_key': key, 'sold': None if 'sold' not in item else int(item['sold'])})
+    written = database.upsert_comps(
+        comps, source, retention_seconds=config.COMPS_INDEX_RETENTION_DAYS * 86400
+    )
+    _count('recorded', written)
+    return written
+
+
+def clear() -> int:
+    """Drop every indexed comp; returns the number removed."""
+    return database.clear_comps()
+
+
+def stats() -> dict:
+    """Lookup counters since process start, hit rate and the number of indexed comps."""
+    with _lock:
+        snapshot = dict(_stats)
+    lookups = snapshot['hits'] + snapshot['misses']
+    snapshot['hit_rate'] = round(snapshot['hits'] / lookups, 4) if lookups else 0.0
+    snapshot['entries'] = database.count_comps()
+    return snapshot
+
+
+def reset() -> None:
+    """Zero the counters (indexed rows are kept)."""
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _match_expression(query: str) -> str:
+    """FTS5 query requiring every word of ``query`` (each quoted, so no operators)."""
+    words = dict.fromkeys(_WORD_RE.findall(str(query).casefold()))
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def _as_result(row: dict) -> dict:
+    """Indexed row → the result shape of the backend that fetched it."""
+    result = {'title': row['title'], 'price': row['price'], 'url': row['url'] or ''}
+    for column in ('currency', 'item_id', 'condition', 'shipping'):
+        if row[column] is not None:
+            result[column] = row[column]
+    if row['sold'] is not None:
+        result['sold'] = bool(row['sold'])
+    return result
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
@@ -1,16 +1,17 @@
 """
 eBay API client
-Handles eBay Finding and Sell APIs
+Handles eBay search (Finding or Browse, see ebay_search) and Sell APIs
 Falls back to mock data if credentials not available
 """
 import base64
 import json
 import logging
+import random
 import time
 import threading
 import uuid
-import requests
-from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import pricing
 from src.utils.helpers import clean_title
 from src.config import (
     EBAY_CLIENT_ID,
@@ -27,11 +28,47 @@ from src.config import (
     EBAY_DEFAULT_CATEGORY_ID,
     EBAY_DEFAULT_CURRENCY,
     EBAY_DEFAULT_QUANTITY,
+    EBAY_FINDING_RATE,
+    EBAY_FINDING_BURST,
+    EBAY_FINDING_DAILY_QUOTA,
+    EBAY_INVENTORY_RATE,
+    EBAY_INVENTORY_BURST,
+    EBAY_OAUTH_RATE,
+    EBAY_OAUTH_BURST,
+    EBAY_BROWSE_RATE,
+    EBAY_BROWSE_BURST,
+    EBAY_BROWSE_DAILY_QUOTA,
+    EBAY_SEARCH_CONCURRENCY,
+    EBAY_TOKEN_PERSIST,
+    EBAY_TOKEN_REFRESH_ENABLED,
+    EBAY_TOKEN_REFRESH_MARGIN_SECONDS,
 )
+from src.api import comps_index, ebay_search, http_session, rate_limit, resilience, search_cache, token_store
+from src.api.single_flight import SingleFlight
 from src.api.mock_ebay import search_ebay_mock
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Transport
+# ---------------------------------------------------------------------------
+
+def _send(method: str, url: str, limiter, max_attempts: int = 3, **kwargs):
+    """
+    Send one eBay request through the pooled session with jittered back-off,
+    the host's retry budget and circuit breaker; raises on a bad status.
+
+    Every attempt, retries included, first takes a token from ``limiter``.
+    """
+    def attempt():
+        limiter.acquire()
+        response = getattr(http_session, method)(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    return resilience.call(attempt, resilience.host_of(url), max_attempts=max_attempts)
+
+
 # ---------------------------------------------------------------------------
 # OAuth token cache
 # ---------------------------------------------------------------------------
@@ -40,68 +77,157 @@ _token_lock = threading.Lock()
 _cached_token: str | None = None
 _token_expires_at: float = 0.0          # Unix timestamp
 _TOKEN_EXPIRY_BUFFER = 60               # seconds before actual expiry to refresh
+_TOKEN_STORE_KEY = "EBAY_OAUTH_TOKEN"   # settings-store entry shared by every local process
+_REFRESHER_THREAD_NAME = "ebay-token-refresher"
 
 
 def get_ebay_token() -> str:
     """
     Obtain OAuth token from eBay (client credentials flow).
-    Caches the token and reuses it until it is close to expiry.
+
+    Reuses the in-memory token, else one persisted by an earlier process
+    (or by the background refresher of another worker), until it is close
+    to expiry; only then is a new token requested.
     """
-    global _cached_token, _token_expires_at
+    cached = _fresh_cached_token()
+    if cached:
+        logger.debug("Reusing cached eBay OAuth token")
+        return cached
 
     with _token_lock:
-        if _cached_token and time.time() < _token_expires_at - _TOKEN_EXPIRY_BUFFER:
-            logger.debug("Reusing cached eBay OAuth token")
-            return _cached_token
-
-        if not EBAY_CLIENT_ID or not EBAY_CLIENT_SECRET:
-            raise ValueError("eBay credentials not set")
-
-        auth_str = f"{EBAY_CLIENT_ID}:{EBAY_CLIENT_SECRET}"
-        auth_b64 = base64.b64encode(auth_str.encode()).decode()
-
-        headers = {
-            "Authorization": f"Basic {auth_b64}",
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-        data = {
-            "grant_type": "client_credentials",
-            "scope": "https://api.ebay.com/oauth/api_scope",
-        }
-
-        response = requests.post(EBAY_OAUTH_ENDPOINT, headers=headers, data=data, timeout=15)
-        response.raise_for_status()
+        cached = _fresh_cached_token() or _adopt_stored_token()
+        if cached:
+            return cached
+        return _request_token()
+
 
-        token_data = response.json()
-        _cached_token = token_data["access_token"]
-        expires_in = int(token_data.get("expires_in", 7200))
-        _token_expires_at = time.time() + expires_in
-        logger.info("Fetched new eBay OAuth token (expires in %ds)", expires_in)
+def _fresh_cached_token(margin: float = _TOKEN_EXPIRY_BUFFER) -> str | None:
+    """Return the cached token if it is not within ``margin`` seconds of expiry."""
+    if _cached_token and time.time() < _token_expires_at - margin:
         return _cached_token
+    return None
 
 
-# ---------------------------------------------------------------------------
-# Simple in-process rate limiter
-# ---------------------------------------------------------------------------
+def _request_token() -> str:
+    """Fetch a new token from eBay; call with ``_token_lock`` held."""
+    headers, data = _token_request()
+    response = _send("post", EBAY_OAUTH_ENDPOINT, _oauth_limiter, headers=headers, data=data, timeout=15)
+    return _cache_token(response.json())
 
-class _RateLimiter:
-    """Token-bucket rate limiter (calls per second)."""
 
-    def __init__(self, calls_per_second: float = 5.0):
-        self._min_interval = 1.0 / calls_per_second
-        self._last_call: float = 0.0
-        self._lock = threading.Lock()
+def _token_request() -> tuple[dict, dict]:
+    """Build (headers, form data) for the client-credentials token call."""
+    if not EBAY_CLIENT_ID or not EBAY_CLIENT_SECRET:
+        raise ValueError("eBay credentials not set")
 
-    def wait(self) -> None:
-        with self._lock:
-            now = time.time()
-            elapsed = now - self._last_call
-            if elapsed < self._min_interval:
-                time.sleep(self._min_interval - elapsed)
-            self._last_call = time.time()
+    auth_str = f"{EBAY_CLIENT_ID}:{EBAY_CLIENT_SECRET}"
+    auth_b64 = base64.b64encode(auth_str.encode()).decode()
+
+    headers = {
+        "Authorization": f"Basic {auth_b64}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    data = {
+        "grant_type": "client_credentials",
+        "scope": "https://api.ebay.com/oauth/api_scope",
+    }
+    return headers, data
+
+
+def _cache_token(token_data: dict) -> str:
+    """Store a freshly issued token and its expiry (in memory and persisted); return the token."""
+    global _cached_token, _token_expires_at
+
+    _cached_token = token_data["access_token"]
+    expires_in = int(token_data.get("expires_in", 7200))
+    _token_expires_at = time.time() + expires_in
+    logger.info("Fetched new eBay OAuth token (expires in %ds)", expires_in)
+    if EBAY_TOKEN_PERSIST:
+        token_store.save(_TOKEN_STORE_KEY, EBAY_CLIENT_SECRET, _token_scope(), _cached_token, _token_expires_at)
+    return _cached_token
 
 
-_ebay_rate_limiter = _RateLimiter(calls_per_second=5.0)
+def _adopt_stored_token(margin: float = _TOKEN_EXPIRY_BUFFER) -> str | None:
+    """Load the persisted token into memory if it has more than ``margin`` seconds left."""
+    global _cached_token, _token_expires_at
+
+    if not EBAY_TOKEN_PERSIST:
+        return None
+    stored = token_store.load(_TOKEN_STORE_KEY, EBAY_CLIENT_SECRET, _token_scope())
+    if stored is None or time.time() >= stored[1] - margin:
+        return None
+    _cached_token, _token_expires_at = stored
+    logger.debug("Using persisted eBay OAuth token")
+    return _cached_token
+
+
+def _token_scope() -> str:
+    """Which client and environment a persisted token belongs to."""
+    return f"{EBAY_CLIENT_ID}|{EBAY_OAUTH_ENDPOINT}"
+
+
+def start_token_refresher() -> threading.Thread | None:
+    """
+    Start the background thread that renews the OAuth token
+    ``EBAY_TOKEN_REFRESH_MARGIN_SECONDS`` before it expires, so request
+    threads always find a fresh token.  Idempotent across module reloads;
+    returns the running thread, or None when disabled.
+    """
+    if not EBAY_TOKEN_REFRESH_ENABLED:
+        return None
+    for thread in threading.enumerate():
+        if thread.name == _REFRESHER_THREAD_NAME and thread.is_alive():
+            return thread
+    thread = threading.Thread(target=_refresh_loop, name=_REFRESHER_THREAD_NAME, daemon=True)
+    thread.start()
+    return thread
+
+
+def _refresh_loop(stop: threading.Event | None = None, iterations: int | None = None) -> None:
+    # Module globals are looked up on every pass, so a settings reload
+    # (new credentials, mock toggled) is picked up without a restart.
+    stop = stop or threading.Event()
+    while iterations is None or iterations > 0:
+        delay = _refresh_once()
+        if iterations is not None:
+            iterations -= 1
+        if stop.wait(delay):
+            return
+
+
+def _refresh_once() -> float:
+    """Renew the token if it is due; return the seconds until the next check."""
+    if USE_EBAY_MOCK or not EBAY_CLIENT_ID or not EBAY_CLIENT_SECRET:
+        return 60.0
+    margin = EBAY_TOKEN_REFRESH_MARGIN_SECONDS
+    try:
+        with _token_lock:
+            # Another worker may already have renewed and persisted it
+            if not (_fresh_cached_token(margin) or _adopt_stored_token(margin)):
+                _request_token()
+    except Exception as exc:
+        logger.warning("Background eBay token refresh failed: %s — retrying in 30s", exc)
+        return 30.0
+    # Jitter so several workers do not all renew at the same moment
+    due_in = _token_expires_at - margin - time.time()
+    return max(5.0, due_in + random.uniform(0, min(30.0, margin / 4)))
+
+
+# ---------------------------------------------------------------------------
+# Rate limits — one token bucket per eBay API (see src.api.rate_limit)
+# ---------------------------------------------------------------------------
+
+_finding_limiter = rate_limit.RateLimiter(
+    "ebay.finding", EBAY_FINDING_RATE, EBAY_FINDING_BURST, daily_quota=EBAY_FINDING_DAILY_QUOTA
+)
+_inventory_limiter = rate_limit.RateLimiter("ebay.inventory", EBAY_INVENTORY_RATE, EBAY_INVENTORY_BURST)
+_oauth_limiter = rate_limit.RateLimiter("ebay.oauth", EBAY_OAUTH_RATE, EBAY_OAUTH_BURST)
+_browse_limiter = rate_limit.RateLimiter(
+    "ebay.browse", EBAY_BROWSE_RATE, EBAY_BROWSE_BURST, daily_quota=EBAY_BROWSE_DAILY_QUOTA
+)
+
+# Identical searches in flight at the same time share one request
+_search_flight = SingleFlight("ebay.search")
 
 
 # ---------------------------------------------------------------------------
@@ -110,64 +236,143 @@ _ebay_rate_limiter = _RateLimiter(calls_per_second=5.0)
 
 def search_ebay(query: str, limit: int = 5) -> list:
     """
-    Search eBay using Finding API.
+    Search eBay with the configured backend (``EBAY_SEARCH_BACKEND``).
     Falls back to mock if credentials missing or USE_EBAY_MOCK is True.
+    In real mode a failed search (an API error, an open circuit, a spent
+    daily quota) returns ``[]``, never mock data.
+
+    Real results (including empty ones) are served from ``search_cache``
+    while fresh, so repeat searches skip the API call, the rate limiter and
+    the daily quota.  Every real result is also added to ``comps_index``,
+    which answers new queries that enough recently fetched comps match.
+    Identical searches already in flight are joined rather than repeated.
 
     Returns:
-        List of dicts: {title, price, url}
+        List of dicts: {title, price, url}, plus {currency, item_id,
+        condition, shipping, sold} from the Browse backend
     """
     if USE_EBAY_MOCK or not EBAY_CLIENT_ID or not EBAY_CLIENT_SECRET:
         logger.info("Using MOCK eBay search (not consuming API calls)")
         return search_ebay_mock(query, limit)
 
-    _ebay_rate_limiter.wait()
+    backend = ebay_search.get_backend()
+    key = _search_cache_key(query, limit, backend)
+    cached = search_cache.lookup(key)
+    if cached is not None:
+        return cached
+    local = comps_index.lookup(query, backend.max_results(limit), _search_scope(backend))
+    if local is not None:
+        return local
+
+    def fetch():
+        results = _run_search(backend, query, limit)
+        search_cache.store(key, results)
+        comps_index.record(results, _search_scope(backend))
+        return results
 
     try:
-        finding_endpoint = (
-            "https://svcs.sandbox.ebay.com/services/search/FindingService/v1"
-            if EBAY_SANDBOX
-            else "https://svcs.ebay.com/services/search/FindingService/v1"
-        )
-
-        params = {
-            "OPERATION-NAME": "findItemsByKeywords",
-            "SERVICE-VERSION": "1.13.0",
-            "SECURITY-APPNAME": EBAY_CLIENT_ID,
-            "RESPONSE-DATA-FORMAT": "JSON",
-            "keywords": query,
-            "paginationInput.entriesPerPage": limit,
-            "outputSelector": "SellerInfo",
-        }
-
-        response = requests.get(finding_endpoint, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        results = []
-        try:
-            items = data["findItemsByKeywordsResponse"][0]["searchResult"][0]["item"]
-            for item in items:
-                price = float(item["sellingStatus"][0]["currentPrice"][0]["__value__"])
-                title = item["title"][0]
-                url = item["viewItemURL"][0]
-                results.append({"title": title, "price": price, "url": url})
-        except (KeyError, IndexError):
-            pass
-
-        return results
+        return _copy_results(_search_flight.do(key, fetch))
     except Exception as e:
-        logger.warning("eBay API error: %s — falling back to mock data", e)
-        return search_ebay_mock(query, limit)
+        # Made-up comps must never be priced as real ones; no comps sets price_warning instead
+        logger.warning("eBay API error: %s — returning no comparables", e)
+        return []
+
+
+def _run_search(backend, query: str, limit: int) -> list:
+    """
+    Fetch the backend's first page, then the further pages it asks for
+    concurrently.  A failed further page is skipped (the comparables
+    already fetched are still used); a failed first page raises.
+    """
+    token = get_ebay_token() if backend.needs_token else None
+    limiter = _search_limiter(backend)
+    request = backend.first_request(query, limit, token)
+    first_page = _send("get", request.url, limiter, **_page_kwargs(request)).json()
+    pages = [backend.parse(first_page)]
+
+    more = backend.next_requests(query, limit, first_page, token)
+    if more:
+        workers = max(1, min(EBAY_SEARCH_CONCURRENCY, len(more)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ebay-search") as pool:
+            pages.extend(pool.map(lambda request: _fetch_page(backend, request, limiter), more))
+    return backend.collect(pages, limit)
+
+
+def _fetch_page(backend, request, limiter) -> list:
+    try:
+        return backend.parse(_send("get", request.url, limiter, **_page_kwargs(request)).json())
+    except Exception as exc:
+        logger.warning("eBay %s search page failed: %s — skipping it", backend.name, exc)
+        return []
+
+
+def _page_kwargs(request) -> dict:
+    """Keyword arguments for sending an ``ebay_search.PageRequest``."""
+    kwargs = {"params": request.params, "timeout": 15}
+    if request.headers:
+        kwargs["headers"] = request.headers
+    return kwargs
+
+
+def _search_limiter(backend):
+    return _browse_limiter if backend.name == "browse" else _finding_limiter
+
+
+def _search_cache_key(query: str, limit: int, backend=None) -> str:
+    return search_cache.cache_key(query, limit, scope=_search_scope(backend or ebay_search.get_backend()))
+
+
+def _search_scope(backend) -> str:
+    """Cache and comps-index scope: results differ per backend and between sandbox and production."""
+    return f"{backend.name}-sandbox" if EBAY_SANDBOX else backend.name
+
+
+def _copy_results(results: list) -> list:
+    """Give each caller sharing a coalesced search its own result dicts."""
+    return [dict(item) for item in results]
+
+
+def _finding_endpoint() -> str:
+    return (
+        "https://svcs.sandbox.ebay.com/services/search/FindingService/v1"
+        if EBAY_SANDBOX
+        else "https://svcs.ebay.com/services/search/FindingService/v1"
+    )
+
+
+def _finding_params(query: str, limit: int) -> dict:
+    return {
+        "OPERATION-NAME": "findItemsByKeywords",
+        "SERVICE-VERSION": "1.13.0",
+        "SECURITY-APPNAME": EBAY_CLIENT_ID,
+        "RESPONSE-DATA-FORMAT": "JSON",
+        "keywords": query,
+        "paginationInput.entriesPerPage": limit,
+        "outputSelector": "SellerInfo",
+    }
+
+
+def _parse_finding_response(data: dict) -> list:
+    """Extract {title, price, url} dicts from a Finding API JSON response."""
+    results = []
+    try:
+        items = data["findItemsByKeywordsResponse"][0]["searchResult"][0]["item"]
+        for item in items:
+            price = float(item["sellingStatus"][0]["currentPrice"][0]["__value__"])
+            title = item["title"][0]
+            url = item["viewItemURL"][0]
+            results.append({"title": title, "price": price, "url": url})
+    except (KeyError, IndexError):
+        pass
+    return results
 
 
 def suggest_price(listings: list) -> float:
-    """Calculate suggested price from comparable listings (median)."""
-    if not listings:
-        return None
-    prices = [l["price"] for l in listings if "price" in l]
-    if not prices:
-        return None
-    return round(median(prices), 2)
+    """
+    Calculate suggested price from comparable listings: outlier-trimmed,
+    shipping-normalised weighted median (see ``src.utils.pricing``).
+    """
+    return pricing.estimate_price(listings).price
 
 
 _CONDITION_MAP = {
@@ -239,12 +444,28 @@ def create_offer(sku: str, price: str, currency: str) -> str:
     """
     token = get_ebay_token()
     endpoint = f"{EBAY_API_ENDPOINT}/sell/inventory/v1/offer"
-    headers = {
+    headers = _inventory_headers(token)
+    offer_body = _offer_body(sku, price, currency)
+
+    # Not idempotent: a retry after a lost response could create a second offer
+    response = _send(
+        "post", endpoint, _inventory_limiter, max_attempts=1, headers=headers, json=offer_body, timeout=15
+    )
+
+    offer_id = _offer_id_from(response.json())
+    logger.info("Created eBay offer %s for SKU %s", offer_id, sku)
+    return offer_id
+
+
+def _inventory_headers(token: str) -> dict:
+    return {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
         "Content-Language": "en-US",
     }
 
+
+def _offer_body(sku: str, price: str, currency: str) -> dict:
     offer_body: dict = {
         "sku": sku,
         "marketplaceId": EBAY_MARKETPLACE_ID,
@@ -269,14 +490,13 @@ def create_offer(sku: str, price: str, currency: str) -> str:
     if EBAY_DEFAULT_CATEGORY_ID:
         offer_body["categoryId"] = EBAY_DEFAULT_CATEGORY_ID
 
-    response = requests.post(endpoint, headers=headers, json=offer_body, timeout=15)
-    response.raise_for_status()
+    return offer_body
 
-    offer_data = response.json()
+
+def _offer_id_from(offer_data: dict) -> str:
     offer_id = offer_data.get("offerId")
     if not offer_id:
         raise ValueError(f"eBay create_offer returned no offerId: {offer_data}")
-    logger.info("Created eBay offer %s for SKU %s", offer_id, sku)
     return offer_id
 
 
@@ -294,14 +514,17 @@ def publish_offer(offer_id: str) -> str:
         "Content-Type": "application/json",
     }
 
-    response = requests.post(endpoint, headers=headers, timeout=15)
-    response.raise_for_status()
+    response = _send("post", endpoint, _inventory_limiter, max_attempts=1, headers=headers, timeout=15)
 
-    publish_data = response.json()
+    listing_id = _listing_id_from(response.json())
+    logger.info("Published eBay offer %s → listing %s", offer_id, listing_id)
+    return listing_id
+
+
+def _listing_id_from(publish_data: dict) -> str:
     listing_id = publish_data.get("listingId")
     if not listing_id:
         raise ValueError(f"eBay publish_offer returned no listingId: {publish_data}")
-    logger.info("Published eBay offer %s → listing %s", offer_id, listing_id)
     return listing_id
 
 
@@ -318,38 +541,21 @@ def publish_listing(payload: dict) -> dict:
     Falls back to mock when USE_EBAY_MOCK is True or credentials are absent.
     """
     if USE_EBAY_MOCK or not EBAY_CLIENT_ID or not EBAY_CLIENT_SECRET:
-        sku = payload.get("sku", "AUTO_GENERATED_SKU")
-        return {
-            "status": "published",
-            "external_listing_id": f"MOCK-{sku}",
-            "mode": "mock",
-        }
+        return _mock_publish_result(payload)
 
     token = get_ebay_token()
     sku = payload["sku"]
 
     # Step 1: Upsert inventory item
     inv_endpoint = f"{EBAY_API_ENDPOINT}/sell/inventory/v1/inventory_item/{sku}"
-    inv_headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "Content-Language": "en-US",
-    }
-    # The inventory item body contains product, availability, and condition.
-    # Price lives in the offer body, not here.
-    inv_body = {
-        "product": payload.get("product", {}),
-        "availability": payload.get("availability", {}),
-        "condition": payload.get("condition", _DEFAULT_CONDITION),
-    }
-    response = requests.put(inv_endpoint, headers=inv_headers, json=inv_body, timeout=15)
-    response.raise_for_status()
+    _send(
+        "put", inv_endpoint, _inventory_limiter,
+        headers=_inventory_headers(token), json=_inventory_item_body(payload), timeout=15,
+    )
     logger.info("Upserted eBay inventory item for SKU %s", sku)
 
     # Step 2: Create offer
-    price_info = payload.get("price", {})
-    price_value = price_info.get("value", "0.00")
-    price_currency = price_info.get("currency", EBAY_DEFAULT_CURRENCY)
+    price_value, price_currency = _offer_price(payload)
     offer_id = create_offer(sku, price_value, price_currency)
 
     # Step 3: Publish offer → get live listing ID
@@ -360,3 +566,30 @@ def publish_listing(payload: dict) -> dict:
         "external_listing_id": listing_id,
         "mode": "real",
     }
+
+
+def _mock_publish_result(payload: dict) -> dict:
+    sku = payload.get("sku", "AUTO_GENERATED_SKU")
+    return {
+        "status": "published",
+        "external_listing_id": f"MOCK-{sku}",
+        "mode": "mock",
+    }
+
+
+def _inventory_item_body(payload: dict) -> dict:
+    # The inventory item body contains product, availability, and condition.
+    # Price lives in the offer body, not here.
+    return {
+        "product": payload.get("product", {}),
+        "availability": payload.get("availability", {}),
+        "condition": payload.get("condition", _DEFAULT_CONDITION),
+    }
+
+
+def _offer_price(payload: dict) -> tuple[str, str]:
+    price_info = payload.get("price", {})
+    return (
+        price_info.get("value", "0.00"),
+        price_info.get("currency", EBAY_DEFAULT_CURRENCY),
+    )
@@ -0,0 +1,179 @@
+"""
+Pluggable eBay comparable-search backends.
+
+A backend only builds page requests and parses responses; sending them
+(token, rate limiter, retries, circuit breaker) stays in ``ebay_client``
+and ``async_ebay_client`` so the sync and async clients share one
+implementation.  A search sends the backend's first page, asks it which
+further pages the first response calls for, and fetches those
+concurrently — several pages cost about the wall-clock time of one.
+
+- ``finding`` — the legacy Finding API: a single page of ``limit`` items
+  with title, price and URL only.
+- ``browse`` — the Browse ``item_summary/search`` endpoint: up to
+  ``EBAY_BROWSE_MAX_RESULTS`` items in pages of ``EBAY_BROWSE_PAGE_SIZE``,
+  each also carrying condition, shipping cost and sold status.
+
+``EBAY_SEARCH_BACKEND`` picks the backend by name; ``register_backend``
+adds another (e.g. a local stand-in).
+"""
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import src.config as config
+import src.api.ebay_client as ebay_client
+
+logger = logging.getLogger(__name__)
+
+_BROWSE_MAX_PAGE_SIZE = 200      # Browse API limit per request
+_BROWSE_MAX_OFFSET = 10000       # Browse API: offset + limit may not exceed this
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    """One GET request for a page of search results."""
+    url: str
+    params: dict
+    headers: dict = field(default_factory=dict)
+
+
+class SearchBackend(ABC):
+    """Interface for a comparable-search backend."""
+
+    name = ""
+    needs_token = False          # the client passes an OAuth token to the request builders
+
+    @abstractmethod
+    def first_request(self, query: str, limit: int, token: str | None) -> PageRequest:
+        """Request for the first page of results."""
+
+    def next_requests(self, query: str, limit: int, first_page: dict, token: str | None) -> list:
+        """Requests for the remaining pages, given the first page's JSON."""
+        return []
+
+    @abstractmethod
+    def parse(self, data: dict) -> list:
+        """Extract result dicts (at least title, price, url) from one page."""
+
+    def collect(self, pages: list, limit: int) -> list:
+        """Merge parsed pages, in page order, into the final result list."""
+        return [item for page in pages for item in page]
+
+    def max_results(self, limit: int) -> int:
+        """How many results a search for ``limit`` comparables may return."""
+        return limit
+
+
+class FindingBackend(SearchBackend):
+    name = "finding"
+
+    def first_request(self, query, limit, token):
+        return PageRequest(ebay_client._finding_endpoint(), ebay_client._finding_params(query, limit))
+
+    def parse(self, data):
+        return ebay_client._parse_finding_response(data)
+
+
+class BrowseBackend(SearchBackend):
+    """
+    Browse API search.  The Browse API only lists active items, so every
+    result has ``sold`` False; the field is there so pricing can tell
+    asking prices from sold prices once a source of the latter is added.
+    """
+
+    name = "browse"
+    needs_token = True
+
+    def first_request(self, query, limit, token):
+        return self._request(query, 0, self._page_size(limit), token)
+
+    def next_requests(self, query, limit, first_page, token):
+        page_size = self._page_size(limit)
+        available = min(int(first_page.get("total") or 0), self.max_results(limit))
+        last = min(available, _BROWSE_MAX_OFFSET - page_size + 1)
+        # The Browse API requires every offset to be a multiple of the page size
+        return [self._request(query, offset, page_size, token) for offset in range(page_size, last, page_size)]
+
+    def parse(self, data):
+        results = []
+        for item in data.get("itemSummaries") or []:
+            try:
+                price = float(item["price"]["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            results.append({
+                "title": item.get("title", ""),
+                "price": price,
+                "currency": item["price"].get("currency"),
+                "url": item.get("itemWebUrl", ""),
+                "item_id": item.get("itemId"),
+                "condition": item.get("condition"),
+                "shipping": _shipping_cost(item),
+                "sold": False,
+            })
+        return results
+
+    def collect(self, pages, limit):
+        # Listings shift between page requests; drop items seen on an earlier page
+        seen, results = set(), []
+        for item in super().collect(pages, limit):
+            key = item["item_id"] or item["url"]
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(item)
+        return results[: self.max_results(limit)]
+
+    def _request(self, query: str, offset: int, page_size: int, token: str | None) -> PageRequest:
+        return PageRequest(
+            f"{ebay_client.EBAY_API_ENDPOINT}/buy/browse/v1/item_summary/search",
+            {"q": query, "limit": page_size, "offset": offset},
+            {
+                "Authorization": f"Bearer {token}",
+                "X-EBAY-C-MARKETPLACE-ID": ebay_client.EBAY_MARKETPLACE_ID,
+            },
+        )
+
+    def _page_size(self, limit: int) -> int:
+        return max(1, min(config.EBAY_BROWSE_PAGE_SIZE, _BROWSE_MAX_PAGE_SIZE, self.max_results(limit)))
+
+    def max_results(self, limit: int) -> int:
+        return max(limit, config.EBAY_BROWSE_MAX_RESULTS)
+
+
+def _shipping_cost(item: dict) -> float | None:
+    """Cheapest listed shipping cost, 0.0 for free shipping, None when not quoted."""
+    costs = []
+    for option in item.get("shippingOptions") or []:
+        try:
+            costs.append(float(option["shippingCost"]["value"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return min(costs) if costs else None
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+_backends: dict[str, SearchBackend] = {}
+
+
+def register_backend(backend: SearchBackend) -> None:
+    """Make ``backend`` selectable as ``EBAY_SEARCH_BACKEND=<backend.name>``."""
+    _backends[backend.name] = backend
+
+
+def get_backend(name: str | None = None) -> SearchBackend:
+    """The named backend, by default the configured one; unknown names fall back to Finding."""
+    name = (name or config.EBAY_SEARCH_BACKEND).lower()
+    backend = _backends.get(name)
+    if backend is None:
+        logger.warning("Unknown eBay search backend %r — using finding", name)
+        backend = _backends["finding"]
+    return backend
+
+
+register_backend(FindingBackend())
+register_backend(BrowseBackend())
@@ -0,0 +1,95 @@
+"""
+Shared HTTP session layer for the OpenAI and eBay clients.
+
+Module-level ``requests.post/get/put`` open a new TCP+TLS connection for
+every call.  Here each host gets one long-lived ``HTTPAdapter`` whose
+urllib3 pool keeps connections alive and is safe to share between threads;
+each thread gets its own ``requests.Session`` (sessions themselves are not
+thread-safe) with those shared adapters mounted.
+
+This module is deliberately not reloaded by ``/api/settings``; call
+``reset()`` after a settings change to drop pooled connections so new
+credentials or endpoints start from fresh connections.
+"""
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import src.config as config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_adapters: dict[str, HTTPAdapter] = {}   # "scheme://host[:port]" → pooled adapter
+_generation = 0                          # bumped by reset() to retire thread sessions
+_local = threading.local()
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the pooled session for ``url``'s host."""
+    return _session_for(url).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    return request("PUT", url, **kwargs)
+
+
+def reset() -> None:
+    """Close every pooled connection; sessions are rebuilt on next use."""
+    global _generation
+    with _lock:
+        adapters = list(_adapters.values())
+        _adapters.clear()
+        _generation += 1
+    for adapter in adapters:
+        # Idle connections close now; in-flight ones are discarded when released
+        adapter.close()
+    logger.info("HTTP connection pools reset")
+
+
+def pool_stats() -> dict:
+    """Pooled hosts and the pool size each was created with."""
+    with _lock:
+        return {origin: adapter._pool_maxsize for origin, adapter in _adapters.items()}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _adapter_for(origin: str) -> HTTPAdapter:
+    with _lock:
+        adapter = _adapters.get(origin)
+        if adapter is None:
+            size = max(1, config.HTTP_POOL_SIZE)
+            # Retries are the clients' job; the adapter only pools connections
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0)
+            _adapters[origin] = adapter
+        return adapter
+
+
+def _session_for(url: str) -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None or _local.generation != _generation:
+        if session is not None:
+            session.close()
+        session = requests.Session()
+        _local.session, _local.generation, _local.mounted = session, _generation, set()
+
+    origin = _origin(url)
+    if origin not in _local.mounted:
+        session.mount(origin + "/", _adapter_for(origin))
+        _local.mounted.add(origin)
+    return session
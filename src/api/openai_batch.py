@@ -0,0 +1,265 @@
+"""
+Offline bulk analysis through the OpenAI Batch API.
+
+For overnight intake of a folder of photos, one interactive vision call per
+image pays full latency and rate limits.  Here the same chat-completions
+requests ``describe_image`` would send are written to JSONL input files
+(split at ``BATCH_MAX_FILE_BYTES``), uploaded, submitted as batches, polled
+until they finish, and the replies mapped back to their photos through each
+line's ``custom_id``.
+
+Progress is recorded in ``manifest.json`` inside the work directory after
+every step, so an interrupted run can be picked up with ``resume``.
+Photos already in the analysis cache are not sent at all, and every parsed
+reply is stored in the cache for later interactive uploads.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import src.config as config
+from src.api import http_session, openai_client, resilience, vision_metrics
+from src.api.mock_openai import describe_image_mock
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+_MANIFEST = "manifest.json"
+_TIMEOUT = 120
+
+
+def describe_images_batch(image_paths, work_dir, poll_seconds=None, timeout=None, sleep=time.sleep) -> dict:
+    """
+    Analyse many photos with one (or a few) batch jobs.
+
+    Returns ``{image_path: analysis}`` in input order; a photo the batch
+    could not answer (missing file, failed request, expired batch) maps to
+    ``None`` so the caller can fall back to ``describe_image``.  Mock mode
+    answers every photo from ``describe_image_mock`` without any requests.
+    """
+    image_paths = [str(path) for path in image_paths]
+    if openai_client.USE_OPENAI_MOCK or not openai_client.OPENAI_API_KEY:
+        logger.info("Using MOCK OpenAI for %d photo(s) (not consuming API calls)", len(image_paths))
+        return {path: describe_image_mock(path) for path in image_paths}
+
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"images": image_paths, "results": {}, "batches": []}
+    _write_requests(image_paths, work_dir, manifest)
+    _save_manifest(work_dir, manifest)
+    return _run(work_dir, manifest, poll_seconds, timeout, sleep)
+
+
+def resume(work_dir, poll_seconds=None, timeout=None, sleep=time.sleep) -> dict:
+    """Continue an interrupted ``describe_images_batch`` run from its manifest."""
+    work_dir = Path(work_dir)
+    manifest = json.loads((work_dir / _MANIFEST).read_text())
+    return _run(work_dir, manifest, poll_seconds, timeout, sleep)
+
+
+# ---------------------------------------------------------------------------
+# Batch API calls
+# ---------------------------------------------------------------------------
+
+def upload_file(input_path) -> str:
+    """Upload a JSONL input file with ``purpose=batch``; returns the file id."""
+    def send():
+        with open(input_path, "rb") as f:
+            response = http_session.post(
+                f"{_base_url()}/files",
+                headers=_auth_headers(),
+                data={"purpose": "batch"},
+                files={"file": (Path(input_path).name, f, "application/jsonl")},
+                timeout=_TIMEOUT,
+            )
+        response.raise_for_status()
+        return response
+
+    return resilience.call(send, _host(), max_attempts=1).json()["id"]
+
+
+def create_batch(input_file_id: str) -> dict:
+    """Start a batch over an uploaded input file (not retried: a duplicate would bill twice)."""
+    def send():
+        response = http_session.post(
+            f"{_base_url()}/batches",
+            headers=_auth_headers(),
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": BATCH_ENDPOINT,
+                "completion_window": COMPLETION_WINDOW,
+            },
+            timeout=_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response
+
+    return resilience.call(send, _host(), max_attempts=1).json()
+
+
+def get_batch(batch_id: str) -> dict:
+    return _get(f"{_base_url()}/batches/{batch_id}").json()
+
+
+def wait_for_batch(batch_id: str, poll_seconds=None, timeout=None, sleep=time.sleep) -> dict:
+    """
+    Poll a batch until it reaches a terminal status and return it.
+
+    Raises ``TimeoutError`` when ``timeout`` seconds pass first; the batch
+    keeps running server-side and can be resumed later.
+    """
+    poll_seconds = config.BATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        batch = get_batch(batch_id)
+        counts = batch.get("request_counts") or {}
+        logger.info(
+            "Batch %s: %s (%s/%s done, %s failed)",
+            batch_id, batch.get("status"), counts.get("completed", 0), counts.get("total", "?"), counts.get("failed", 0),
+        )
+        if batch.get("status") in TERMINAL_STATUSES:
+            return batch
+        if deadline is not None and time.monotonic() + poll_seconds > deadline:
+            raise TimeoutError(f"Batch {batch_id} still {batch.get('status')} after {timeout}s")
+        sleep(poll_seconds)
+
+
+def download_results(file_id: str):
+    """Yield each JSON line of a batch output file."""
+    response = _get(f"{_base_url()}/files/{file_id}/content")
+    for line in response.text.splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+# ---------------------------------------------------------------------------
+# Run orchestration
+# ---------------------------------------------------------------------------
+
+def _write_requests(image_paths, work_dir: Path, manifest: dict) -> None:
+    """Write request lines for every uncached photo, one input file per size chunk."""
+    out, entry, size = None, None, 0
+    try:
+        for n, path in enumerate(image_paths):
+            line, meta = _request_line(f"img-{n:06d}", path, manifest)
+            if line is None:
+                continue
+            if out is None or (size and size + len(line) > config.BATCH_MAX_FILE_BYTES):
+                if out is not None:
+                    out.close()
+                input_path = work_dir / f"requests-{len(manifest['batches']):03d}.jsonl"
+                out, size = open(input_path, "wb"), 0
+                entry = {"input_file": str(input_path), "batch_id": None, "done": False, "requests": {}}
+                manifest["batches"].append(entry)
+            out.write(line)
+            size += len(line)
+            entry["requests"][meta.pop("custom_id")] = meta
+    finally:
+        if out is not None:
+            out.close()
+
+
+def _request_line(custom_id: str, path: str, manifest: dict):
+    """Return ``(jsonl bytes, request metadata)`` for one photo, or ``(None, None)``."""
+    try:
+        image = openai_client._map_image(path)
+    except FileNotFoundError:
+        logger.warning("Image not found: %s — skipped from batch", path)
+        manifest["results"][path] = None
+        return None, None
+
+    with image as img_bytes:
+        key, phash = openai_client._cache_key(img_bytes), openai_client._perceptual_hash(img_bytes)
+        cached = openai_client._cached_analysis(key, phash, use_cache=True, kind="batch")
+        if cached is not None:
+            manifest["results"][path] = cached
+            return None, None
+        upload, media_type = openai_client._prepare_upload(img_bytes, path)
+        body = openai_client._build_payload(upload, media_type)
+        upload_bytes = len(upload)
+
+    line = json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body})
+    meta = {"custom_id": custom_id, "path": path, "key": key, "phash": phash, "image_bytes": upload_bytes}
+    return (line + "\n").encode(), meta
+
+
+def _run(work_dir: Path, manifest: dict, poll_seconds, timeout, sleep) -> dict:
+    for entry in manifest["batches"]:
+        if entry["done"]:
+            continue
+        if entry["batch_id"] is None:
+            file_id = upload_file(entry["input_file"])
+            entry["batch_id"] = create_batch(file_id)["id"]
+            _save_manifest(work_dir, manifest)
+            logger.info("Submitted batch %s (%d request(s))", entry["batch_id"], len(entry["requests"]))
+
+        batch = wait_for_batch(entry["batch_id"], poll_seconds=poll_seconds, timeout=timeout, sleep=sleep)
+        if batch["status"] != "completed":
+            logger.warning("Batch %s ended %s — keeping any partial output", entry["batch_id"], batch["status"])
+        manifest["results"].update(_collect(batch, entry["requests"]))
+        entry["done"] = True
+        _save_manifest(work_dir, manifest)
+
+    results = manifest["results"]
+    return {path: results.get(path) for path in manifest["images"]}
+
+
+def _collect(batch: dict, requests: dict) -> dict:
+    """Map a finished batch's output lines back to ``{image_path: analysis | None}``."""
+    results = {meta["path"]: None for meta in requests.values()}
+    if not batch.get("output_file_id"):
+        return results
+
+    for line in download_results(batch["output_file_id"]):
+        meta = requests.get(line.get("custom_id"))
+        if meta is None:
+            continue
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        error = line.get("error") or (None if response.get("status_code") == 200 else body.get("error") or "failed")
+        vision_metrics.record(
+            "batch", body.get("model") or openai_client.OPENAI_MODEL, usage=body.get("usage"),
+            image_bytes=meta.get("image_bytes", 0), error=json.dumps(error) if isinstance(error, dict) else error,
+        )
+        if error:
+            continue
+        content = body["choices"][0]["message"]["content"]
+        analysis = openai_client._analysis_from_reply(content)
+        if analysis is None:
+            analysis = openai_client._parse_content(content)
+        else:
+            openai_client._store_analysis(meta["key"], analysis, meta["phash"])
+        results[meta["path"]] = analysis
+    return results
+
+
+def _save_manifest(work_dir: Path, manifest: dict) -> None:
+    tmp = work_dir / (_MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, work_dir / _MANIFEST)
+
+
+def _get(url: str):
+    def send():
+        response = http_session.get(url, headers=_auth_headers(), timeout=_TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    return resilience.call(send, _host())
+
+
+def _base_url() -> str:
+    return openai_client.OPENAI_BASE_URL
+
+
+def _host() -> str:
+    return resilience.host_of(_base_url())
+
+
+def _auth_headers() -> dict:
+    return {"Authorization": f"Bearer {openai_client.OPENAI_API_KEY}"}
@@ -2,62 +2,50 @@
 OpenAI API client
 Handles image analysis with GPT-4o Vision
 """
+import contextlib
 import json
 import logging
 import base64
-import time
-import requests
-from src.config import OPENAI_API_KEY, OPENAI_MODEL, USE_OPENAI_MOCK
+import mmap
+import os
+from src.api import http_session, resilience, vision_metrics
+from src.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    USE_OPENAI_MOCK,
+    ANALYSIS_CACHE_ENABLED,
+    ANALYSIS_CACHE_TTL_SECONDS,
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_PHASH_DISTANCE,
+    IMAGE_PREPROCESS_ENABLED,
+    IMAGE_MAX_EDGE,
+    IMAGE_OUTPUT_FORMAT,
+    IMAGE_OUTPUT_QUALITY,
+    OPENAI_IMAGE_DETAIL,
+    STREAMING_BODY_MIN_BYTES,
+    VISION_PACK_SIZE,
+    OPENAI_STRUCTURED_OUTPUT,
+    ANALYSIS_REPAIR_ENABLED,
+)
+from src.api import analysis_cache
+from src.utils.image_hash import dhash
+from src.utils.image_prep import prepare_image
+from src.api.analysis_schema import RESPONSE_FORMAT, clean, parse_analysis, validate
 from src.api.mock_openai import describe_image_mock
+from src.api.stream_parser import CardStreamParser
+from src.api.streaming_body import IMAGE_PLACEHOLDER, Base64JSONBody
 
 logger = logging.getLogger(__name__)
 
 _OPENAI_TIMEOUT = 60          # seconds — vision requests can be slow
-_MAX_RETRIES = 3
-_RETRY_BACKOFF = 2.0          # seconds between retries (doubles each attempt)
+_MAX_RETRIES = 3              # attempts per call; back-off and breaker live in resilience
 
 
-def describe_image(image_path: str) -> dict:
-    """
-    Send image to OpenAI Vision and get structured description.
-    Falls back to mock if USE_OPENAI_MOCK is True or API key not set.
-
-    Returns:
-        dict with either single-item keys (brand/model/...) or
-        a multi-item shape: {"cards": [ ... ]} for photos containing several cards.
-    """
-
-    # Use mock if enabled or no API key
-    if USE_OPENAI_MOCK or not OPENAI_API_KEY:
-        logger.info("Using MOCK OpenAI (not consuming API calls)")
-        return describe_image_mock(image_path)
-
-    # Read and encode image
-    try:
-        with open(image_path, "rb") as f:
-            img_bytes = f.read()
-    except FileNotFoundError:
-        logger.warning("Image not found: %s — falling back to mock data", image_path)
-        return describe_image_mock(image_path)
-
-    img_base64 = base64.b64encode(img_bytes).decode()
-
-    # Determine image type
-    if image_path.lower().endswith(".png"):
-        media_type = "image/png"
-    elif image_path.lower().endswith(".gif"):
-        media_type = "image/gif"
-    else:
-        media_type = "image/jpeg"
+_OPENAI_URL = f"{OPENAI_BASE_URL}/chat/completions"
+_OPENAI_HOST = resilience.host_of(_OPENAI_URL)
 
-    # Call OpenAI Vision
-    url = "https://api.openai.com/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    prompt = """
+_PROMPT = """
     Analyze this photo for resale listing generation.
 
     If there is ONE primary item, return JSON object with:
@@ -91,46 +79,399 @@ def describe_image(image_path: str) -> dict:
     Return ONLY valid JSON, no extra text.
     """
 
+
+_REPAIR_PROMPT = (
+    "You fix malformed JSON produced by an image-analysis model for resale listings. "
+    "Return only the corrected JSON: keep every value that is present, repair the syntax, "
+    "and fill missing required fields (brand, model, category, condition) with \"Unknown\". "
+    "Do not invent other details."
+)
+_REPAIR_MAX_CHARS = 8000   # malformed replies are echoed back; cap the repair prompt
+
+_PACKED_PROMPT = """
+    You will receive {count} photos, each introduced by "Photo N:".
+    Analyse every photo on its own using the instructions below, and return
+    ONLY this JSON object, with exactly one entry per photo:
+    {{"results": [{{"index": N, "analysis": <the JSON object for photo N>}}]}}
+
+    Instructions for each photo:
+    """
+
+
+def describe_image(image_path: str, use_cache: bool = True) -> dict:
+    """
+    Send image to OpenAI Vision and get structured description.
+    Falls back to mock if USE_OPENAI_MOCK is True or API key not set.
+
+    Successful analyses are cached by a SHA-256 of the image bytes, so a
+    repeat upload of the same photo skips the vision call; a re-shot or
+    re-saved photo whose perceptual hash is within
+    ``ANALYSIS_CACHE_PHASH_DISTANCE`` bits reuses the earlier analysis too.
+    Pass ``use_cache=False`` to force a fresh analysis (the result still
+    refreshes the cache).
+
+    Returns:
+        dict with either single-item keys (brand/model/...) or
+        a multi-item shape: {"cards": [ ... ]} for photos containing several cards.
+    """
+
+    # Use mock if enabled or no API key
+    if USE_OPENAI_MOCK or not OPENAI_API_KEY:
+        logger.info("Using MOCK OpenAI (not consuming API calls)")
+        return describe_image_mock(image_path)
+
+    # Map the image read-only; large uploads are encoded from the map in chunks
+    try:
+        image = _map_image(image_path)
+    except FileNotFoundError:
+        logger.warning("Image not found: %s — falling back to mock data", image_path)
+        return describe_image_mock(image_path)
+
+    with image as img_bytes:
+        return _describe(img_bytes, image_path, use_cache)
+
+
+def _describe(img_bytes, image_path: str, use_cache: bool) -> dict:
+    key, phash = _cache_key(img_bytes), _perceptual_hash(img_bytes)
+    cached = _cached_analysis(key, phash, use_cache)
+    if cached is not None:
+        return cached
+
+    upload, media_type = _prepare_upload(img_bytes, image_path)
+    return _analyse(upload, media_type, image_path, key, phash, cache=_cache_status(use_cache))
+
+
+def _analyse(
+    upload, media_type: str, image_path: str, key: str, phash: int | None, cache: str = vision_metrics.CACHE_MISS
+) -> dict:
+    """Send one prepared image to OpenAI Vision, caching a parsed reply."""
+    call = vision_metrics.VisionCall("vision", OPENAI_MODEL, image_bytes=len(upload), cache=cache)
+
+    def send():
+        call.attempts += 1
+        response = http_session.post(
+            _OPENAI_URL, headers=_headers(), timeout=_OPENAI_TIMEOUT, **_request_body(upload, media_type)
+        )
+        response.raise_for_status()
+        return response
+
+    # Call OpenAI Vision
+    try:
+        response = resilience.call(send, _OPENAI_HOST, max_attempts=_MAX_RETRIES)
+    except Exception as exc:
+        call.finish(error=exc)
+        logger.warning("OpenAI API error: %s — falling back to mock data", exc)
+        return describe_image_mock(image_path)
+
+    data = response.json()
+    call.finish(usage=data.get("usage"))
+    content = data["choices"][0]["message"]["content"]
+    analysis = _analysis_from_reply(content)
+    if analysis is None:
+        return _parse_content(content)
+    _store_analysis(key, analysis, phash)
+    return analysis
+
+
+def describe_images_packed(image_paths, use_cache: bool = True) -> list:
+    """
+    Analyse several photos with as few vision requests as possible.
+
+    Uncached photos whose prepared upload is below ``STREAMING_BODY_MIN_BYTES``
+    are sent ``VISION_PACK_SIZE`` at a time in a single chat completion — the instruction prompt
+    and request overhead are paid once — and the model returns one result
+    per photo index.  Any photo whose result is missing or malformed, and any
+    photo too large to pack, is analysed with its own ``describe_image``-style
+    call instead.  Same mock and cache rules as describe_image.
+
+    Returns:
+        list of analyses in the order of ``image_paths``.
+    """
+    image_paths = [str(path) for path in image_paths]
+    if USE_OPENAI_MOCK or not OPENAI_API_KEY:
+        logger.info("Using MOCK OpenAI (not consuming API calls)")
+        return [describe_image_mock(path) for path in image_paths]
+
+    results = [None] * len(image_paths)
+    with contextlib.ExitStack() as stack:
+        pending = []   # (position, upload, media_type, key, phash) of photos still to analyse
+        for position, path in enumerate(image_paths):
+            try:
+                img_bytes = stack.enter_context(_map_image(path))
+            except FileNotFoundError:
+                logger.warning("Image not found: %s — falling back to mock data", path)
+                results[position] = describe_image_mock(path)
+                continue
+            key, phash = _cache_key(img_bytes), _perceptual_hash(img_bytes)
+            results[position] = _cached_analysis(key, phash, use_cache, kind="packed")
+            if results[position] is None:
+                upload, media_type = _prepare_upload(img_bytes, path)
+                pending.append((position, upload, media_type, key, phash))
+
+        pending_by_position = {item[0]: item for item in pending}
+        small = [item for item in pending if len(item[1]) < STREAMING_BODY_MIN_BYTES]
+        pack_size = max(1, VISION_PACK_SIZE)
+        for start in range(0, len(small), pack_size):
+            group = small[start:start + pack_size]
+            if len(group) < 2:
+                continue
+            for position, analysis in _analyse_packed(group, _cache_status(use_cache)).items():
+                _, _, _, key, phash = pending_by_position[position]
+                _store_analysis(key, analysis, phash)
+                results[position] = analysis
+
+        for position, upload, media_type, key, phash in pending:
+            if results[position] is None:
+                results[position] = _analyse(
+                    upload, media_type, image_paths[position], key, phash, cache=_cache_status(use_cache)
+                )
+    return results
+
+
+def _analyse_packed(items, cache: str = vision_metrics.CACHE_MISS) -> dict:
+    """
+    One chat completion for several prepared images.
+
+    Returns ``{position: analysis}`` for every photo whose indexed result
+    passes the same schema validation as a single reply; an unparseable
+    reply or API error returns ``{}`` so every photo falls back to a single
+    call, and an invalid result only its own photo.
+    """
+    payload = _packed_payload([(upload, media_type) for _, upload, media_type, _, _ in items])
+    call = vision_metrics.VisionCall(
+        "packed", OPENAI_MODEL, image_bytes=sum(len(item[1]) for item in items), images=len(items), cache=cache
+    )
+
+    def send():
+        call.attempts += 1
+        response = http_session.post(_OPENAI_URL, headers=_headers(), timeout=_OPENAI_TIMEOUT, json=payload)
+        response.raise_for_status()
+        return response
+
+    try:
+        response = resilience.call(send, _OPENAI_HOST, max_attempts=_MAX_RETRIES)
+    except Exception as exc:
+        call.finish(error=exc)
+        logger.warning("Packed OpenAI request failed: %s — analysing photos one by one", exc)
+        return {}
+
+    data = response.json()
+    call.finish(usage=data.get("usage"))
+    reply = _extract_json(data["choices"][0]["message"]["content"])
+    entries = reply.get("results") if isinstance(reply, dict) else None
+    if not isinstance(entries, list):
+        logger.warning("Packed reply had no results list — analysing %d photos one by one", len(items))
+        return {}
+
+    # A missing, repeated or extra index means results may be shifted — trust none of them
+    indices = [entry.get("index") if isinstance(entry, dict) else None for entry in entries]
+    if sorted(i for i in indices if isinstance(i, int)) != list(range(1, len(items) + 1)) or len(indices) != len(items):
+        logger.warning("Packed reply indices do not match %d photos — analysing them one by one", len(items))
+        return {}
+
+    analyses = {}
+    for entry in entries:
+        analysis, error = validate(entry.get("analysis"))
+        if analysis is None:
+            logger.warning("Packed result %d is invalid (%s) — analysing it alone", entry["index"], error)
+            continue
+        analyses[items[entry["index"] - 1][0]] = analysis
+    return analyses
+
+
+def describe_image_stream(image_path: str, use_cache: bool = True):
+    """
+    Streaming variant of describe_image.
+
+    Requests a streamed completion and yields each item dict as soon as it
+    is complete in the reply — every entry of a ``cards`` array individually,
+    or the whole analysis once the stream ends for a single-item photo.  Same
+    mock, cache and fallback rules as describe_image; a stream that breaks
+    before any card was yielded falls back to mock data.
+    """
+    if USE_OPENAI_MOCK or not OPENAI_API_KEY:
+        logger.info("Using MOCK OpenAI (not consuming API calls)")
+        yield from _split_cards(describe_image_mock(image_path))
+        return
+
+    try:
+        image = _map_image(image_path)
+    except FileNotFoundError:
+        logger.warning("Image not found: %s — falling back to mock data", image_path)
+        yield from _split_cards(describe_image_mock(image_path))
+        return
+
+    with image as img_bytes:
+        yield from _describe_stream(img_bytes, image_path, use_cache)
+
+
+def _describe_stream(img_bytes, image_path: str, use_cache: bool):
+    key, phash = _cache_key(img_bytes), _perceptual_hash(img_bytes)
+    cached = _cached_analysis(key, phash, use_cache, kind="stream")
+    if cached is not None:
+        yield from _split_cards(cached)
+        return
+
+    upload, media_type = _prepare_upload(img_bytes, image_path)
+    call = vision_metrics.VisionCall("stream", OPENAI_MODEL, image_bytes=len(upload), cache=_cache_status(use_cache))
+
+    def send():
+        call.attempts += 1
+        response = http_session.post(
+            _OPENAI_URL,
+            headers=_headers(),
+            timeout=_OPENAI_TIMEOUT,
+            stream=True,
+            **_request_body(upload, media_type, stream=True, stream_options={"include_usage": True}),
+        )
+        response.raise_for_status()
+        return response
+
+    # Retry only the connection; once tokens flow, a retry would duplicate cards
+    try:
+        response = resilience.call(send, _OPENAI_HOST, max_attempts=_MAX_RETRIES)
+    except Exception as exc:
+        call.finish(error=exc)
+        logger.warning("OpenAI API error: %s — falling back to mock data", exc)
+        yield from _split_cards(describe_image_mock(image_path))
+        return
+
+    parser = CardStreamParser()
+    usage = {}
+    try:
+        for delta in _stream_deltas(response, usage):
+            yield from (clean(card) for card in parser.feed(delta))
+    except Exception as exc:
+        call.finish(usage=usage, error=exc)
+        logger.warning("OpenAI stream interrupted after %d card(s): %s", parser.cards_seen, exc)
+        if not parser.cards_seen:
+            yield from _split_cards(describe_image_mock(image_path))
+        return
+    finally:
+        response.close()
+    call.finish(usage=usage)
+
+    if parser.cards_seen:
+        analysis, _ = parse_analysis(parser.text)
+    else:
+        analysis = _analysis_from_reply(parser.text)
+    if analysis is not None:
+        _store_analysis(key, analysis, phash)
+    if not parser.cards_seen:
+        # Single-item reply (or a cards array the parser could not split)
+        yield from _split_cards(analysis if analysis is not None else _parse_content(parser.text))
+
+
+# ---------------------------------------------------------------------------
+# Request/response helpers (shared with async_openai_client)
+# ---------------------------------------------------------------------------
+
+def _media_type(image_path: str) -> str:
+    """Determine the image MIME type from the file extension."""
+    if image_path.lower().endswith(".png"):
+        return "image/png"
+    if image_path.lower().endswith(".gif"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def _map_image(image_path: str):
+    """
+    Open the image as a read-only memory map (a context manager yielding a
+    bytes-like object).  Raises FileNotFoundError like ``open``.
+    """
+    with open(image_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return contextlib.nullcontext(b"")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _request_body(image, media_type: str, **extra) -> dict:
+    """
+    ``http_session.post`` keyword arguments carrying the vision request body.
+
+    Images of at least ``STREAMING_BODY_MIN_BYTES`` are sent as a streamed
+    ``data=`` body encoded chunk by chunk; smaller ones — including nearly
+    every preprocessed upload — as ``json=``.
+    """
+    if len(image) < STREAMING_BODY_MIN_BYTES:
+        payload = _build_payload(image, media_type)
+        payload.update(extra)
+        return {"json": payload}
+
+    payload = _payload_for(_image_url(IMAGE_PLACEHOLDER, media_type))
+    payload.update(extra)
+    return {"data": Base64JSONBody(payload, image)}
+
+
+def _prepare_upload(img_bytes: bytes, image_path: str) -> tuple[bytes, str]:
+    """Downscale/re-encode the image for upload; returns ``(bytes, media_type)``."""
+    media_type = _media_type(image_path)
+    if not IMAGE_PREPROCESS_ENABLED:
+        return img_bytes, media_type
+    return prepare_image(
+        img_bytes,
+        media_type,
+        max_edge=IMAGE_MAX_EDGE,
+        output_format=IMAGE_OUTPUT_FORMAT,
+        quality=IMAGE_OUTPUT_QUALITY,
+    )
+
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+    }
+
+
+def _build_payload(img_bytes: bytes, media_type: str) -> dict:
+    """Build the chat-completions request body for one image."""
+    img_base64 = base64.b64encode(img_bytes).decode()
+    return _payload_for(_image_url(img_base64, media_type))
+
+
+def _payload_for(image_url: dict) -> dict:
     payload = {
         "model": OPENAI_MODEL,
         "messages": [
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{media_type};base64,{img_base64}"},
-                    },
+                    {"type": "text", "text": _PROMPT},
+                    {"type": "image_url", "image_url": image_url},
                 ],
             }
         ],
         "max_tokens": 1500,
     }
+    if OPENAI_STRUCTURED_OUTPUT:
+        payload["response_format"] = RESPONSE_FORMAT
+    return payload
+
+
+def _packed_payload(images) -> dict:
+    """Build one chat-completions request body for several ``(bytes, media_type)`` images."""
+    content = [{"type": "text", "text": _PACKED_PROMPT.format(count=len(images)) + _PROMPT}]
+    for number, (img_bytes, media_type) in enumerate(images, start=1):
+        content.append({"type": "text", "text": f"Photo {number}:"})
+        content.append({"type": "image_url", "image_url": _image_url(base64.b64encode(img_bytes).decode(), media_type)})
+    return {
+        "model": OPENAI_MODEL,
+        "messages": [{"role": "user", "content": content}],
+        "max_tokens": 1500 * len(images),
+    }
 
-    last_error = None
-    for attempt in range(_MAX_RETRIES):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=_OPENAI_TIMEOUT)
-            response.raise_for_status()
-            last_error = None
-            break
-        except Exception as exc:
-            last_error = exc
-            logger.warning(
-                "OpenAI API error (attempt %d/%d): %s", attempt + 1, _MAX_RETRIES, exc
-            )
-        if attempt < _MAX_RETRIES - 1:
-            time.sleep(_RETRY_BACKOFF * (attempt + 1))
-
-    if last_error is not None:
-        logger.warning("All OpenAI retries exhausted — falling back to mock data")
-        return describe_image_mock(image_path)
 
-    # Parse response
-    content = response.json()["choices"][0]["message"]["content"]
+def _image_url(img_base64: str, media_type: str) -> dict:
+    image_url = {"url": f"data:{media_type};base64,{img_base64}"}
+    if OPENAI_IMAGE_DETAIL:
+        image_url["detail"] = OPENAI_IMAGE_DETAIL
+    return image_url
 
-    # Try to parse as JSON
+
+def _extract_json(content: str) -> dict | None:
+    """Return the JSON object embedded in the reply text, or None."""
     try:
         start = content.find("{")
         end = content.rfind("}") + 1
@@ -138,6 +479,62 @@ def describe_image(image_path: str) -> dict:
             return json.loads(content[start:end])
     except Exception:
         pass
+    return None
+
+
+def _analysis_from_reply(content: str) -> dict | None:
+    """
+    Validated analysis from reply text.  A malformed or incomplete reply gets
+    one targeted, text-only repair request (no image tokens) instead of a new
+    vision call; None when neither is usable.
+    """
+    analysis, error = parse_analysis(content)
+    if analysis is None and ANALYSIS_REPAIR_ENABLED:
+        analysis = _repair(content, error)
+    return analysis
+
+
+def _repair(content: str, error: str) -> dict | None:
+    """Ask the model to fix a reply that failed ``parse_analysis``."""
+    logger.warning("Vision reply failed validation (%s) — requesting a repair", error)
+    payload = {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": _REPAIR_PROMPT},
+            {"role": "user", "content": f"Problem: {error}\n\nReply:\n{content[:_REPAIR_MAX_CHARS]}"},
+        ],
+        "max_tokens": 1500,
+    }
+    if OPENAI_STRUCTURED_OUTPUT:
+        payload["response_format"] = RESPONSE_FORMAT
+    call = vision_metrics.VisionCall("repair", OPENAI_MODEL, images=0, cache=vision_metrics.CACHE_OFF)
+
+    def send():
+        call.attempts += 1
+        response = http_session.post(_OPENAI_URL, headers=_headers(), timeout=_OPENAI_TIMEOUT, json=payload)
+        response.raise_for_status()
+        return response
+
+    try:
+        response = resilience.call(send, _OPENAI_HOST, max_attempts=_MAX_RETRIES)
+    except Exception as exc:
+        call.finish(error=exc)
+        logger.warning("OpenAI repair request failed: %s", exc)
+        return None
+
+    data = response.json()
+    call.finish(usage=data.get("usage"))
+    analysis, error = parse_analysis(data["choices"][0]["message"]["content"])
+    if analysis is None:
+        logger.warning("Repaired reply still invalid: %s", error)
+    return analysis
+
+
+def _parse_content(content: str) -> dict:
+    """Extract the JSON analysis from the model's reply text."""
+    analysis = _extract_json(content)
+    if analysis is not None:
+        return analysis
 
     # Fallback if JSON parsing fails
     logger.warning("Failed to parse OpenAI JSON response — using fallback structure")
@@ -149,3 +546,79 @@ def describe_image(image_path: str) -> dict:
         "features": [content[:50]],
         "estimated_value_range": "Unknown",
     }
+
+
+def _cache_key(img_bytes: bytes) -> str:
+    return analysis_cache.cache_key(img_bytes, OPENAI_MODEL, _PROMPT)
+
+
+def _cache_scope() -> str:
+    return analysis_cache.scope(OPENAI_MODEL, _PROMPT)
+
+
+def _perceptual_hash(img_bytes: bytes) -> int | None:
+    """dHash for near-duplicate lookups (None when disabled or undecodable)."""
+    if not ANALYSIS_CACHE_ENABLED or ANALYSIS_CACHE_PHASH_DISTANCE < 0:
+        return None
+    return dhash(img_bytes)
+
+
+def _cached_analysis(key: str, phash: int | None, use_cache: bool, kind: str = "vision") -> dict | None:
+    """
+    Look the image up in the analysis cache unless caching is off or bypassed.
+    A hit is recorded as a ``kind`` call that cost nothing.
+    """
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+    if not use_cache:
+        analysis_cache.record_bypass()
+        return None
+    analysis = analysis_cache.lookup(
+        key, ANALYSIS_CACHE_TTL_SECONDS, phash=phash, max_distance=ANALYSIS_CACHE_PHASH_DISTANCE,
+        scope=_cache_scope(),
+    )
+    if analysis is not None:
+        vision_metrics.record_cache_hit(kind, OPENAI_MODEL, near=analysis.get('_cache') == 'near')
+    return analysis
+
+
+def _cache_status(use_cache: bool) -> str:
+    """Cache status to record for a call made after ``_cached_analysis`` missed."""
+    if not ANALYSIS_CACHE_ENABLED:
+        return vision_metrics.CACHE_OFF
+    return vision_metrics.CACHE_MISS if use_cache else vision_metrics.CACHE_BYPASS
+
+
+def _store_analysis(key: str, analysis: dict, phash: int | None = None) -> None:
+    """Cache a successfully parsed analysis under ``key`` (and its perceptual hash)."""
+    if ANALYSIS_CACHE_ENABLED and isinstance(analysis, dict):
+        analysis_cache.store(key, analysis, ANALYSIS_CACHE_MAX_ENTRIES, phash=phash, scope=_cache_scope())
+
+
+def _stream_deltas(response, usage: dict | None = None):
+    """
+    Yield the content deltas of a streamed chat completion (SSE lines).
+    The final ``usage`` chunk, when present, is copied into ``usage``.
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        chunk = json.loads(data)
+        if usage is not None and chunk.get("usage"):
+            usage.update(chunk["usage"])
+        choices = chunk.get("choices") or []
+        if choices:
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
+def _split_cards(analysis: dict) -> list:
+    """Split an analysis into its card dicts (or the single item itself)."""
+    if isinstance(analysis, dict) and isinstance(analysis.get("cards"), list):
+        cards = [card for card in analysis["cards"] if isinstance(card, dict)]
+        return cards or [analysis]
+    return [analysis] if isinstance(analysis, dict) else []
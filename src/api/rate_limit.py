@@ -0,0 +1,341 @@
+"""
+Token-bucket rate limiting and daily quotas for outbound API calls.
+
+Each ``RateLimiter`` is one named bucket (eBay Finding, Inventory, OAuth …)
+refilling at ``rate`` tokens per second up to ``burst`` tokens, plus an
+optional daily call quota counted per UTC day.  Taking a token never holds
+a lock while waiting: ``reserve`` claims the next token atomically (the
+bucket may go into debt, which queues later callers behind it) and returns
+how long to wait, so ``acquire`` sleeps — or ``acquire_async`` awaits —
+with nothing held.  ``would_wait_ms`` answers the same question without
+claiming anything, for schedulers deciding what to run next.
+
+Bucket and quota state live in a backend:
+
+- ``MemoryBackend`` (default) — one process;
+- ``SQLiteBackend`` — a table every worker process on the machine shares,
+  so they enforce one aggregate rate and one daily quota together;
+- anything else implementing ``RateLimitBackend`` (e.g. a multi-node
+  store), installed with ``set_backend``.
+
+``RATE_LIMIT_BACKEND`` picks the default from ``src.config`` at call time.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import src.config as config
+from src import database
+from src.exceptions import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class RateLimitBackend(ABC):
+    """Atomic bucket and quota operations shared by every limiter using the backend."""
+
+    @abstractmethod
+    def reserve(self, name: str, rate: float, burst: float, now: float, peek: bool = False) -> float:
+        """
+        Take one token from bucket ``name`` (refilled up to ``now``) and return
+        the seconds until it is actually available; ``peek`` only reports.
+        """
+
+    @abstractmethod
+    def spend_quota(self, name: str, day: str, limit: int) -> bool:
+        """Count one call against ``name``'s quota for ``day``; False once ``limit`` is reached."""
+
+    @abstractmethod
+    def quota_used(self, name: str, day: str) -> int:
+        """Calls counted against ``name``'s quota for ``day``."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all buckets and quota counts."""
+
+
+def _take(tokens: float, updated_at: float, rate: float, burst: float, now: float):
+    """Refill then take one token; returns ``(tokens_after, wait_seconds)``."""
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    tokens -= 1
+    return tokens, max(0.0, -tokens / rate)
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets and quotas in this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._quota: dict[tuple[str, str], int] = {}
+
+    def reserve(self, name, rate, burst, now, peek=False):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(name, (burst, now))
+            tokens, wait = _take(tokens, updated_at, rate, burst, now)
+            if not peek:
+                self._buckets[name] = (tokens, max(now, updated_at))
+            return wait
+
+    def spend_quota(self, name, day, limit):
+        with self._lock:
+            used = self._quota.get((name, day), 0)
+            if used >= limit:
+                return False
+            # Only today's count matters; drop earlier days as they roll over
+            self._quota = {k: v for k, v in self._quota.items() if k[1] == day}
+            self._quota[(name, day)] = used + 1
+            return True
+
+    def quota_used(self, name, day):
+        with self._lock:
+            return self._quota.get((name, day), 0)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._quota.clear()
+
+
+class SQLiteBackend(RateLimitBackend):
+    """
+    Buckets and quotas in SQLite tables, shared by every process using the
+    same file.  Each operation is one ``BEGIN IMMEDIATE`` transaction, so
+    concurrent workers serialise on the file lock instead of racing.
+
+    ``path`` defaults to the app database at call time.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+
+    def reserve(self, name, rate, burst, now, peek=False):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            tokens, updated_at = row if row else (burst, now)
+            tokens, wait = _take(tokens, updated_at, rate, burst, now)
+            if not peek:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (name, tokens, max(now, updated_at)),
+                )
+            return wait
+
+    def spend_quota(self, name, day, limit):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT used FROM rate_limit_quota WHERE name = ? AND day = ?", (name, day)
+            ).fetchone()
+            if row and row[0] >= limit:
+                return False
+            conn.execute(
+                '''
+                INSERT INTO rate_limit_quota (name, day, used) VALUES (?, ?, 1)
+                ON CONFLICT (name, day) DO UPDATE SET used = used + 1
+                ''',
+                (name, day),
+            )
+            conn.execute("DELETE FROM rate_limit_quota WHERE day < ?", (day,))
+            return True
+
+    def quota_used(self, name, day):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT used FROM rate_limit_quota WHERE name = ? AND day = ?", (name, day)
+            ).fetchone()
+            return row[0] if row else 0
+
+    def reset(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM rate_limit_buckets")
+            conn.execute("DELETE FROM rate_limit_quota")
+
+    def _transaction(self):
+        return _SQLiteTransaction(str(self._path or database.DATABASE_PATH))
+
+
+class _SQLiteTransaction:
+    def __init__(self, path: str):
+        self._path = path
+
+    def __enter__(self):
+        self._conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            '''
+        )
+        self._conn.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS rate_limit_quota (
+                name TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (name, day)
+            )
+            '''
+        )
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._conn.close()
+
+
+_backend_lock = threading.Lock()
+_backend_override: RateLimitBackend | None = None
+_memory_backend = MemoryBackend()
+_sqlite_backend = SQLiteBackend()
+
+
+def set_backend(backend: RateLimitBackend | None) -> None:
+    """Install a custom backend for every limiter (``None`` restores ``RATE_LIMIT_BACKEND``)."""
+    global _backend_override
+    with _backend_lock:
+        _backend_override = backend
+
+
+def get_backend() -> RateLimitBackend:
+    with _backend_lock:
+        if _backend_override is not None:
+            return _backend_override
+    return _sqlite_backend if config.RATE_LIMIT_BACKEND == "sqlite" else _memory_backend
+
+
+# ---------------------------------------------------------------------------
+# Limiters
+# ---------------------------------------------------------------------------
+
+_registry_lock = threading.Lock()
+_registry: dict[str, "RateLimiter"] = {}
+
+
+class RateLimiter:
+    """
+    One named token bucket with an optional daily quota.
+
+    ``daily_quota`` of 0 means unlimited.  ``backend`` pins a backend;
+    by default the shared one from ``get_backend`` is used at call time.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = 1, daily_quota: int = 0,
+                 backend: RateLimitBackend | None = None, clock=time.time):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.daily_quota = max(0, int(daily_quota))
+        self._backend = backend
+        self._clock = clock
+        self._stats_lock = threading.Lock()
+        self._acquired = 0
+        self._delayed = 0
+        self._waited = 0.0
+        with _registry_lock:
+            _registry[name] = self
+
+    def reserve(self) -> float:
+        """
+        Count the call against the quota and claim a token; returns the
+        seconds to wait before sending.  Raises ``QuotaExceededError`` (no
+        token taken) once today's quota is used up.
+        """
+        backend = self._backend_now()
+        if self.daily_quota and not backend.spend_quota(self.name, self._day(), self.daily_quota):
+            logger.warning("Daily quota for %s (%d calls) is used up", self.name, self.daily_quota)
+            raise QuotaExceededError(self.name, self.daily_quota)
+        if self.rate <= 0:
+            wait = 0.0
+        else:
+            wait = backend.reserve(self.name, self.rate, self.burst, self._clock())
+        with self._stats_lock:
+            self._acquired += 1
+            if wait > 0:
+                self._delayed += 1
+                self._waited += wait
+        return wait
+
+    def acquire(self, sleep=time.sleep) -> float:
+        """Block until a token is available; returns the time waited."""
+        wait = self.reserve()
+        if wait > 0:
+            sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Like ``acquire`` but awaits, so other coroutines keep running."""
+        wait = await asyncio.to_thread(self.reserve) if self._shared() else self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def would_wait_ms(self) -> float:
+        """Milliseconds a call made now would wait for a token (nothing is claimed)."""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._backend_now().reserve(self.name, self.rate, self.burst, self._clock(), peek=True)
+        return round(wait * 1000, 1)
+
+    def quota_remaining(self) -> int | None:
+        """Calls left today, or None when there is no quota."""
+        if not self.daily_quota:
+            return None
+        return max(0, self.daily_quota - self._backend_now().quota_used(self.name, self._day()))
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            acquired, delayed, waited = self._acquired, self._delayed, self._waited
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "would_wait_ms": self.would_wait_ms(),
+            "daily_quota": self.daily_quota or None,
+            "quota_remaining": self.quota_remaining(),
+            "acquired": acquired,
+            "delayed": delayed,
+            "waited_seconds": round(waited, 3),
+        }
+
+    def _backend_now(self) -> RateLimitBackend:
+        return self._backend or get_backend()
+
+    def _shared(self) -> bool:
+        """Whether backend calls touch disk and belong off the event loop."""
+        return not isinstance(self._backend_now(), MemoryBackend)
+
+    def _day(self) -> str:
+        return datetime.fromtimestamp(self._clock(), timezone.utc).strftime("%Y-%m-%d")
+
+
+def metrics() -> dict:
+    """Per-limiter rate, burst, current wait, quota left and wait counters."""
+    with _registry_lock:
+        limiters = list(_registry.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
+
+
+def reset() -> None:
+    """Forget in-memory bucket/quota state (SQLite rows are kept)."""
+    _memory_backend.reset()
+    with _registry_lock:
+        limiters = list(_registry.values())
+    for limiter in limiters:
+        with limiter._stats_lock:
+            limiter._acquired = limiter._delayed = 0
+            limiter._waited = 0.0
@@ -0,0 +1,311 @@
+"""
+Shared resilience layer for outbound API calls.
+
+``call`` (and ``call_async``) run one HTTP operation with:
+
+- jittered exponential back-off between attempts, honouring a 429/503
+  ``Retry-After`` header (a wait longer than the cap gives up instead);
+- a per-host retry budget, so retries stay a small fraction of traffic
+  during an outage instead of multiplying it;
+- a per-host circuit breaker that fails fast with ``CircuitOpenError``
+  while a service is down, then lets a single probe through (half-open)
+  after a cool-down.
+
+Breaker transitions and retry counts are kept per host for ``metrics()``.
+Tuning comes from ``src.config`` at call time, so ``/api/settings``
+reloads apply without restarting.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import src.config as config
+from src.exceptions import CircuitOpenError, QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; other 4xx mean the request itself is wrong
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host.
+
+    Opens after ``failure_threshold`` failures in a row; after
+    ``reset_timeout`` seconds one probe is admitted (half-open) whose result
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transitions = {OPEN: 0, HALF_OPEN: 0, CLOSED: 0}
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                self._transition(OPEN)
+
+    def release_probe(self) -> None:
+        """End a half-open probe that told us nothing about the host; the next call probes again."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        logger.warning("Circuit %s → %s", self.state, state)
+        self.state = state
+        self.transitions[state] += 1
+
+
+class RetryBudget:
+    """
+    Allow retries up to ``ratio`` of the requests seen in the last
+    ``window`` seconds, plus ``min_retries`` so a quiet host can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window: float = 10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._requests.append(self._clock())
+
+    def try_spend(self) -> bool:
+        """Reserve one retry; False when the budget is exhausted."""
+        with self._lock:
+            now = self._clock()
+            for events in (self._requests, self._retries):
+                while events and now - events[0] > self.window:
+                    events.popleft()
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class _HostState:
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=config.BREAKER_RESET_SECONDS,
+        )
+        self.budget = RetryBudget(ratio=config.RETRY_BUDGET_RATIO)
+        self.retries = 0
+        self.retries_denied = 0
+
+
+_hosts_lock = threading.Lock()
+_hosts: dict[str, _HostState] = {}
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def call(fn, host: str, max_attempts: int = 3, sleep=time.sleep):
+    """
+    Run ``fn()`` — which sends one request and raises on a bad status —
+    with back-off, retry budget and circuit breaking for ``host``.
+
+    Returns ``fn``'s result or raises its last error (``CircuitOpenError``
+    when the circuit is open).
+    """
+    state = _state_for(host)
+    attempt = 0
+    while True:
+        _admit(state, host)
+        try:
+            result = fn()
+        except QuotaExceededError:
+            state.breaker.release_probe()
+            raise   # refused locally; says nothing about the host
+        except Exception as exc:
+            delay = _after_failure(state, host, exc, attempt, max_attempts)
+            if delay is None:
+                raise
+            sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            state.breaker.release_probe()
+            raise   # interrupted; says nothing about the host
+        state.breaker.record_success()
+        return result
+
+
+async def call_async(fn, host: str, max_attempts: int = 3):
+    """Async counterpart of ``call``: ``fn`` returns an awaitable."""
+    state = _state_for(host)
+    attempt = 0
+    while True:
+        _admit(state, host)
+        try:
+            result = await fn()
+        except QuotaExceededError:
+            state.breaker.release_probe()
+            raise   # refused locally; says nothing about the host
+        except Exception as exc:
+            delay = _after_failure(state, host, exc, attempt, max_attempts)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            state.breaker.release_probe()
+            raise   # cancelled; says nothing about the host
+        state.breaker.record_success()
+        return result
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """
+    Full-jitter exponential delay for retry number ``attempt`` (0-based);
+    a server ``Retry-After`` is honoured as a minimum.
+    """
+    ceiling = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def retry_after_seconds(response) -> float | None:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def metrics() -> dict:
+    """Per-host breaker state, transition counts and retry counters."""
+    with _hosts_lock:
+        hosts = dict(_hosts)
+    return {
+        host: {
+            "state": state.breaker.state,
+            "opened": state.breaker.transitions[OPEN],
+            "half_opened": state.breaker.transitions[HALF_OPEN],
+            "closed": state.breaker.transitions[CLOSED],
+            "short_circuited": state.breaker.short_circuited,
+            "retries": state.retries,
+            "retries_denied": state.retries_denied,
+        }
+        for host, state in hosts.items()
+    }
+
+
+def reset() -> None:
+    """Forget all breakers, budgets and counters."""
+    with _hosts_lock:
+        _hosts.clear()
+
+
+def _state_for(host: str) -> _HostState:
+    with _hosts_lock:
+        state = _hosts.get(host)
+        if state is None:
+            state = _hosts[host] = _HostState()
+        return state
+
+
+def _admit(state: _HostState, host: str) -> None:
+    if not state.breaker.allow():
+        raise CircuitOpenError(host, state.breaker.retry_in())
+    state.budget.record_request()
+
+
+def _after_failure(state: _HostState, host: str, exc: Exception, attempt: int, max_attempts: int):
+    """Record a failed attempt; return the delay before retrying, or None to give up."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+
+    # A client error means the service is up — don't trip the breaker for it
+    if status is None or status >= 500:
+        state.breaker.record_failure()
+    else:
+        state.breaker.record_success()
+
+    if status is not None and status not in RETRYABLE_STATUSES:
+        return None
+    if attempt + 1 >= max_attempts or state.breaker.state == OPEN:
+        return None
+
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None and retry_after > config.RETRY_MAX_DELAY:
+        logger.warning("%s asked to retry after %.0fs — giving up instead", host, retry_after)
+        return None
+    if not state.budget.try_spend():
+        state.retries_denied += 1
+        logger.warning("Retry budget for %s exhausted — not retrying: %s", host, exc)
+        return None
+
+    state.retries += 1
+    delay = backoff_delay(attempt, retry_after)
+    logger.warning(
+        "%s call failed (attempt %d/%d): %s — retrying in %.2fs",
+        host, attempt + 1, max_attempts, exc, delay,
+    )
+    return delay
@@ -0,0 +1,133 @@
+"""
+Shared cache for eBay comparable searches.
+
+Every card of every upload runs a ``search_ebay`` call, and the same
+player/set/year is often searched again seconds later (lot photos, retries,
+re-uploads).  Results are kept in a process-wide LRU keyed by the normalised
+query and limit, each entry expiring after ``SEARCH_CACHE_TTL_SECONDS``.
+Searches that found nothing are cached too, for the shorter
+``SEARCH_CACHE_NEGATIVE_TTL_SECONDS``, so a hopeless query is not retried
+for every card that produces it.
+
+With ``SEARCH_CACHE_PERSIST`` the entries are written through to the
+``search_cache`` SQLite table, so a restarted process starts warm.
+
+Only real API results are stored; mock data and error fallbacks never are.
+Settings come from ``src.config`` at call time.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import src.config as config
+from src import database
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, tuple[float, list]]" = OrderedDict()   # key -> (expires_at, results)
+_stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expired': 0}
+
+
+def cache_key(query: str, limit: int, scope: str = '') -> str:
+    """
+    Normalised key: case-folded, whitespace-collapsed query plus the limit.
+
+    ``scope`` separates results that differ for the same query (API backend,
+    sandbox vs production).
+    """
+    normalized = ' '.join(str(query).casefold().split())
+    return f"{scope}|{int(limit)}|{normalized}"
+
+
+def lookup(key: str) -> list | None:
+    """
+    Return a copy of the cached results for ``key`` (possibly ``[]`` for a
+    cached empty search), or ``None`` on a miss.  Counts one hit or miss.
+    """
+    if not config.SEARCH_CACHE_ENABLED:
+        return None
+
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] <= now:
+            del _entries[key]
+            _stats['expired'] += 1
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+
+    if entry is None and config.SEARCH_CACHE_PERSIST:
+        entry = database.get_cached_search(key, now)
+        if entry is not None:
+            _remember(key, *entry)
+
+    if entry is None:
+        _count('misses')
+        return None
+
+    _count('hits' if entry[1] else 'negative_hits')
+    logger.debug("Search cache hit for %r", key)
+    return copy.deepcopy(entry[1])
+
+
+def store(key: str, results: list) -> None:
+    """Cache a search's results; an empty list uses the negative TTL."""
+    if not config.SEARCH_CACHE_ENABLED:
+        return
+    ttl = config.SEARCH_CACHE_TTL_SECONDS if results else config.SEARCH_CACHE_NEGATIVE_TTL_SECONDS
+    if ttl <= 0:
+        return
+
+    expires_at = time.time() + ttl
+    results = copy.deepcopy(results)
+    _remember(key, expires_at, results)
+    _count('stores')
+    if config.SEARCH_CACHE_PERSIST:
+        database.put_cached_search(key, results, expires_at, config.SEARCH_CACHE_MAX_ENTRIES)
+
+
+def clear() -> int:
+    """Drop every cached search (memory and SQLite); returns the number removed."""
+    with _lock:
+        removed = len(_entries)
+        _entries.clear()
+    if config.SEARCH_CACHE_PERSIST:
+        removed = max(removed, database.clear_search_cache())
+    return removed
+
+
+def stats() -> dict:
+    """Counters since process start, hit rate and the number of in-memory entries."""
+    with _lock:
+        snapshot = dict(_stats)
+        snapshot['entries'] = len(_entries)
+    served = snapshot['hits'] + snapshot['negative_hits']
+    lookups = served + snapshot['misses']
+    snapshot['hit_rate'] = round(served / lookups, 4) if lookups else 0.0
+    return snapshot
+
+
+def reset() -> None:
+    """Empty the in-memory cache and zero the counters (SQLite rows are kept)."""
+    with _lock:
+        _entries.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _remember(key: str, expires_at: float, results: list) -> None:
+    with _lock:
+        _entries[key] = (expires_at, results)
+        _entries.move_to_end(key)
+        while len(_entries) > max(1, config.SEARCH_CACHE_MAX_ENTRIES):
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
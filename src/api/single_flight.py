@@ -0,0 +1,116 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When a lot photo holds duplicate cards, or several uploads of the same
+popular card arrive at once, identical eBay searches would otherwise run in
+parallel.  A ``SingleFlight`` lets the first caller for a key (the leader)
+run the call while concurrent callers with the same key wait for it and
+share its result — or its exception.  Once the call finishes the key is
+forgotten, so later callers start a fresh call (or hit a cache).
+
+Each instance is one call site with its own ``calls`` / ``executions`` /
+``suppressed`` counters, reported together by ``metrics()``.
+"""
+import asyncio
+import threading
+import weakref
+
+_registry_lock = threading.Lock()
+_registry: dict[str, "SingleFlight"] = {}
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: dict = {}
+        # In-flight tasks per event loop (asyncio futures cannot cross loops)
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self._counters = {"calls": 0, "executions": 0, "suppressed": 0}
+        with _registry_lock:
+            _registry[name] = self
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing one execution with concurrent callers of ``key``."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            self._count(leader)
+
+        if leader:
+            try:
+                flight.result = fn()
+            except Exception as exc:
+                flight.error = exc
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    async def do_async(self, key, coro_fn):
+        """Async counterpart of ``do``: ``coro_fn()`` is awaited once per key and loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            leader = task is None
+            if leader:
+                task = tasks[key] = loop.create_task(coro_fn())
+                task.add_done_callback(lambda done: _forget(tasks, key, done))
+            self._count(leader)
+        # Shielded so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def _count(self, leader: bool) -> None:
+        self._counters["calls"] += 1
+        self._counters["executions" if leader else "suppressed"] += 1
+
+
+def metrics() -> dict:
+    """Counters for every call site, keyed by name."""
+    with _registry_lock:
+        flights = list(_registry.values())
+    return {flight.name: flight.metrics() for flight in flights}
+
+
+def reset() -> None:
+    with _registry_lock:
+        flights = list(_registry.values())
+    for flight in flights:
+        flight.reset()
+
+
+def _forget(tasks: dict, key, task) -> None:
+    if tasks.get(key) is task:
+        del tasks[key]
+    # Mark the outcome as retrieved even if every caller was cancelled
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,90 @@
+"""
+Incremental parser for streamed vision-model JSON.
+
+The model replies with either a single item object or ``{"cards": [...]}``.
+When the reply is streamed, ``CardStreamParser`` picks each object out of the
+``cards`` array the moment its closing brace arrives, so the eBay search for
+card 1 can start while the model is still writing card 2.
+"""
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CardStreamParser:
+    """
+    Feed text chunks in order; ``feed`` returns the card dicts completed by
+    that chunk.  ``text`` holds everything received so far for a final
+    whole-reply parse when no ``cards`` array was found.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._array_depth = None    # nesting depth inside the cards array
+        self._object_start = None   # index where the current card object began
+        self.cards_seen = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> list:
+        """Consume the next chunk of reply text; return newly completed cards."""
+        if not chunk:
+            return []
+        self._text += chunk
+        text = self._text
+        completed = []
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in '{[':
+                if ch == '[' and self._depth == 1 and self._last_key == 'cards':
+                    self._array_depth = self._depth + 1
+                elif ch == '{' and self._array_depth is not None and self._depth == self._array_depth:
+                    self._object_start = i
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if (
+                    ch == '}'
+                    and self._object_start is not None
+                    and self._depth == self._array_depth
+                ):
+                    card = self._decode(text[self._object_start:i + 1])
+                    if card is not None:
+                        completed.append(card)
+                    self._object_start = None
+                elif ch == ']' and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+
+        self._pos = len(text)
+        self.cards_seen += len(completed)
+        return completed
+
+    def _decode(self, fragment: str) -> dict | None:
+        try:
+            card = json.loads(fragment)
+        except ValueError:
+            logger.warning("Skipping unparseable streamed card: %.80s", fragment)
+            return None
+        return card if isinstance(card, dict) else None
@@ -0,0 +1,56 @@
+"""
+Low-memory JSON request body for large image uploads.
+
+Sending a photo with ``requests.post(json=payload)`` keeps the raw bytes,
+their base64 text, the data-URL f-string and the serialized JSON body in
+memory at once — roughly five copies of the image per request.
+``Base64JSONBody`` instead yields the JSON body in small chunks, base64-
+encoding the image (typically a read-only mmap of the upload) slice by
+slice as the socket drains, so a request holds about one chunk at a time.
+
+It matters when originals are uploaded (``IMAGE_PREPROCESS_ENABLED`` off,
+or an image preprocessing keeps as is): a preprocessed upload is a few
+hundred KB and goes as ``json=`` below ``STREAMING_BODY_MIN_BYTES``.  On
+that default path peak memory is bounded by decoding instead, which
+``image_prep`` and ``image_hash`` keep to reduced-scale JPEG decodes.
+"""
+import base64
+import json
+
+# Placeholder written where the base64 image data goes in the serialized payload
+IMAGE_PLACEHOLDER = "__IMAGE_BASE64__"
+
+# Raw bytes per chunk; a multiple of 3 so chunks base64-encode without padding
+_CHUNK_BYTES = 3 * 64 * 1024
+
+
+class Base64JSONBody:
+    """
+    Iterable request body: ``payload`` serialized as JSON with the single
+    ``IMAGE_PLACEHOLDER`` string value replaced by the base64 of ``image``.
+
+    ``len()`` is the exact body size, so requests sends a Content-Length
+    header rather than chunked encoding, and every ``iter()`` starts over,
+    so the body can be re-sent on retry.
+    """
+
+    def __init__(self, payload: dict, image, chunk_bytes: int = _CHUNK_BYTES):
+        serialized = json.dumps(payload)
+        if serialized.count(IMAGE_PLACEHOLDER) != 1:
+            raise ValueError("payload must contain the image placeholder exactly once")
+        prefix, suffix = serialized.split(IMAGE_PLACEHOLDER)
+        self._prefix = prefix.encode()
+        self._suffix = suffix.encode()
+        self._image = image
+        self._chunk_bytes = max(3, chunk_bytes - chunk_bytes % 3)
+
+    def __len__(self) -> int:
+        encoded = 4 * ((len(self._image) + 2) // 3)
+        return len(self._prefix) + encoded + len(self._suffix)
+
+    def __iter__(self):
+        yield self._prefix
+        # Slicing copies one chunk; no buffer export keeps an mmap from closing
+        for start in range(0, len(self._image), self._chunk_bytes):
+            yield base64.b64encode(self._image[start:start + self._chunk_bytes])
+        yield self._suffix
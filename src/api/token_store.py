@@ -0,0 +1,76 @@
+"""
+Encrypted persistence of OAuth access tokens in the settings store.
+
+A token kept only in module globals is lost on every restart, every
+``/api/settings`` reload and in every extra worker process, each of which
+then pays a blocking OAuth round-trip.  Here a token is stored (OS keychain,
+else the settings file) as a Fernet blob so every local process can reuse
+it until it expires.
+
+The encryption key is derived (HKDF-SHA256) from the API client secret, so
+only processes configured with the same credentials can read the token, and
+the record also names the client/environment it was issued for — changing
+credentials or switching sandbox/production never serves a stale token.
+
+``cryptography`` is optional: without it tokens are simply not persisted.
+"""
+import base64
+import json
+import logging
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    _HAS_CRYPTO = True
+except ImportError:
+    _HAS_CRYPTO = False
+
+import src.settings_store as settings_store
+
+logger = logging.getLogger(__name__)
+
+_KDF_INFO = b"cards4sale oauth token v1"
+
+
+def available() -> bool:
+    return _HAS_CRYPTO
+
+
+def load(name: str, secret: str, scope: str) -> tuple[str, float] | None:
+    """Return ``(access_token, expires_at)`` stored under ``name`` for ``scope``, or None."""
+    if not _HAS_CRYPTO or not secret:
+        return None
+    blob = settings_store.get_credential(name)
+    if not blob:
+        return None
+    try:
+        record = json.loads(_fernet(secret).decrypt(blob.encode()))
+    except (InvalidToken, ValueError) as exc:
+        logger.debug("Ignoring unreadable stored token %s: %s", name, exc)
+        return None
+    if record.get("scope") != scope:
+        return None
+    return record["access_token"], float(record["expires_at"])
+
+
+def save(name: str, secret: str, scope: str, access_token: str, expires_at: float) -> bool:
+    """Encrypt and store a token; returns False when it could not be persisted."""
+    if not _HAS_CRYPTO or not secret:
+        return False
+    record = {"scope": scope, "access_token": access_token, "expires_at": expires_at}
+    try:
+        settings_store.save_credential(name, _fernet(secret).encrypt(json.dumps(record).encode()).decode())
+        return True
+    except Exception as exc:
+        logger.warning("Could not persist token %s: %s", name, exc)
+        return False
+
+
+def clear(name: str) -> None:
+    settings_store.delete_credential(name)
+
+
+def _fernet(secret: str) -> "Fernet":
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=_KDF_INFO).derive(secret.encode())
+    return Fernet(base64.urlsafe_b64encode(key))
@@ -0,0 +1,106 @@
+"""
+Per-call accounting for OpenAI requests.
+
+Every vision call (single, streamed, packed, batch) and every text-only
+repair call is recorded in the ``vision_calls`` table with its model, token
+usage, image bytes sent, wall time, attempt count, cache status and an
+estimated cost, so image size, packing and model choice can be tuned
+against real numbers (``/api/metrics/vision``).  Cache hits are recorded
+too, with no tokens, so hit rates show up next to the calls they saved.
+
+Pricing and retention come from ``src.config`` at call time.
+"""
+import time
+
+import src.config as config
+from src import database
+
+# Cache status values for ``VisionCall.cache``; CACHE_NEAR is a near-duplicate hit
+CACHE_HIT, CACHE_NEAR, CACHE_MISS, CACHE_BYPASS, CACHE_OFF = "hit", "near", "miss", "bypass", "off"
+
+_BATCH_DISCOUNT = 0.5   # Batch API requests are billed at half price
+
+
+class VisionCall:
+    """
+    One OpenAI request being timed.
+
+    Create it just before sending, bump ``attempts`` from inside the
+    resilience ``send`` callable, then call ``finish`` exactly once.
+    """
+
+    def __init__(self, kind: str, model: str, image_bytes: int = 0, images: int = 1, cache: str = CACHE_MISS):
+        self.kind = kind
+        self.model = model
+        self.image_bytes = image_bytes
+        self.images = images
+        self.cache = cache
+        self.attempts = 0
+        self._started = time.perf_counter()
+
+    def finish(self, usage: dict | None = None, error: Exception | str | None = None) -> None:
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        record(
+            self.kind, self.model, usage=usage, image_bytes=self.image_bytes, images=self.images,
+            duration_ms=duration_ms, attempts=self.attempts, cache=self.cache, error=error,
+        )
+
+
+def record(
+    kind: str,
+    model: str,
+    usage: dict | None = None,
+    image_bytes: int = 0,
+    images: int = 1,
+    duration_ms: float | None = None,
+    attempts: int = 1,
+    cache: str = CACHE_MISS,
+    error: Exception | str | None = None,
+) -> None:
+    """Store one call record (no-op when ``VISION_METRICS_ENABLED`` is off)."""
+    if not config.VISION_METRICS_ENABLED:
+        return
+    usage = usage or {}
+    prompt_tokens = int(usage.get("prompt_tokens") or 0)
+    completion_tokens = int(usage.get("completion_tokens") or 0)
+    database.record_vision_call(
+        {
+            "kind": kind,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "image_bytes": image_bytes,
+            "images": images,
+            "duration_ms": duration_ms,
+            "attempts": attempts,
+            "cache": cache,
+            "success": error is None,
+            "cost_usd": cost(prompt_tokens, completion_tokens, batch=kind == "batch"),
+            "error": None if error is None else str(error)[:500],
+        },
+        retention_seconds=config.VISION_METRICS_RETENTION_DAYS * 86400,
+    )
+
+
+def record_cache_hit(kind: str, model: str, near: bool = False) -> None:
+    record(kind, model, duration_ms=0.0, attempts=0, cache=CACHE_NEAR if near else CACHE_HIT)
+
+
+def cost(prompt_tokens: int, completion_tokens: int, batch: bool = False) -> float:
+    """Estimated USD cost from the configured per-million-token prices."""
+    usd = (
+        prompt_tokens * config.OPENAI_INPUT_PRICE_PER_MTOK
+        + completion_tokens * config.OPENAI_OUTPUT_PRICE_PER_MTOK
+    ) / 1_000_000
+    return usd * _BATCH_DISCOUNT if batch else usd
+
+
+def rollup(hours: float | None = None) -> dict:
+    """Totals and per-kind/model/day breakdowns, optionally for the last ``hours``."""
+    since = None if hours is None else time.time() - hours * 3600
+    summary = database.get_vision_call_rollup(since)
+    for row in [summary["totals"], *summary["by_kind"], *summary["by_model"], *summary["by_day"]]:
+        if row.get("calls"):
+            row["cache_hit_rate"] = round(row["cache_hits"] / row["calls"], 4)
+            row["cost_usd"] = round(row["cost_usd"], 6)
+    return summary
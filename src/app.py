@@ -4,22 +4,50 @@ Provides a user-friendly interface to upload photos and generate listings
 """
 
 import importlib
+import json
 import logging
 import os
 import tempfile
 from werkzeug.utils import secure_filename
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-from src.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH, HIGH_VALUE_THRESHOLD
+from src.config import (
+    UPLOAD_FOLDER,
+    ALLOWED_EXTENSIONS,
+    MAX_CONTENT_LENGTH,
+    HIGH_VALUE_THRESHOLD,
+    PRICE_FALLBACK,
+    MAX_CARD_CONCURRENCY,
+    VISION_STREAMING,
+    VISION_PACK_SIZE,
+    CARD_SEGMENTATION_ENABLED,
+    CARD_SEGMENTATION_MIN_CARDS,
+    JOB_WORKERS,
+    JOB_MAX_PENDING,
+    JOB_MAX_RETAINED,
+    BATCH_CONCURRENCY,
+    BATCH_MAX_FILES,
+)
 from src.logging_config import configure_logging
 from src.validators import ImageValidator
-from src.api.openai_client import describe_image
-from src.api.ebay_client import search_ebay, suggest_price, build_listing_payload, publish_listing
+from src.services.executor import BoundedExecutor
+from src.services.lot_segmentation import with_card_segmentation, with_card_segmentation_stream
+from src.services.job_queue import JOB_FAILED, JOB_SUCCEEDED, JobQueue, JobQueueFullError
+from src.services.events import event_bus
+from src.exceptions import ListingGenerationError
+from src.api.openai_client import describe_image, describe_image_stream, describe_images_packed
+from src.api import analysis_cache, comps_index, http_session, rate_limit, resilience, search_cache, single_flight, vision_metrics
+from src.api.ebay_client import search_ebay, build_listing_payload, publish_listing
 from src.database import init_db, save_listing, get_all_listings, get_listing, update_listing_status, delete_listing, get_stats, record_publish_result
+from src.utils.pricing import estimate_price, weigh_comps
+from src.utils.relevance import filter_comps
 import src.settings_store as settings_store
 
 logger = logging.getLogger(__name__)
 
+_SSE_KEEPALIVE_SECONDS = 15
+_FINISHED_JOB_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
 
 def create_app():
     """Create and configure Flask application"""
@@ -40,6 +68,18 @@ def create_app():
 
     # Ensure upload folder exists
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    # Background workers for asynchronous uploads
+    job_queue = JobQueue(
+        max_workers=JOB_WORKERS,
+        max_pending=JOB_MAX_PENDING,
+        max_retained=JOB_MAX_RETAINED,
+        event_bus=event_bus,
+    )
+    app.extensions['job_queue'] = job_queue
+
+    # Keep the eBay OAuth token renewed so no request waits on a token call
+    _start_token_refresher()
     
     @app.route('/')
     def index():
@@ -122,7 +162,13 @@ def create_app():
     
     @app.route('/api/upload', methods=['POST'])
     def upload_file():
-        """Handle photo upload and initiate listing generation"""
+        """
+        Handle photo upload and initiate listing generation.
+
+        By default the request blocks until the pipeline finishes.  With
+        ``?async=true`` (or an ``async`` form field) the photo is queued and
+        the response is ``202`` with a job id to poll at ``/api/jobs/<id>``.
+        """
         if 'photo' not in request.files:
             return jsonify({'error': 'No photo provided'}), 400
 
@@ -140,30 +186,201 @@ def create_app():
         if not is_valid:
             return jsonify({'error': err_msg}), 400
 
+        if _wants_async():
+            return _enqueue_upload(file, original_filename)
+
         # Save to a guaranteed-unique temp file; always cleaned up even on crash
-        suffix = os.path.splitext(original_filename)[1] or '.jpg'
         tmp_path = None
         try:
-            with tempfile.NamedTemporaryFile(
-                suffix=suffix,
-                dir=app.config['UPLOAD_FOLDER'],
-                delete=False,
-            ) as tmp:
-                tmp_path = tmp.name
-                file.save(tmp_path)
-
+            tmp_path = _save_upload(file, original_filename)
             result = process_listing(tmp_path, original_filename)
 
         except Exception:
             logger.exception("Upload pipeline failed for %s", original_filename)
             return jsonify({'error': 'Processing failed. Please try again.'}), 500
         finally:
-            if tmp_path and os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            _remove_upload(tmp_path)
 
         status_code = 200 if result.get('success') else 500
         return jsonify(result), status_code
-    
+
+    @app.route('/api/upload/batch', methods=['POST'])
+    def upload_batch():
+        """
+        Handle many photos in one multipart request (field ``photos``).
+
+        Photos are processed concurrently, at most ``BATCH_CONCURRENCY`` at a
+        time, and the response lists one result per file in upload order.
+        With ``?async=true`` the whole batch runs as one background job.
+        """
+        files = [f for f in request.files.getlist('photos') if f.filename]
+        if not files:
+            return jsonify({'error': 'No photos provided'}), 400
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({'error': f'Too many photos (max {BATCH_MAX_FILES} per batch)'}), 400
+
+        entries = []  # (filename, tmp_path | None, validation error | None)
+
+        def cleanup():
+            for _, tmp_path, _ in entries:
+                _remove_upload(tmp_path)
+
+        try:
+            for file in files:
+                original_filename = secure_filename(file.filename)
+                is_valid, err_msg = ImageValidator.validate_upload(
+                    original_filename, _upload_size(file)
+                )
+                if is_valid:
+                    entries.append((original_filename, _save_upload(file, original_filename), None))
+                else:
+                    entries.append((original_filename, None, err_msg))
+        except Exception:
+            logger.exception("Saving batch upload failed")
+            cleanup()
+            return jsonify({'error': 'Processing failed. Please try again.'}), 500
+
+        if _wants_async():
+            job_id = job_queue.new_job_id()
+            try:
+                job_queue.submit(
+                    lambda: process_batch(entries, topic=job_id),
+                    label=f'batch of {len(entries)}',
+                    cleanup=cleanup,
+                    job_id=job_id,
+                )
+            except JobQueueFullError:
+                cleanup()
+                return jsonify({'error': 'Server is busy. Please retry shortly.'}), 503
+            return _accepted(job_id)
+
+        try:
+            result = process_batch(entries)
+        finally:
+            cleanup()
+        status_code = 200 if result['succeeded'] else 500
+        return jsonify(result), status_code
+
+    def _upload_size(file):
+        """Return the uploaded file's size without reading it into memory."""
+        try:
+            file.stream.seek(0, os.SEEK_END)
+            size = file.stream.tell()
+            file.stream.seek(0)
+            return size
+        except (AttributeError, OSError):
+            return 1  # unknown — the web server still enforces MAX_CONTENT_LENGTH
+
+    def _wants_async():
+        flag = request.args.get('async') or request.form.get('async') or ''
+        return flag.lower() in ('true', '1', 'yes', 'on')
+
+    def _save_upload(file, original_filename):
+        suffix = os.path.splitext(original_filename)[1] or '.jpg'
+        with tempfile.NamedTemporaryFile(
+            suffix=suffix,
+            dir=app.config['UPLOAD_FOLDER'],
+            delete=False,
+        ) as tmp:
+            tmp_path = tmp.name
+        file.save(tmp_path)
+        return tmp_path
+
+    def _enqueue_upload(file, original_filename):
+        tmp_path = _save_upload(file, original_filename)
+        job_id = job_queue.new_job_id()
+        try:
+            job_queue.submit(
+                lambda: process_listing(tmp_path, original_filename, topic=job_id),
+                label=original_filename,
+                cleanup=lambda: _remove_upload(tmp_path),
+                job_id=job_id,
+            )
+        except JobQueueFullError:
+            _remove_upload(tmp_path)
+            return jsonify({'error': 'Server is busy. Please retry shortly.'}), 503
+
+        return _accepted(job_id)
+
+    def _accepted(job_id):
+        """202 response pointing the client at the job status URL."""
+        status_url = f'/api/jobs/{job_id}'
+        response = jsonify({
+            'success': True,
+            'job_id': job_id,
+            'state': 'queued',
+            'status_url': status_url,
+        })
+        response.headers['Location'] = status_url
+        return response, 202
+
+    # ── Job routes ────────────────────────────────────────────────────────────
+
+    @app.route('/api/jobs', methods=['GET'])
+    def list_jobs():
+        """List retained background jobs (newest first, without results)."""
+        return jsonify(job_queue.list()), 200
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """
+        Return a background job's state and, once finished, its result.
+
+        ``?wait=<seconds>`` long-polls (capped at 30 s) until the job finishes.
+        """
+        try:
+            wait = min(float(request.args.get('wait', 0)), 30.0)
+        except ValueError:
+            return jsonify({'error': 'Invalid wait value'}), 400
+
+        job = job_queue.wait(job_id, timeout=wait) if wait > 0 else job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job), 200
+
+    @app.route('/api/jobs/<job_id>/events', methods=['GET'])
+    def job_events(job_id):
+        """
+        Server-Sent Events stream of a job's pipeline progress.
+
+        Emits ``analyzed``, ``comps_fetched``, ``priced``, ``saved`` (with the
+        listing draft), ``card_failed`` and ``completed`` events as each stage
+        finishes, plus ``job`` events for state changes.  The stream closes
+        once the job has succeeded or failed; for a job that already has, it
+        replays the history and closes at once.
+        """
+        if job_queue.get(job_id) is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        subscription = event_bus.subscribe(job_id)
+        # Read after subscribing, so a job finishing in between is not missed
+        job = job_queue.get(job_id)
+        finished = job is None or job['state'] in _FINISHED_JOB_STATES
+
+        def stream():
+            try:
+                while True:
+                    event = subscription.get(timeout=0 if finished else _SSE_KEEPALIVE_SECONDS)
+                    if event is None:
+                        if not finished:
+                            yield ': keep-alive\n\n'
+                            continue
+                        # History ended without the terminal event: send the job's final state
+                        if job is not None:
+                            yield _sse_message(_final_job_event(job))
+                        break
+                    yield _sse_message(event)
+                    if event['event'] == 'job' and event['state'] in _FINISHED_JOB_STATES:
+                        break
+            finally:
+                subscription.close()
+
+        return Response(
+            stream_with_context(stream()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
     @app.route('/downloads/<filename>')
     def download_file(filename):
         """Download listing as JSON"""
@@ -177,6 +394,63 @@ def create_app():
         """Health check endpoint for desktop/mobile connectivity checks"""
         return jsonify({'status': 'ok', 'version': '1.0.0'}), 200
 
+    @app.route('/api/cache/analysis', methods=['GET'])
+    def analysis_cache_stats():
+        """Vision analysis cache counters (hits, near hits, misses, bypassed, entries)."""
+        return jsonify(analysis_cache.stats()), 200
+
+    @app.route('/api/cache/analysis', methods=['DELETE'])
+    def analysis_cache_clear():
+        """Drop every cached vision analysis."""
+        return jsonify({'success': True, 'removed': analysis_cache.clear()}), 200
+
+    @app.route('/api/cache/search', methods=['GET'])
+    def search_cache_stats():
+        """eBay search cache counters (hits, negative hits, misses, evictions, hit rate)."""
+        return jsonify(search_cache.stats()), 200
+
+    @app.route('/api/cache/search', methods=['DELETE'])
+    def search_cache_clear():
+        """Drop every cached eBay search."""
+        return jsonify({'success': True, 'removed': search_cache.clear()}), 200
+
+    @app.route('/api/cache/comps', methods=['GET'])
+    def comps_index_stats():
+        """Local comparables index: indexed comps, lookups answered locally, hit rate."""
+        return jsonify(comps_index.stats()), 200
+
+    @app.route('/api/cache/comps', methods=['DELETE'])
+    def comps_index_clear():
+        """Drop every indexed comparable listing."""
+        return jsonify({'success': True, 'removed': comps_index.clear()}), 200
+
+    @app.route('/api/metrics/ratelimits', methods=['GET'])
+    def rate_limit_metrics():
+        """Per eBay API: bucket rate/burst, current wait, daily quota left and wait counters."""
+        return jsonify(rate_limit.metrics()), 200
+
+    @app.route('/api/metrics/singleflight', methods=['GET'])
+    def single_flight_metrics():
+        """Per call site: calls, executions and duplicate calls suppressed by coalescing."""
+        return jsonify(single_flight.metrics()), 200
+
+    @app.route('/api/metrics/vision', methods=['GET'])
+    def vision_metrics_rollup():
+        """
+        Vision call accounting: totals and per-kind/model/day breakdowns of
+        tokens, image bytes, latency, retries, cache hits and estimated cost.
+        Optional ``?hours=N`` limits the window.
+        """
+        hours = request.args.get('hours', type=float)
+        if hours is not None and hours <= 0:
+            return jsonify({'error': 'hours must be positive'}), 400
+        return jsonify(vision_metrics.rollup(hours)), 200
+
+    @app.route('/api/metrics/resilience', methods=['GET'])
+    def resilience_metrics():
+        """Per-host circuit-breaker state, transitions and retry counters."""
+        return jsonify(resilience.metrics()), 200
+
     # ── Settings routes ───────────────────────────────────────────────────────
 
     @app.route('/settings')
@@ -266,6 +540,8 @@ def create_app():
         importlib.reload(config_mod)
         importlib.reload(openai_mod)
         importlib.reload(ebay_mod)
+        http_session.reset()
+        _start_token_refresher()
         logger.info("Settings saved and modules reloaded")
 
         return jsonify({'success': True}), 200
@@ -281,9 +557,8 @@ def create_app():
                 'message': 'Mock mode active — no API call made',
             }), 200
         try:
-            import requests as req
-            resp = req.get(
-                'https://api.openai.com/v1/models',
+            resp = http_session.get(
+                f'{cfg.OPENAI_BASE_URL}/models',
                 headers={'Authorization': f'Bearer {cfg.OPENAI_API_KEY}'},
                 timeout=8,
             )
@@ -366,18 +641,53 @@ def _build_listing_title(analysis):
     return f"{brand} {model}".strip()
 
 
-def generate_listing_from_analysis(analysis, filename):
+def _sse_message(event):
+    """Format a bus event as one Server-Sent Events message."""
+    head = f"id: {event['seq']}\n" if 'seq' in event else ''
+    return f"{head}event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _final_job_event(job):
+    """``job`` event for a finished job whose terminal event is no longer in history."""
+    data = {
+        'event': 'job', 'topic': job['job_id'], 'time': job['finished_at'],
+        'job_id': job['job_id'], 'state': job['state'],
+    }
+    if job['error']:
+        data['error'] = job['error']
+    return data
+
+
+def _emit(topic, event, **data):
+    """Publish a pipeline progress event when the caller asked for one."""
+    if topic:
+        event_bus.publish(topic, event, data)
+
+
+def generate_listing_from_analysis(analysis, filename, topic=None, index=0):
     """Generate and persist one listing from one analyzed item/card."""
     search_query = build_search_query(analysis)
     listings = search_ebay(search_query, limit=8)
-    suggested_price = suggest_price(listings)
+    _emit(topic, 'comps_fetched', filename=filename, index=index, count=len(listings))
+    relevant = filter_comps(listings, analysis)
+    weighted = weigh_comps(relevant, condition=analysis.get('condition'), reference=search_query)
+    estimate = estimate_price(weighted)
+    suggested_price = estimate.price
+    price_confidence = estimate.summary()
 
     if suggested_price is None:
-        suggested_price = 5.00
+        suggested_price = PRICE_FALLBACK
         price_warning = True
     else:
         price_warning = False
 
+    _emit(
+        topic, 'priced',
+        filename=filename, index=index,
+        suggested_price=suggested_price, price_warning=price_warning,
+        price_confidence=price_confidence,
+    )
+
     title = _build_listing_title(analysis)
     payload = build_listing_payload(
         title=title,
@@ -396,24 +706,44 @@ def generate_listing_from_analysis(analysis, filename):
     )
 
     if listing_id is None:
-        raise RuntimeError("Failed to save listing to database")
+        raise ListingGenerationError(
+            stage='save_listing',
+            reason='Database returned None for listing_id',
+        )
 
-    return {
+    result = {
         'listing_id': listing_id,
         'analysis': analysis,
         'comparable_listings': listings,
         'suggested_price': suggested_price,
         'price_warning': price_warning,
+        'price_confidence': price_confidence,
         'is_high_value': suggested_price >= HIGH_VALUE_THRESHOLD,
         'payload': payload,
     }
+    _emit(topic, 'saved', filename=filename, index=index, listing=result)
+    return result
+
+
+def _remove_upload(path):
+    """Delete an uploaded temp file if it still exists."""
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def _start_token_refresher():
+    """Run the eBay token refresher when real eBay credentials are configured."""
+    import src.api.ebay_client as ebay_mod
+    if not ebay_mod.USE_EBAY_MOCK and ebay_mod.EBAY_CLIENT_ID and ebay_mod.EBAY_CLIENT_SECRET:
+        ebay_mod.start_token_refresher()
+
 
 def allowed_file(filename):
     """Check if uploaded file is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def process_listing(image_path, filename='unknown.jpg'):
+def process_listing(image_path, filename='unknown.jpg', topic=None, analysis=None):
     """
     Process image through complete pipeline.
 
@@ -425,16 +755,68 @@ def process_listing(image_path, filename='unknown.jpg'):
             'count': int,
             'high_value_threshold': float,
             'message': str,
+            'errors': [{'index': int, 'stage': str, 'error': str}, ...],
         }
 
+    Cards from a multi-card photo are searched, priced and saved concurrently
+    (at most ``MAX_CARD_CONCURRENCY`` at a time) and listings keep card order.
+    A card that fails is reported in ``errors`` without discarding the others.
+
+    When ``topic`` is given, progress events are published to it on the shared
+    event bus as each stage finishes (see ``/api/jobs/<id>/events``).
+
+    With ``VISION_STREAMING`` enabled the vision reply is streamed and each
+    card's search starts as soon as the card is parsed (``card_detected``).
+
+    With ``CARD_SEGMENTATION_ENABLED`` a lot photo is split into per-card crops
+    locally and each crop gets its own (concurrent) vision call, streamed or
+    not; a streamed upload's cards then arrive once the crops are described.
+
+    Pass ``analysis`` when the photo was already analysed (e.g. by an offline
+    batch run) to skip the vision call.
+
     On failure ``listings`` is ``[]`` and an ``'error'`` key is present.
     """
     try:
-        logger.info("Analyzing uploaded image...")
-        image_analysis = describe_image(image_path)
-        analyses = normalize_analysis_cards(image_analysis)
+        executor = BoundedExecutor(MAX_CARD_CONCURRENCY)
+
+        def generate(item):
+            return generate_listing_from_analysis(item[1], filename, topic=topic, index=item[0])
+
+        if analysis is None and VISION_STREAMING:
+            logger.info("Analyzing uploaded image (streamed)...")
+            analyses = []
+            describe_stream = describe_image_stream
+            if CARD_SEGMENTATION_ENABLED:
+                describe_stream = with_card_segmentation_stream(
+                    describe_image_stream, describe_image, MAX_CARD_CONCURRENCY, CARD_SEGMENTATION_MIN_CARDS
+                )
+
+            def arrivals():
+                # Each card goes to the search stage while later ones are still streaming
+                for analysis in describe_stream(image_path):
+                    analyses.append(analysis)
+                    _emit(topic, 'card_detected', filename=filename, index=len(analyses) - 1)
+                    yield len(analyses) - 1, analysis
+
+            outcomes = executor.map_stream(generate, arrivals())
+            _emit(topic, 'analyzed', filename=filename, cards=len(analyses))
+        else:
+            if analysis is None:
+                logger.info("Analyzing uploaded image...")
+                if CARD_SEGMENTATION_ENABLED:
+                    analysis = with_card_segmentation(
+                        describe_image, MAX_CARD_CONCURRENCY, CARD_SEGMENTATION_MIN_CARDS
+                    )(image_path)
+                else:
+                    analysis = describe_image(image_path)
+            analyses = normalize_analysis_cards(analysis)
+            _emit(topic, 'analyzed', filename=filename, cards=len(analyses))
+            logger.info("Searching eBay for similar items...")
+            outcomes = executor.map(generate, list(enumerate(analyses)))
 
         if not analyses:
+            _emit(topic, 'completed', filename=filename, success=False, count=0)
             return {
                 'success': False,
                 'listings': [],
@@ -444,22 +826,49 @@ def process_listing(image_path, filename='unknown.jpg'):
                 'message': '❌ Could not identify any items in the photo',
             }
 
-        logger.info("Searching eBay for similar items...")
-        results = [generate_listing_from_analysis(analysis, filename) for analysis in analyses]
+        results = [value for value, error in outcomes if error is None]
+        errors = [
+            {
+                'index': index,
+                'stage': getattr(error, 'stage', 'generate'),
+                'error': 'Failed to generate listing',
+            }
+            for index, (_, error) in enumerate(outcomes)
+            if error is not None
+        ]
+        for card_error in errors:
+            _emit(topic, 'card_failed', filename=filename, index=card_error['index'], stage=card_error['stage'])
+        _emit(topic, 'completed', filename=filename, success=bool(results), count=len(results))
+
+        if not results:
+            return {
+                'success': False,
+                'listings': [],
+                'count': 0,
+                'high_value_threshold': HIGH_VALUE_THRESHOLD,
+                'errors': errors,
+                'error': 'Failed to generate listing',
+                'message': '❌ Failed to generate listing',
+            }
+
         count = len(results)
         msg = (
             f"✅ Generated {count} listing draft{'s' if count != 1 else ''} from one photo."
         )
+        if errors:
+            msg += f" {len(errors)} item(s) failed."
         return {
             'success': True,
             'listings': results,
             'count': count,
             'high_value_threshold': HIGH_VALUE_THRESHOLD,
+            'errors': errors,
             'message': msg,
         }
 
     except Exception as e:
         logger.exception("Error processing listing for %s", filename)
+        _emit(topic, 'completed', filename=filename, success=False, count=0)
         return {
             'success': False,
             'listings': [],
@@ -470,6 +879,75 @@ def process_listing(image_path, filename='unknown.jpg'):
         }
 
 
+def process_batch(entries, topic=None):
+    """
+    Run ``process_listing`` for several saved uploads concurrently.
+
+    ``entries`` is a list of ``(filename, image_path, validation_error)``
+    tuples; entries with a validation error are reported without running the
+    pipeline.  Progress events for every photo go to ``topic`` when given.
+
+    With ``VISION_PACK_SIZE`` above 1 the photos are first analysed in packs
+    of that many per vision request; each photo then continues through the
+    pipeline with its own analysis.
+
+    Returns::
+
+        {
+            'success': bool,            # True when at least one photo succeeded
+            'results': [{'filename': str, **process_listing result}, ...],
+            'total': int,
+            'succeeded': int,
+            'failed': int,
+        }
+    """
+    executor = BoundedExecutor(BATCH_CONCURRENCY)
+    analyses = _pack_analyses(executor, entries) if VISION_PACK_SIZE > 1 else {}
+
+    def run(entry):
+        filename, image_path, error = entry
+        if error:
+            return {'filename': filename, 'success': False, 'listings': [], 'count': 0, 'error': error}
+        if image_path in analyses:
+            return {'filename': filename, **process_listing(image_path, filename, topic=topic, analysis=analyses[image_path])}
+        return {'filename': filename, **process_listing(image_path, filename, topic=topic)}
+
+    outcomes = executor.map(run, entries)
+    results = []
+    for (filename, _, _), (value, error) in zip(entries, outcomes):
+        if error is not None:
+            value = {
+                'filename': filename,
+                'success': False,
+                'listings': [],
+                'count': 0,
+                'error': 'Failed to generate listing',
+            }
+        results.append(value)
+
+    succeeded = sum(1 for r in results if r.get('success'))
+    return {
+        'success': succeeded > 0,
+        'results': results,
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+    }
+
+
+def _pack_analyses(executor, entries):
+    """Analyse the valid photos ``VISION_PACK_SIZE`` per request; returns ``{image_path: analysis}``."""
+    paths = [image_path for _, image_path, error in entries if not error]
+    packs = [paths[start:start + VISION_PACK_SIZE] for start in range(0, len(paths), VISION_PACK_SIZE)]
+    analyses = {}
+    for pack, (value, error) in zip(packs, executor.map(describe_images_packed, packs)):
+        if error is not None:
+            logger.warning("Packed analysis failed for %d photo(s): %s", len(pack), error)
+            continue
+        analyses.update(zip(pack, value))
+    return analyses
+
+
 def format_description(analysis):
     """Format image analysis into eBay listing description"""
     parts = []
@@ -18,6 +18,82 @@ def _parse_bool(value: str | None, default: bool = False) -> bool:
 # OpenAI
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = "gpt-4o-mini"  # Vision-enabled model
+# API root for chat completions, files and batches (override for a proxy or local stand-in)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+
+# Ask for strict JSON-schema output from the vision model, and repair a malformed reply
+# with a cheap text-only call instead of re-running the vision request
+OPENAI_STRUCTURED_OUTPUT = _parse_bool(os.getenv("OPENAI_STRUCTURED_OUTPUT"), default=True)
+ANALYSIS_REPAIR_ENABLED = _parse_bool(os.getenv("ANALYSIS_REPAIR_ENABLED"), default=True)
+
+# Per-call OpenAI accounting (vision_calls table, /api/metrics/vision)
+VISION_METRICS_ENABLED = _parse_bool(os.getenv("VISION_METRICS_ENABLED"), default=True)
+VISION_METRICS_RETENTION_DAYS = int(os.getenv("VISION_METRICS_RETENTION_DAYS", "90"))
+# USD per million tokens used for cost estimates (defaults: gpt-4o-mini list prices)
+OPENAI_INPUT_PRICE_PER_MTOK = float(os.getenv("OPENAI_INPUT_PRICE_PER_MTOK", "0.15"))
+OPENAI_OUTPUT_PRICE_PER_MTOK = float(os.getenv("OPENAI_OUTPUT_PRICE_PER_MTOK", "0.60"))
+
+# Offline bulk analysis via the Batch API (python -m src.main batch <folder>)
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+# Requests are split across several batch input files above this size
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(190 * 1024 * 1024)))
+
+# Keep-alive connections pooled per API host (OpenAI, eBay OAuth/Finding/Inventory)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# Outbound call resilience — jittered exponential back-off, retry budget, circuit breaker
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "20"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# eBay rate limits — token buckets (calls/second, burst size) per API, plus a daily quota
+EBAY_FINDING_RATE = float(os.getenv("EBAY_FINDING_RATE", "5"))
+EBAY_FINDING_BURST = int(os.getenv("EBAY_FINDING_BURST", "10"))
+EBAY_FINDING_DAILY_QUOTA = int(os.getenv("EBAY_FINDING_DAILY_QUOTA", "5000"))  # 0 = unlimited
+EBAY_INVENTORY_RATE = float(os.getenv("EBAY_INVENTORY_RATE", "5"))
+EBAY_INVENTORY_BURST = int(os.getenv("EBAY_INVENTORY_BURST", "10"))
+EBAY_OAUTH_RATE = float(os.getenv("EBAY_OAUTH_RATE", "1"))
+EBAY_OAUTH_BURST = int(os.getenv("EBAY_OAUTH_BURST", "2"))
+EBAY_BROWSE_RATE = float(os.getenv("EBAY_BROWSE_RATE", "5"))
+EBAY_BROWSE_BURST = int(os.getenv("EBAY_BROWSE_BURST", "10"))
+EBAY_BROWSE_DAILY_QUOTA = int(os.getenv("EBAY_BROWSE_DAILY_QUOTA", "5000"))  # 0 = unlimited
+# Where limiter state lives: memory (this process) or sqlite (shared by all local workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+
+# eBay OAuth token — persisted encrypted in the settings store and renewed in the background
+EBAY_TOKEN_PERSIST = _parse_bool(os.getenv("EBAY_TOKEN_PERSIST"), default=True)
+EBAY_TOKEN_REFRESH_ENABLED = _parse_bool(os.getenv("EBAY_TOKEN_REFRESH_ENABLED"), default=True)
+EBAY_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("EBAY_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+# eBay comparable search — finding (legacy, one small page) or browse (item_summary, paged)
+EBAY_SEARCH_BACKEND = os.getenv("EBAY_SEARCH_BACKEND", "finding").lower()
+# Browse: items per page (max 200) and comparables collected per search
+EBAY_BROWSE_PAGE_SIZE = int(os.getenv("EBAY_BROWSE_PAGE_SIZE", "50"))
+EBAY_BROWSE_MAX_RESULTS = int(os.getenv("EBAY_BROWSE_MAX_RESULTS", "200"))
+# Result pages fetched at the same time after the first one
+EBAY_SEARCH_CONCURRENCY = int(os.getenv("EBAY_SEARCH_CONCURRENCY", "4"))
+
+# Local comparables index — every fetched comp kept in SQLite (FTS5); searches with
+# enough fresh matches are answered locally instead of calling eBay
+COMPS_INDEX_ENABLED = _parse_bool(os.getenv("COMPS_INDEX_ENABLED"), default=True)
+COMPS_INDEX_MIN_MATCHES = int(os.getenv("COMPS_INDEX_MIN_MATCHES", "8"))
+# ...and at least this fraction of the results the search asks for (200 for Browse by default)
+COMPS_INDEX_MIN_COVERAGE = float(os.getenv("COMPS_INDEX_MIN_COVERAGE", "0.5"))
+COMPS_INDEX_MAX_AGE_SECONDS = int(os.getenv("COMPS_INDEX_MAX_AGE_SECONDS", str(3 * 86400)))
+COMPS_INDEX_RETENTION_DAYS = int(os.getenv("COMPS_INDEX_RETENTION_DAYS", "90"))
+
+# Vision upload preprocessing — EXIF rotate, downscale and re-encode before sending
+IMAGE_PREPROCESS_ENABLED = _parse_bool(os.getenv("IMAGE_PREPROCESS_ENABLED"), default=True)
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "1536"))
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").upper()  # JPEG or WEBP
+IMAGE_OUTPUT_QUALITY = int(os.getenv("IMAGE_OUTPUT_QUALITY", "85"))
+# Vision detail level sent with each image: low, high or auto (empty = API default)
+OPENAI_IMAGE_DETAIL = os.getenv("OPENAI_IMAGE_DETAIL", "").lower()
+# Images at least this large (after preprocessing) are streamed to OpenAI chunk by chunk;
+# preprocessed uploads rarely are, so this mainly serves IMAGE_PREPROCESS_ENABLED=False
+STREAMING_BODY_MIN_BYTES = int(os.getenv("STREAMING_BODY_MIN_BYTES", str(1024 * 1024)))
 
 # eBay
 EBAY_CLIENT_ID = os.getenv("EBAY_CLIENT_ID")
@@ -56,6 +132,51 @@ USE_EBAY_MOCK = _parse_bool(os.getenv("USE_EBAY_MOCK"), default=True)
 
 # Business logic thresholds
 HIGH_VALUE_THRESHOLD = float(os.getenv("HIGH_VALUE_THRESHOLD", "20.0"))
+# Price used when no comparable listing has a usable price (flagged with a price warning)
+PRICE_FALLBACK = float(os.getenv("PRICE_FALLBACK", "5.00"))
+# Comparables further than this robust z-score (median/MAD) from the rest are ignored
+PRICE_OUTLIER_Z = float(os.getenv("PRICE_OUTLIER_Z", "3.5"))
+# Comparables scoring below this fraction of the best comp's title relevance are not priced from (0 keeps all)
+PRICE_MIN_RELEVANCE = float(os.getenv("PRICE_MIN_RELEVANCE", "0.5"))
+
+# Pipeline concurrency — max cards from one photo searched/priced/saved at once
+MAX_CARD_CONCURRENCY = int(os.getenv("MAX_CARD_CONCURRENCY", "4"))
+
+# Stream the vision reply and start each card's eBay search as soon as it is parsed
+VISION_STREAMING = _parse_bool(os.getenv("VISION_STREAMING"), default=False)
+
+# Photos packed into one vision request for batch uploads (1 = one request per photo)
+VISION_PACK_SIZE = int(os.getenv("VISION_PACK_SIZE", "1"))
+
+# Split lot photos into per-card crops locally and analyse each crop on its own
+CARD_SEGMENTATION_ENABLED = _parse_bool(os.getenv("CARD_SEGMENTATION_ENABLED"), default=False)
+# Fewer detected cards than this and the whole photo is analysed as before
+CARD_SEGMENTATION_MIN_CARDS = int(os.getenv("CARD_SEGMENTATION_MIN_CARDS", "2"))
+
+# Vision analysis cache — repeat uploads of the same photo skip the vision call
+ANALYSIS_CACHE_ENABLED = _parse_bool(os.getenv("ANALYSIS_CACHE_ENABLED"), default=True)
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "5000"))
+# Reuse the analysis of a perceptually similar photo (64-bit dHash, max differing bits; -1 disables)
+ANALYSIS_CACHE_PHASH_DISTANCE = int(os.getenv("ANALYSIS_CACHE_PHASH_DISTANCE", "6"))
+
+# eBay comparable-search cache — repeat searches within the TTL skip the API call
+SEARCH_CACHE_ENABLED = _parse_bool(os.getenv("SEARCH_CACHE_ENABLED"), default=True)
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+# Searches that found nothing are remembered for a shorter time
+SEARCH_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_NEGATIVE_TTL_SECONDS", "600"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+# Also keep entries in SQLite so a restart starts with a warm cache
+SEARCH_CACHE_PERSIST = _parse_bool(os.getenv("SEARCH_CACHE_PERSIST"), default=False)
+
+# Background job queue for asynchronous uploads (/api/upload?async=true)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_MAX_RETAINED = int(os.getenv("JOB_MAX_RETAINED", "500"))
+
+# Batch uploads (/api/upload/batch) — photos processed concurrently per request
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
 
 # Upload configuration
 MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "16"))
@@ -5,6 +5,7 @@ Database models and operations for managing eBay listings
 import logging
 import sqlite3
 import json
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -85,6 +86,13 @@ def init_db():
             "CREATE INDEX IF NOT EXISTS idx_listings_created_at ON listings (created_at DESC)"
         )
 
+        _ensure_analysis_cache(conn)
+        _ensure_search_cache(conn)
+        _ensure_vision_calls(conn)
+        try:
+            _ensure_comps(conn)
+        except sqlite3.OperationalError as e:
+            logger.warning("Local comparables index unavailable: %s", e)
 
 
 def save_listing(title, filename, analysis, comparable_listings, suggested_price, payload):
@@ -295,3 +303,488 @@ def record_publish_result(listing_id, published, external_listing_id=None, error
     except Exception as e:
         logger.error("Error recording publish result: %s", e)
         return False
+
+
+# ---------------------------------------------------------------------------
+# Vision analysis cache — describe_image results keyed by image content hash
+# ---------------------------------------------------------------------------
+
+def _ensure_analysis_cache(conn):
+    """Create the analysis_cache table (also called lazily by the cache helpers)."""
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            cache_key TEXT PRIMARY KEY,
+            analysis TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL,
+            hit_count INTEGER DEFAULT 0,
+            phash TEXT,
+            scope TEXT
+        )
+        '''
+    )
+    # Backfill the perceptual-hash columns for caches created before they existed;
+    # rows without a scope are never served as near duplicates
+    cursor = conn.execute("PRAGMA table_info(analysis_cache)")
+    columns = {row[1] for row in cursor.fetchall()}
+    for column in ("phash", "scope"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE analysis_cache ADD COLUMN {column} TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_accessed ON analysis_cache (last_accessed)"
+    )
+
+
+def get_cached_analysis(cache_key, max_age_seconds):
+    """
+    Return the cached analysis for ``cache_key``, or None on a miss.
+
+    Entries older than ``max_age_seconds`` are deleted and count as a miss; a
+    hit refreshes ``last_accessed`` so LRU eviction keeps it.
+    """
+    try:
+        now = time.time()
+        with get_db_connection() as conn:
+            _ensure_analysis_cache(conn)
+            row = conn.execute(
+                "SELECT analysis, created_at FROM analysis_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if not row:
+                return None
+            if max_age_seconds is not None and now - row[1] > max_age_seconds:
+                conn.execute("DELETE FROM analysis_cache WHERE cache_key = ?", (cache_key,))
+                return None
+            conn.execute(
+                '''
+                UPDATE analysis_cache
+                SET last_accessed = ?, hit_count = hit_count + 1
+                WHERE cache_key = ?
+                ''',
+                (now, cache_key),
+            )
+        return json.loads(row[0])
+    except Exception as e:
+        logger.error("Error reading analysis cache: %s", e)
+        return None
+
+
+def put_cached_analysis(cache_key, analysis, max_entries, phash=None, scope=None):
+    """
+    Store an analysis and evict least-recently-used rows beyond ``max_entries``.
+
+    ``phash`` is the image's perceptual hash as a hex string, used for
+    near-duplicate lookups among rows of the same ``scope`` (model + prompt).
+    """
+    try:
+        now = time.time()
+        with get_db_connection() as conn:
+            _ensure_analysis_cache(conn)
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO analysis_cache
+                (cache_key, analysis, created_at, last_accessed, hit_count, phash, scope)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+                ''',
+                (cache_key, json.dumps(analysis), now, now, phash, scope),
+            )
+            conn.execute(
+                '''
+                DELETE FROM analysis_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM analysis_cache
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+                ''',
+                (max(0, int(max_entries)),),
+            )
+        return True
+    except Exception as e:
+        logger.error("Error writing analysis cache: %s", e)
+        return False
+
+
+def get_analysis_phashes(scope):
+    """Return ``(cache_key, phash)`` pairs for every cached analysis in ``scope`` that has one."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_analysis_cache(conn)
+            cursor = conn.execute(
+                "SELECT cache_key, phash FROM analysis_cache WHERE phash IS NOT NULL AND scope = ?",
+                (scope,),
+            )
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error("Error reading analysis cache hashes: %s", e)
+        return []
+
+
+def get_analysis_cache_size():
+    """Return the number of cached analyses."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_analysis_cache(conn)
+            return conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+    except Exception as e:
+        logger.error("Error counting analysis cache: %s", e)
+        return 0
+
+
+def clear_analysis_cache():
+    """Delete every cached analysis; returns the number of rows removed."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_analysis_cache(conn)
+            return conn.execute("DELETE FROM analysis_cache").rowcount
+    except Exception as e:
+        logger.error("Error clearing analysis cache: %s", e)
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# eBay search cache — persisted comparable searches (optional)
+# ---------------------------------------------------------------------------
+
+def _ensure_search_cache(conn):
+    """Create the search_cache table (also called lazily by the cache helpers)."""
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS search_cache (
+            cache_key TEXT PRIMARY KEY,
+            results TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )
+        '''
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed ON search_cache (last_accessed)"
+    )
+
+
+def get_cached_search(cache_key, now=None):
+    """
+    Return ``(expires_at, results)`` for an unexpired cached search, or None.
+
+    An expired row is deleted; a hit refreshes ``last_accessed`` for LRU eviction.
+    """
+    try:
+        now = time.time() if now is None else now
+        with get_db_connection() as conn:
+            _ensure_search_cache(conn)
+            row = conn.execute(
+                "SELECT results, expires_at FROM search_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if not row:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (cache_key,))
+                return None
+            conn.execute(
+                "UPDATE search_cache SET last_accessed = ? WHERE cache_key = ?", (now, cache_key)
+            )
+        return row[1], json.loads(row[0])
+    except Exception as e:
+        logger.error("Error reading search cache: %s", e)
+        return None
+
+
+def put_cached_search(cache_key, results, expires_at, max_entries):
+    """Store a search result and evict least-recently-used rows beyond ``max_entries``."""
+    try:
+        now = time.time()
+        with get_db_connection() as conn:
+            _ensure_search_cache(conn)
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO search_cache (cache_key, results, expires_at, last_accessed)
+                VALUES (?, ?, ?, ?)
+                ''',
+                (cache_key, json.dumps(results), expires_at, now),
+            )
+            conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                '''
+                DELETE FROM search_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM search_cache
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+                ''',
+                (max(0, int(max_entries)),),
+            )
+        return True
+    except Exception as e:
+        logger.error("Error writing search cache: %s", e)
+        return False
+
+
+def clear_search_cache():
+    """Delete every persisted search; returns the number of rows removed."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_search_cache(conn)
+            return conn.execute("DELETE FROM search_cache").rowcount
+    except Exception as e:
+        logger.error("Error clearing search cache: %s", e)
+        return 0
+
+
+def _ensure_vision_calls(conn):
+    """Create the vision_calls table (also called lazily by the metrics helpers)."""
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS vision_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL,
+            kind TEXT NOT NULL,
+            model TEXT,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            image_bytes INTEGER DEFAULT 0,
+            images INTEGER DEFAULT 0,
+            duration_ms REAL,
+            attempts INTEGER DEFAULT 0,
+            cache TEXT,
+            success INTEGER NOT NULL,
+            cost_usd REAL DEFAULT 0,
+            error TEXT
+        )
+        '''
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_vision_calls_created_at ON vision_calls (created_at)"
+    )
+
+
+def record_vision_call(call, retention_seconds=None):
+    """
+    Insert one vision call record (a dict of ``vision_calls`` columns) and
+    drop rows older than ``retention_seconds``.
+    """
+    try:
+        now = time.time()
+        with get_db_connection() as conn:
+            _ensure_vision_calls(conn)
+            conn.execute(
+                '''
+                INSERT INTO vision_calls
+                (created_at, kind, model, prompt_tokens, completion_tokens, image_bytes,
+                 images, duration_ms, attempts, cache, success, cost_usd, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                (
+                    now,
+                    call['kind'],
+                    call.get('model'),
+                    call.get('prompt_tokens', 0),
+                    call.get('completion_tokens', 0),
+                    call.get('image_bytes', 0),
+                    call.get('images', 0),
+                    call.get('duration_ms'),
+                    call.get('attempts', 0),
+                    call.get('cache'),
+                    1 if call.get('success') else 0,
+                    call.get('cost_usd', 0.0),
+                    call.get('error'),
+                ),
+            )
+            if retention_seconds:
+                conn.execute("DELETE FROM vision_calls WHERE created_at < ?", (now - retention_seconds,))
+        return True
+    except Exception as e:
+        logger.error("Error recording vision call: %s", e)
+        return False
+
+
+_VISION_ROLLUP_COLUMNS = '''
+    COUNT(*) AS calls,
+    COALESCE(SUM(success = 0), 0) AS errors,
+    COALESCE(SUM(cache IN ('hit', 'near')), 0) AS cache_hits,
+    COALESCE(SUM(cache = 'near'), 0) AS near_hits,
+    COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+    COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+    COALESCE(SUM(image_bytes), 0) AS image_bytes,
+    COALESCE(SUM(images), 0) AS images,
+    COALESCE(SUM(MAX(attempts - 1, 0)), 0) AS retries,
+    AVG(duration_ms) AS avg_ms,
+    MAX(duration_ms) AS max_ms,
+    COALESCE(SUM(cost_usd), 0) AS cost_usd
+'''
+
+
+def get_vision_call_rollup(since=None):
+    """
+    Aggregate vision calls recorded at or after ``since`` (epoch seconds):
+    overall totals plus breakdowns by call kind, model and day.
+    """
+    where, params = ("WHERE created_at >= ?", (since,)) if since is not None else ("", ())
+    try:
+        with get_db_connection() as conn:
+            _ensure_vision_calls(conn)
+            totals = conn.execute(
+                f"SELECT {_VISION_ROLLUP_COLUMNS} FROM vision_calls {where}", params
+            ).fetchone()
+            breakdowns = {}
+            for name, expr in (
+                ('by_kind', 'kind'),
+                ('by_model', 'model'),
+                ('by_day', "date(created_at, 'unixepoch')"),
+            ):
+                rows = conn.execute(
+                    f"SELECT {expr} AS key, {_VISION_ROLLUP_COLUMNS} FROM vision_calls {where} "
+                    f"GROUP BY key ORDER BY key",
+                    params,
+                ).fetchall()
+                breakdowns[name] = [dict(row) for row in rows]
+        return {'totals': dict(totals), **breakdowns}
+    except Exception as e:
+        logger.error("Error reading vision call rollup: %s", e)
+        return {'totals': {}, 'by_kind': [], 'by_model': [], 'by_day': []}
+
+
+# ---------------------------------------------------------------------------
+# Local comparables index
+# ---------------------------------------------------------------------------
+
+_COMP_COLUMNS = ('title', 'price', 'currency', 'url', 'item_id', 'condition', 'shipping', 'sold')
+
+
+def _ensure_comps(conn):
+    """
+    Create the comps table and its FTS5 title index (also called lazily by
+    the comps helpers).  Raises ``sqlite3.OperationalError`` when this SQLite
+    build lacks FTS5.
+    """
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS comps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            comp_key TEXT NOT NULL,
+            title TEXT NOT NULL,
+            price REAL NOT NULL,
+            currency TEXT,
+            url TEXT,
+            item_id TEXT,
+            condition TEXT,
+            shipping REAL,
+            sold INTEGER,
+            source TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            UNIQUE (source, comp_key)
+        )
+        '''
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_comps_fetched_at ON comps (fetched_at)")
+    conn.execute(
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS comps_fts USING fts5(
+            title, content='comps', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        '''
+    )
+    # Keep the external-content FTS index in step with the table
+    conn.execute(
+        '''
+        CREATE TRIGGER IF NOT EXISTS comps_ai AFTER INSERT ON comps BEGIN
+            INSERT INTO comps_fts (rowid, title) VALUES (new.id, new.title);
+        END
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TRIGGER IF NOT EXISTS comps_ad AFTER DELETE ON comps BEGIN
+            INSERT INTO comps_fts (comps_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TRIGGER IF NOT EXISTS comps_au AFTER UPDATE OF title ON comps BEGIN
+            INSERT INTO comps_fts (comps_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO comps_fts (rowid, title) VALUES (new.id, new.title);
+        END
+        '''
+    )
+
+
+def upsert_comps(comps, source, fetched_at=None, retention_seconds=None):
+    """
+    Insert or refresh comparable listings (dicts with a ``comp_key``, unique
+    per ``source``) and drop rows not fetched again within
+    ``retention_seconds``.  Returns the number of rows written.
+    """
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    rows = [
+        (comp['comp_key'], *(comp.get(column) for column in _COMP_COLUMNS), source, fetched_at)
+        for comp in comps
+    ]
+    try:
+        with get_db_connection() as conn:
+            _ensure_comps(conn)
+            conn.executemany(
+                f'''
+                INSERT INTO comps (comp_key, {', '.join(_COMP_COLUMNS)}, source, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, comp_key) DO UPDATE SET
+                    {', '.join(f'{column} = excluded.{column}' for column in _COMP_COLUMNS)},
+                    fetched_at = excluded.fetched_at
+                ''',
+                rows,
+            )
+            if retention_seconds:
+                conn.execute("DELETE FROM comps WHERE fetched_at < ?", (fetched_at - retention_seconds,))
+        return len(rows)
+    except Exception as e:
+        logger.error("Error indexing comparable listings: %s", e)
+        return 0
+
+
+def search_comps(match, since, limit, source):
+    """
+    Comps from ``source`` whose title matches the FTS5 query ``match`` and
+    that were fetched at or after ``since``, best match first.
+    """
+    try:
+        with get_db_connection() as conn:
+            _ensure_comps(conn)
+            rows = conn.execute(
+                f'''
+                SELECT {', '.join(f'c.{column}' for column in _COMP_COLUMNS)}, c.fetched_at
+                FROM comps_fts
+                JOIN comps c ON c.id = comps_fts.rowid
+                WHERE comps_fts MATCH ? AND c.source = ? AND c.fetched_at >= ?
+                ORDER BY bm25(comps_fts)
+                LIMIT ?
+                ''',
+                (match, source, since, max(0, int(limit))),
+            ).fetchall()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error("Error searching comparable listings: %s", e)
+        return []
+
+
+def count_comps():
+    try:
+        with get_db_connection() as conn:
+            _ensure_comps(conn)
+            return conn.execute("SELECT COUNT(*) FROM comps").fetchone()[0]
+    except Exception as e:
+        logger.error("Error counting comparable listings: %s", e)
+        return 0
+
+
+def clear_comps():
+    """Delete every indexed comparable; returns the number of rows removed."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_comps(conn)
+            return conn.execute("DELETE FROM comps").rowcount
+    except Exception as e:
+        logger.error("Error clearing comparable listings: %s", e)
+        return 0
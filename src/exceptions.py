@@ -69,3 +69,21 @@ class ValidationError(CardsForSaleException):
         self.field = field
         self.reason = reason
         super().__init__(f"Validation failed for {field}: {reason}")
+
+
+class CircuitOpenError(CardsForSaleException):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float = 0.0):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}; retry in {retry_in:.0f}s")
+
+
+class QuotaExceededError(CardsForSaleException):
+    """Raised instead of calling an API whose daily call quota is used up."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        super().__init__(f"Daily quota of {limit} calls for {name} is used up")
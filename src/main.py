@@ -2,6 +2,7 @@
 Main entry point
 Orchestrates the image → eBay listing pipeline
 """
+import argparse
 import json
 import logging
 import sys
@@ -12,6 +13,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.api.openai_client import describe_image
 from src.api.ebay_client import search_ebay, suggest_price, build_listing_payload
+from src.api import openai_batch
+from src.config import ALLOWED_EXTENSIONS
 
 logger = logging.getLogger(__name__)
 
@@ -106,9 +109,68 @@ def main():
     return payload
 
 
+def run_batch(folder, work_dir=None, resume=False, poll_seconds=None):
+    """
+    Offline bulk intake:
+    1. Analyse every photo in ``folder`` with the OpenAI Batch API (or mock)
+    2. Search, price and save a listing draft for each analysed item
+
+    Photos the batch could not answer are analysed interactively instead.
+    Batch progress lives in ``work_dir`` (default ``<folder>/.batch``) so an
+    interrupted run can continue with ``resume=True``.
+    """
+    from src.app import process_listing
+
+    folder = Path(folder)
+    work_dir = Path(work_dir) if work_dir else folder / ".batch"
+
+    if resume:
+        logger.info("Resuming batch run in %s", work_dir)
+        analyses = openai_batch.resume(work_dir, poll_seconds=poll_seconds)
+    else:
+        photos = sorted(
+            path for path in folder.iterdir()
+            if path.is_file() and path.suffix.lstrip(".").lower() in ALLOWED_EXTENSIONS
+        )
+        logger.info("Submitting %d photo(s) from %s for batch analysis", len(photos), folder)
+        analyses = openai_batch.describe_images_batch(photos, work_dir, poll_seconds=poll_seconds)
+
+    summary = {"photos": len(analyses), "listings": 0, "failed": [], "interactive": 0}
+    for image_path, analysis in analyses.items():
+        if analysis is None:
+            summary["interactive"] += 1
+        result = process_listing(image_path, Path(image_path).name, analysis=analysis)
+        if result["success"]:
+            summary["listings"] += result["count"]
+        else:
+            summary["failed"].append(image_path)
+
+    logger.info(
+        "Batch intake finished: %d photo(s), %d listing draft(s), %d analysed interactively, %d failed",
+        summary["photos"], summary["listings"], summary["interactive"], len(summary["failed"]),
+    )
+    return summary
+
+
+def cli(argv=None):
+    """Command-line entry point: the demo pipeline, or ``batch <folder>``."""
+    parser = argparse.ArgumentParser(prog="python -m src.main")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="Analyse a folder of photos with the OpenAI Batch API")
+    batch.add_argument("folder", help="Folder of photos to list")
+    batch.add_argument("--work-dir", help="Where batch files and progress are kept (default: <folder>/.batch)")
+    batch.add_argument("--resume", action="store_true", help="Continue an interrupted run from --work-dir")
+    batch.add_argument("--poll-seconds", type=float, help="Seconds between batch status checks")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch(args.folder, work_dir=args.work_dir, resume=args.resume, poll_seconds=args.poll_seconds)
+    return main()
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
-    main()
+    cli()
@@ -0,0 +1,131 @@
+"""
+AsyncListingService — asyncio-native image-to-listing pipeline.
+
+Same stages, events and response shape as ListingService, but the vision and
+eBay calls are coroutines, so hundreds of pipelines can be in flight on one
+event loop without a thread each.  Only the SQLite save runs in a worker
+thread.
+"""
+import asyncio
+import functools
+import logging
+
+from src.services.listing_service import ListingService
+from src.services.lot_segmentation import with_card_segmentation_async
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncListingService(ListingService):
+    """
+    Orchestrates the image → eBay listing pipeline with coroutines.
+
+    ``describe_image_fn`` and ``search_ebay_fn`` must be async callables (see
+    ``src.api.async_openai_client`` / ``src.api.async_ebay_client``); the
+    pricing, payload and save functions stay synchronous.
+    """
+
+    def __init__(self, *args, max_in_flight: int = 4, **kwargs):
+        super().__init__(*args, max_in_flight=max_in_flight, **kwargs)
+        self.max_in_flight = max(1, int(max_in_flight))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def process_image(self, image_path: str, filename: str = 'unknown.jpg', topic: str | None = None) -> dict:
+        """Async counterpart of ``ListingService.process_image`` (same result shape)."""
+        try:
+            logger.info("Analyzing uploaded image: %s", filename)
+            image_analysis = await self._describe_image(image_path)
+            analyses = self._normalize_analyses(image_analysis)
+            self._emit(topic, 'analyzed', filename=filename, cards=len(analyses))
+
+            if not analyses:
+                return self._nothing_detected(filename, topic)
+
+            logger.info("Searching eBay for %d item(s)…", len(analyses))
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+
+            async def run(index, analysis):
+                async with semaphore:
+                    try:
+                        return await self._generate_one(analysis, filename, topic, index), None
+                    except Exception as exc:
+                        logger.warning("Card %d of %s failed: %s", index, filename, exc)
+                        return None, exc
+
+            outcomes = await asyncio.gather(
+                *(run(index, analysis) for index, analysis in enumerate(analyses))
+            )
+            return self._summarize(list(outcomes), filename, topic)
+
+        except Exception:
+            logger.exception("AsyncListingService.process_image failed for %s", filename)
+            return self._failed(filename, topic)
+
+    async def process_images(self, images: list, max_concurrent_images: int = 50) -> list:
+        """
+        Run the pipeline for many ``(image_path, filename)`` pairs concurrently.
+
+        At most ``max_concurrent_images`` pipelines are in flight; results keep
+        input order.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent_images))
+
+        async def run(image_path, filename):
+            async with semaphore:
+                return await self.process_image(image_path, filename)
+
+        return list(await asyncio.gather(*(run(path, name) for path, name in images)))
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _segment_cards(self, max_in_flight: int, min_cards: int) -> None:
+        self._describe_image = with_card_segmentation_async(self._describe_image, max_in_flight, min_cards)
+
+    async def _generate_one(self, analysis: dict, filename: str, topic: str | None = None, index: int = 0) -> dict:
+        search_query = self._build_search_query(analysis)
+        comparable = await self._search_ebay(search_query, limit=8)
+        self._emit(topic, 'comps_fetched', filename=filename, index=index, count=len(comparable))
+        suggested_price, price_warning, price_confidence, title, payload = self._price_and_build(
+            analysis, comparable, filename, topic, index
+        )
+
+        listing_id = await asyncio.to_thread(
+            functools.partial(
+                self._save_listing,
+                title=title,
+                filename=filename,
+                analysis=analysis,
+                comparable_listings=comparable,
+                suggested_price=suggested_price,
+                payload=payload,
+            )
+        )
+        return self._saved_result(
+            listing_id, analysis, comparable, suggested_price, price_warning, price_confidence, payload,
+            filename, topic, index,
+        )
+
+
+def create_async_listing_service(client=None, **kwargs) -> AsyncListingService:
+    """
+    Wire an AsyncListingService to the real async clients and the database.
+
+    Pass a shared ``httpx.AsyncClient`` as ``client`` so every call reuses one
+    connection pool; remaining keyword arguments go to the service.
+    """
+    from src.api import async_ebay_client, async_openai_client
+    from src.api.ebay_client import build_listing_payload
+    from src.database import save_listing
+
+    return AsyncListingService(
+        describe_image_fn=functools.partial(async_openai_client.describe_image, client=client),
+        search_ebay_fn=functools.partial(async_ebay_client.search_ebay, client=client),
+        build_listing_payload_fn=build_listing_payload,
+        save_listing_fn=save_listing,
+        **kwargs,
+    )
@@ -0,0 +1,126 @@
+"""
+EventBus — in-process publish/subscribe for pipeline progress events.
+
+ListingService, process_listing and the JobQueue publish stage events
+(analyzed, comps_fetched, priced, saved, …) to a topic — normally a job id —
+and the SSE endpoint relays them to the browser as they happen.
+
+Each topic keeps a short history so a subscriber that connects after the job
+started (the usual case: POST → 202 → open the stream) still sees its events.
+A retained topic — the JobQueue retains each job's — keeps its whole history
+until released, so a late subscriber to a long batch job misses nothing.
+"""
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A subscriber's view of one topic: replayed history, then live events."""
+
+    def __init__(self, bus: 'EventBus', topic: str, backlog: list):
+        self._bus = bus
+        self.topic = topic
+        self._queue: queue.Queue = queue.Queue()
+        for event in backlog:
+            self._queue.put(event)
+
+    def get(self, timeout: float | None = None) -> dict | None:
+        """Return the next event, or None if none arrives within ``timeout``."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def _deliver(self, event: dict) -> None:
+        self._queue.put(event)
+
+
+class EventBus:
+    """
+    Thread-safe topic-based event bus.
+
+    ``max_topics`` bounds how many topics keep history (oldest are dropped);
+    ``history_size`` bounds the events retained per topic.  Topics passed to
+    ``retain`` are exempt from both until ``release``.
+    """
+
+    def __init__(self, history_size: int = 200, max_topics: int = 1000):
+        self.history_size = history_size
+        self.max_topics = max_topics
+        self._history: OrderedDict[str, deque] = OrderedDict()
+        self._retained: dict[str, list] = {}
+        self._subscribers: dict[str, set] = {}
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, event: str, data: dict | None = None) -> dict:
+        """Publish ``event`` with ``data`` to every subscriber of ``topic``."""
+        record = {
+            'event': event,
+            'topic': topic,
+            'seq': next(self._seq),
+            'time': time.time(),
+            **(data or {}),
+        }
+        with self._lock:
+            history = self._retained.get(topic)
+            if history is None:
+                history = self._history.get(topic)
+            if history is None:
+                history = self._history[topic] = deque(maxlen=self.history_size)
+                while len(self._history) > self.max_topics:
+                    self._history.popitem(last=False)
+            history.append(record)
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            subscriber._deliver(record)
+        logger.debug("Event %s on %s", event, topic)
+        return record
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe to ``topic``; past events still in history are replayed first."""
+        with self._lock:
+            subscription = Subscription(self, topic, self._events(topic))
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def history(self, topic: str) -> list:
+        with self._lock:
+            return self._events(topic)
+
+    def retain(self, topic: str) -> None:
+        """Keep every event of ``topic`` (e.g. a job) until ``release`` is called."""
+        with self._lock:
+            if topic not in self._retained:
+                self._retained[topic] = list(self._history.pop(topic, ()))
+
+    def release(self, topic: str) -> None:
+        """Drop a retained topic's history (e.g. once its job is pruned)."""
+        with self._lock:
+            self._retained.pop(topic, None)
+            self._history.pop(topic, None)
+
+    def _events(self, topic: str) -> list:
+        """Copy of ``topic``'s history (lock held)."""
+        return list(self._retained.get(topic) or self._history.get(topic, ()))
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+
+# Process-wide bus shared by the web app, its job queue and the pipeline
+event_bus = EventBus()
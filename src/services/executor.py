@@ -0,0 +1,60 @@
+"""
+BoundedExecutor — runs independent pipeline tasks with capped concurrency.
+
+Used to fan out the per-card search/price/payload/save stages of a lot photo
+so N cards cost roughly one eBay round-trip instead of N back-to-back calls.
+``map_stream`` does the same for items that arrive one at a time.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """
+    Apply a function to a list of items with at most ``max_in_flight`` calls
+    running at once.
+
+    Results come back in input order as ``(value, error)`` tuples: exactly one
+    of the two is ``None`` for each item, so one failing item never hides the
+    results of the others.
+    """
+
+    def __init__(self, max_in_flight: int = 4):
+        self.max_in_flight = max(1, int(max_in_flight))
+
+    def map(self, fn, items) -> list:
+        """Run ``fn(item)`` for every item and return ordered outcomes."""
+        items = list(items)
+        if not items:
+            return []
+
+        # A single item (or a concurrency of one) gains nothing from a pool
+        if len(items) == 1 or self.max_in_flight == 1:
+            return [self._call(fn, item) for item in items]
+
+        workers = min(self.max_in_flight, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fanout') as pool:
+            futures = [pool.submit(self._call, fn, item) for item in items]
+            return [future.result() for future in futures]
+
+    def map_stream(self, fn, items) -> list:
+        """
+        Like ``map`` but consumes ``items`` lazily, submitting each one as
+        soon as the iterable produces it.
+
+        Use this when items trickle in (e.g. cards parsed from a streamed
+        model reply) so work on early items overlaps with producing later ones.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='fanout') as pool:
+            futures = [pool.submit(self._call, fn, item) for item in items]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _call(fn, item) -> tuple:
+        try:
+            return fn(item), None
+        except Exception as exc:
+            logger.warning("Fan-out task failed: %s", exc)
+            return None, exc
@@ -0,0 +1,194 @@
+"""
+JobQueue — background execution of long-running pipeline work.
+
+Lets ``/api/upload`` hand a saved photo to a worker pool and return ``202``
+straight away instead of holding the request thread for the whole
+vision + eBay + SQLite pipeline.  Jobs live in memory; finished jobs are
+pruned oldest-first once ``max_retained`` is exceeded.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+_FINISHED_STATES = frozenset({JOB_SUCCEEDED, JOB_FAILED})
+
+# Shown to clients for a failed job; the exception itself is only logged
+JOB_ERROR_MESSAGE = 'Processing failed. Please try again.'
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while ``max_pending`` jobs are waiting."""
+
+
+class _Job:
+    __slots__ = (
+        'job_id', 'label', 'state', 'result', 'error',
+        'created_at', 'started_at', 'finished_at', 'done',
+    )
+
+    def __init__(self, job_id: str, label: str):
+        self.job_id = job_id
+        self.label = label
+        self.state = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def snapshot(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'label': self.label,
+            'state': self.state,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Thread-pool backed job queue with pollable job state.
+
+    ``submit`` returns a job id immediately; ``get`` returns a snapshot dict
+    with ``state`` (queued → running → succeeded | failed) plus the job's
+    return value in ``result`` or, on failure, a generic ``error`` message (the
+    exception is logged, not exposed).
+
+    When an ``event_bus`` is given every state change is also published as a
+    ``job`` event on the job's topic (its id), and the topic's whole history
+    is retained on the bus until the job is pruned.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        max_retained: int = 500,
+        event_bus=None,
+    ):
+        self.max_pending = max_pending
+        self.max_retained = max_retained
+        self._event_bus = event_bus
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='job')
+        self._jobs: OrderedDict[str, _Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label: str = '', cleanup=None, job_id: str | None = None, **kwargs) -> str:
+        """
+        Queue ``fn(*args, **kwargs)`` and return its job id.
+
+        ``cleanup`` (optional, no arguments) runs after the job finishes,
+        whether it succeeded or not — e.g. to delete the uploaded temp file.
+        ``job_id`` lets the caller pick the id up front (see ``new_job_id``),
+        e.g. to use it as an event topic inside ``fn``.
+        Raises JobQueueFullError when too many jobs are already waiting.
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.state == JOB_QUEUED)
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"{pending} jobs already queued")
+            job = _Job(job_id or self.new_job_id(), label)
+            self._jobs[job.job_id] = job
+            pruned = self._prune()
+
+        if self._event_bus is not None:
+            self._event_bus.retain(job.job_id)
+            for job_id in pruned:
+                self._event_bus.release(job_id)
+
+        self._publish(job)
+        self._pool.submit(self._run, job, fn, args, kwargs, cleanup)
+        logger.info("Queued job %s (%s)", job.job_id, label or fn.__name__)
+        return job.job_id
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def get(self, job_id: str) -> dict | None:
+        """Return a snapshot of the job, or None if unknown or pruned."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def list(self) -> list:
+        """Return snapshots of all retained jobs, newest first (without results)."""
+        with self._lock:
+            jobs = [job.snapshot() for job in reversed(self._jobs.values())]
+        for job in jobs:
+            job.pop('result')
+        return jobs
+
+    def wait(self, job_id: str, timeout: float | None = None) -> dict | None:
+        """Block until the job finishes (or ``timeout`` elapses) and return its snapshot."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.done.wait(timeout)
+        return self.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _run(self, job: _Job, fn, args, kwargs, cleanup) -> None:
+        with self._lock:
+            job.state = JOB_RUNNING
+            job.started_at = time.time()
+        self._publish(job)
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                job.result = result
+                job.state = JOB_SUCCEEDED
+        except Exception:
+            logger.exception("Job %s failed", job.job_id)
+            with self._lock:
+                job.error = JOB_ERROR_MESSAGE
+                job.state = JOB_FAILED
+        finally:
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except Exception as exc:
+                    logger.warning("Cleanup for job %s failed: %s", job.job_id, exc)
+            with self._lock:
+                job.finished_at = time.time()
+            job.done.set()
+            self._publish(job)
+
+    def _publish(self, job: _Job) -> None:
+        if self._event_bus is not None:
+            data = {'job_id': job.job_id, 'state': job.state}
+            if job.error:
+                data['error'] = job.error
+            self._event_bus.publish(job.job_id, 'job', data)
+
+    def _prune(self) -> list:
+        """Drop the oldest finished jobs beyond ``max_retained`` (lock held); returns their ids."""
+        excess = len(self._jobs) - self.max_retained
+        if excess <= 0:
+            return []
+        pruned = [jid for jid, job in self._jobs.items() if job.state in _FINISHED_STATES][:excess]
+        for job_id in pruned:
+            del self._jobs[job_id]
+        return pruned
@@ -5,15 +5,21 @@ Extracted from app.py so that route handlers stay thin and business logic
 is independently testable.
 """
 import logging
-import tempfile
-import os
 
+import src.config as config
 from src.services.title_builder import TitleBuilder
 from src.services.description_builder import DescriptionBuilder
+from src.services.executor import BoundedExecutor
+from src.services.lot_segmentation import with_card_segmentation, with_card_segmentation_stream
+from src.utils.pricing import estimate_price, weigh_comps
+from src.utils.relevance import filter_comps
 from src.exceptions import ListingGenerationError
 
 logger = logging.getLogger(__name__)
 
+# Reported to clients instead of exception text, which can carry SQL errors or upstream bodies
+FAILED_MESSAGE = 'Failed to generate listing'
+
 _title_builder = TitleBuilder()
 _description_builder = DescriptionBuilder()
 
@@ -22,30 +28,43 @@ class ListingService:
     """
     Orchestrates the full image → eBay listing pipeline.
 
-    Dependencies are injected so each can be swapped in tests.
+    Dependencies are injected so each can be swapped in tests.  With
+    ``card_segmentation`` (default ``CARD_SEGMENTATION_ENABLED``) lot photos
+    are split into per-card crops before the describe functions see them.
     """
 
     def __init__(
         self,
         describe_image_fn,
         search_ebay_fn,
-        suggest_price_fn,
         build_listing_payload_fn,
         save_listing_fn,
         high_value_threshold: float = 20.0,
+        max_in_flight: int = 4,
+        event_bus=None,
+        describe_image_stream_fn=None,
+        estimate_price_fn=estimate_price,
+        fallback_price: float | None = None,
+        card_segmentation: bool | None = None,
     ):
         self._describe_image = describe_image_fn
+        self._describe_image_stream = describe_image_stream_fn
         self._search_ebay = search_ebay_fn
-        self._suggest_price = suggest_price_fn
+        self._estimate_price = estimate_price_fn
         self._build_listing_payload = build_listing_payload_fn
         self._save_listing = save_listing_fn
         self.high_value_threshold = high_value_threshold
+        self.fallback_price = config.PRICE_FALLBACK if fallback_price is None else fallback_price
+        self._executor = BoundedExecutor(max_in_flight)
+        self._event_bus = event_bus
+        if config.CARD_SEGMENTATION_ENABLED if card_segmentation is None else card_segmentation:
+            self._segment_cards(max_in_flight, config.CARD_SEGMENTATION_MIN_CARDS)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def process_image(self, image_path: str, filename: str = 'unknown.jpg') -> dict:
+    def process_image(self, image_path: str, filename: str = 'unknown.jpg', topic: str | None = None) -> dict:
         """
         Process a single image through the complete pipeline.
 
@@ -56,67 +75,195 @@ class ListingService:
             'count': int,
             'high_value_threshold': float,
             'message': str,
+            'errors': [{'index', 'stage', 'error'}, ...],  # per-card failures
             'error': str | None,                # present only on failure
         }
+
+        Cards are processed concurrently (up to ``max_in_flight`` at once) and
+        results keep the order the cards appear in the analysis.  The call only
+        fails as a whole when no card produced a listing.
+
+        With an ``event_bus`` and a ``topic``, a progress event is published as
+        each stage finishes: ``analyzed``, then per card ``comps_fetched``,
+        ``priced`` and ``saved`` (or ``card_failed``), then ``completed``.
+
+        With a ``describe_image_stream_fn`` the vision reply is consumed as a
+        stream: each card is handed to the search stage as soon as it has been
+        parsed (announced with a ``card_detected`` event) and ``analyzed`` is
+        published once the reply is complete.
         """
+        if self._describe_image_stream is not None:
+            return self._process_streamed(image_path, filename, topic)
+
         try:
             logger.info("Analyzing uploaded image: %s", filename)
             image_analysis = self._describe_image(image_path)
             analyses = self._normalize_analyses(image_analysis)
+            self._emit(topic, 'analyzed', filename=filename, cards=len(analyses))
 
             if not analyses:
-                return {
-                    'success': False,
-                    'listings': [],
-                    'count': 0,
-                    'high_value_threshold': self.high_value_threshold,
-                    'error': 'No items detected in image',
-                    'message': '❌ Could not identify any items in the photo',
-                }
+                return self._nothing_detected(filename, topic)
 
             logger.info("Searching eBay for %d item(s)…", len(analyses))
-            listings = [
-                self._generate_one(analysis, filename) for analysis in analyses
-            ]
-            count = len(listings)
-            msg = (
-                f"✅ Generated {count} listing draft{'s' if count != 1 else ''} "
-                "from one photo."
+            outcomes = self._executor.map(
+                lambda item: self._generate_one(item[1], filename, topic, item[0]),
+                list(enumerate(analyses)),
             )
-            return {
-                'success': True,
-                'listings': listings,
-                'count': count,
-                'high_value_threshold': self.high_value_threshold,
-                'message': msg,
-            }
+            return self._summarize(outcomes, filename, topic)
 
-        except Exception as exc:
+        except Exception:
             logger.exception("ListingService.process_image failed for %s", filename)
+            return self._failed(filename, topic)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _process_streamed(self, image_path: str, filename: str, topic: str | None) -> dict:
+        try:
+            logger.info("Analyzing uploaded image (streamed): %s", filename)
+            detected = []
+
+            def arrivals():
+                for analysis in self._describe_image_stream(image_path):
+                    if not isinstance(analysis, dict):
+                        continue
+                    index = len(detected)
+                    detected.append(analysis)
+                    self._emit(topic, 'card_detected', filename=filename, index=index)
+                    yield index, analysis
+
+            outcomes = self._executor.map_stream(
+                lambda item: self._generate_one(item[1], filename, topic, item[0]),
+                arrivals(),
+            )
+            self._emit(topic, 'analyzed', filename=filename, cards=len(detected))
+
+            if not outcomes:
+                return self._nothing_detected(filename, topic)
+            return self._summarize(outcomes, filename, topic)
+
+        except Exception:
+            logger.exception("ListingService.process_image failed for %s", filename)
+            return self._failed(filename, topic)
+
+    def _segment_cards(self, max_in_flight: int, min_cards: int) -> None:
+        """Wrap the describe functions so lot photos are analysed card by card."""
+        describe_image = self._describe_image
+        self._describe_image = with_card_segmentation(describe_image, max_in_flight, min_cards)
+        if self._describe_image_stream is not None:
+            self._describe_image_stream = with_card_segmentation_stream(
+                self._describe_image_stream, describe_image, max_in_flight, min_cards
+            )
+
+    def _emit(self, topic: str | None, event: str, **data) -> None:
+        if self._event_bus is not None and topic:
+            self._event_bus.publish(topic, event, data)
+
+    def _nothing_detected(self, filename: str, topic: str | None) -> dict:
+        self._emit(topic, 'completed', filename=filename, success=False, count=0)
+        return {
+            'success': False,
+            'listings': [],
+            'count': 0,
+            'high_value_threshold': self.high_value_threshold,
+            'error': 'No items detected in image',
+            'message': '❌ Could not identify any items in the photo',
+        }
+
+    def _failed(self, filename: str, topic: str | None) -> dict:
+        self._emit(topic, 'completed', filename=filename, success=False, count=0)
+        return {
+            'success': False,
+            'listings': [],
+            'count': 0,
+            'high_value_threshold': self.high_value_threshold,
+            'error': FAILED_MESSAGE,
+            'message': '❌ Failed to generate listing',
+        }
+
+    def _summarize(self, outcomes: list, filename: str, topic: str | None) -> dict:
+        """Build the response envelope from ordered ``(listing, error)`` outcomes."""
+        listings = [value for value, error in outcomes if error is None]
+        errors = []
+        for index, (_, error) in enumerate(outcomes):
+            if error is None:
+                continue
+            stage = getattr(error, 'stage', 'generate')
+            logger.error("Card %d of %s failed at %s", index, filename, stage, exc_info=error)
+            errors.append({'index': index, 'stage': stage, 'error': FAILED_MESSAGE})
+            self._emit(topic, 'card_failed', filename=filename, index=index, stage=stage)
+        self._emit(topic, 'completed', filename=filename, success=bool(listings), count=len(listings))
+
+        if not listings:
             return {
                 'success': False,
                 'listings': [],
                 'count': 0,
                 'high_value_threshold': self.high_value_threshold,
-                'error': str(exc),
+                'errors': errors,
+                'error': FAILED_MESSAGE,
                 'message': '❌ Failed to generate listing',
             }
 
-    # ------------------------------------------------------------------
-    # Private helpers
-    # ------------------------------------------------------------------
+        count = len(listings)
+        msg = (
+            f"✅ Generated {count} listing draft{'s' if count != 1 else ''} "
+            "from one photo."
+        )
+        if errors:
+            msg += f" {len(errors)} item(s) failed."
+        return {
+            'success': True,
+            'listings': listings,
+            'count': count,
+            'high_value_threshold': self.high_value_threshold,
+            'errors': errors,
+            'message': msg,
+        }
 
-    def _generate_one(self, analysis: dict, filename: str) -> dict:
+    def _generate_one(self, analysis: dict, filename: str, topic: str | None = None, index: int = 0) -> dict:
         """Generate and persist one listing for one analysed item."""
         search_query = self._build_search_query(analysis)
         comparable = self._search_ebay(search_query, limit=8)
-        suggested_price = self._suggest_price(comparable)
+        self._emit(topic, 'comps_fetched', filename=filename, index=index, count=len(comparable))
+        suggested_price, price_warning, price_confidence, title, payload = self._price_and_build(
+            analysis, comparable, filename, topic, index
+        )
+
+        listing_id = self._save_listing(
+            title=title,
+            filename=filename,
+            analysis=analysis,
+            comparable_listings=comparable,
+            suggested_price=suggested_price,
+            payload=payload,
+        )
+        return self._saved_result(
+            listing_id, analysis, comparable, suggested_price, price_warning, price_confidence, payload,
+            filename, topic, index,
+        )
+
+    def _price_and_build(self, analysis, comparable, filename, topic, index) -> tuple:
+        """Price an item from its comps and build its title and payload."""
+        weighted = weigh_comps(
+            filter_comps(comparable, analysis), condition=analysis.get('condition'), reference=self._build_search_query(analysis)
+        )
+        estimate = self._estimate_price(weighted)
+        suggested_price = estimate.price
+        price_confidence = estimate.summary()
 
         if suggested_price is None:
-            suggested_price = 5.00
+            suggested_price = self.fallback_price
             price_warning = True
         else:
             price_warning = False
+        self._emit(
+            topic, 'priced',
+            filename=filename, index=index,
+            suggested_price=suggested_price, price_warning=price_warning,
+            price_confidence=price_confidence,
+        )
 
         title = _title_builder.build(analysis)
         description = _description_builder.build(analysis)
@@ -126,31 +273,31 @@ class ListingService:
             price=suggested_price,
             condition=analysis.get('condition', 'Unknown'),
         )
+        return suggested_price, price_warning, price_confidence, title, payload
 
-        listing_id = self._save_listing(
-            title=title,
-            filename=filename,
-            analysis=analysis,
-            comparable_listings=comparable,
-            suggested_price=suggested_price,
-            payload=payload,
-        )
-
+    def _saved_result(
+        self, listing_id, analysis, comparable, suggested_price, price_warning, price_confidence, payload,
+        filename, topic, index,
+    ) -> dict:
+        """Validate the save and build the per-listing result dict."""
         if listing_id is None:
             raise ListingGenerationError(
                 stage='save_listing',
                 reason='Database returned None for listing_id',
             )
 
-        return {
+        result = {
             'listing_id': listing_id,
             'analysis': analysis,
             'comparable_listings': comparable,
             'suggested_price': suggested_price,
             'price_warning': price_warning,
+            'price_confidence': price_confidence,
             'is_high_value': suggested_price >= self.high_value_threshold,
             'payload': payload,
         }
+        self._emit(topic, 'saved', filename=filename, index=index, listing=result)
+        return result
 
     @staticmethod
     def _normalize_analyses(image_analysis: dict) -> list:
@@ -0,0 +1,145 @@
+"""
+Per-card analysis of lot photos.
+
+``with_card_segmentation`` wraps a ``describe_image``-style function: when a
+photo contains several cards, each card is cropped and deskewed locally
+(``src.utils.card_segmentation``) and the crops are described concurrently,
+so the model reads one full-size card per call instead of 20+ tiny ones.
+The per-crop results are merged into the usual ``{"cards": [...]}`` shape.
+
+``with_card_segmentation_stream`` does the same for the streamed pipeline:
+a segmented lot yields its cards once the crops are described, and any
+other photo is streamed as before.  ``with_card_segmentation_async`` wraps
+a coroutine ``describe_image`` (``AsyncListingService``).
+
+Photos with fewer than ``min_cards`` detected cards — single cards, busy
+backgrounds, undecodable files — are described whole, exactly as before.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+
+from src.services.executor import BoundedExecutor
+from src.utils.card_segmentation import crop_cards, find_cards
+
+logger = logging.getLogger(__name__)
+
+
+def with_card_segmentation(describe_image_fn, max_in_flight: int = 4, min_cards: int = 2):
+    """Return a ``describe_image(image_path)`` that analyses lot photos card by card."""
+    describe_cards = _crop_describer(describe_image_fn, max_in_flight, min_cards)
+
+    def describe(image_path: str) -> dict:
+        cards = describe_cards(image_path)
+        return {"cards": cards} if cards else describe_image_fn(image_path)
+
+    return describe
+
+
+def with_card_segmentation_stream(
+    describe_image_stream_fn, describe_image_fn, max_in_flight: int = 4, min_cards: int = 2
+):
+    """
+    Return a ``describe_image_stream(image_path)`` that yields each card of a
+    segmented lot photo and streams every other photo through
+    ``describe_image_stream_fn``.
+    """
+    describe_cards = _crop_describer(describe_image_fn, max_in_flight, min_cards)
+
+    def describe_stream(image_path: str):
+        cards = describe_cards(image_path)
+        if cards:
+            yield from cards
+        else:
+            yield from describe_image_stream_fn(image_path)
+
+    return describe_stream
+
+
+def with_card_segmentation_async(describe_image_fn, max_in_flight: int = 4, min_cards: int = 2):
+    """Async counterpart of ``with_card_segmentation`` for a coroutine ``describe_image_fn``."""
+    semaphore_size = max(1, int(max_in_flight))
+
+    async def describe(image_path: str) -> dict:
+        crops = await asyncio.to_thread(_crop_lot, image_path, min_cards)
+        if crops:
+            semaphore = asyncio.Semaphore(semaphore_size)
+
+            async def describe_crop(path):
+                async with semaphore:
+                    return await describe_image_fn(path)
+
+            with _crop_files(crops) as paths:
+                outcomes = await asyncio.gather(*(describe_crop(path) for path in paths), return_exceptions=True)
+            cards = merge_card_analyses(o for o in outcomes if not isinstance(o, BaseException))
+            if cards:
+                return {"cards": cards}
+            logger.warning("No crop of %s could be analysed — describing the whole photo", image_path)
+        return await describe_image_fn(image_path)
+
+    return describe
+
+
+def merge_card_analyses(analyses) -> list:
+    """
+    Flatten per-crop analyses into one card list, in crop order.
+
+    A crop the model still read as several items contributes each of them.
+    """
+    cards = []
+    for analysis in analyses:
+        if not isinstance(analysis, dict):
+            continue
+        if isinstance(analysis.get("cards"), list):
+            cards.extend(card for card in analysis["cards"] if isinstance(card, dict))
+        else:
+            cards.append(analysis)
+    return cards
+
+
+def _crop_describer(describe_image_fn, max_in_flight: int, min_cards: int):
+    """``image_path`` → merged per-crop cards, or ``[]`` when the photo should be described whole."""
+    executor = BoundedExecutor(max_in_flight)
+
+    def describe_cards(image_path: str) -> list:
+        crops = _crop_lot(image_path, min_cards)
+        if not crops:
+            return []
+        with _crop_files(crops) as paths:
+            outcomes = executor.map(describe_image_fn, paths)
+        cards = merge_card_analyses(value for value, error in outcomes if error is None)
+        if not cards:
+            logger.warning("No crop of %s could be analysed — describing the whole photo", image_path)
+        return cards
+
+    return describe_cards
+
+
+def _crop_lot(image_path: str, min_cards: int) -> list:
+    """JPEG crops of the cards in a lot photo, or ``[]`` below ``min_cards`` (or unreadable)."""
+    try:
+        with open(image_path, "rb") as f:
+            img_bytes = f.read()
+    except OSError:
+        return []
+
+    regions = find_cards(img_bytes)
+    if len(regions) < max(min_cards, 1):
+        return []
+    logger.info("Segmented %d card(s) from %s", len(regions), os.path.basename(image_path))
+    return crop_cards(img_bytes, regions)
+
+
+@contextlib.contextmanager
+def _crop_files(crops: list):
+    """Write crops to a temporary directory and yield their paths, in order."""
+    with tempfile.TemporaryDirectory(prefix="cards-") as work_dir:
+        paths = []
+        for n, crop in enumerate(crops):
+            path = os.path.join(work_dir, f"card-{n:03d}.jpg")
+            with open(path, "wb") as f:
+                f.write(crop)
+            paths.append(path)
+        yield paths
@@ -19,6 +19,10 @@ Credentials (sensitive — keyring preferred):
 Toggles (non-sensitive booleans stored as string "True"/"False"):
     USE_OPENAI_MOCK, USE_EBAY_MOCK, EBAY_SANDBOX
 
+Cached tokens (encrypted by ``src.api.token_store``; not in ALL_KEYS, so
+never loaded into the environment):
+    EBAY_OAUTH_TOKEN
+
 Usage
 -----
     from src.settings_store import load_all, save_all, apply_to_env
@@ -112,12 +116,16 @@ def _load_fallback() -> dict:
 def _save_fallback(data: dict) -> None:
     path = _fallback_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # Write a sibling file and swap it in, so another worker process never
+    # reads a half-written file (and then saves back an empty dict)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
     # Restrict file permissions on POSIX (owner read/write only)
     try:
-        path.chmod(stat.S_IRUSR | stat.S_IWUSR)
+        tmp.chmod(stat.S_IRUSR | stat.S_IWUSR)
     except OSError:
         pass  # Windows or permission error — not critical
+    os.replace(tmp, path)
 
 
 # ── Public API ────────────────────────────────────────────────────────────────
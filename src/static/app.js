@@ -8,6 +8,11 @@
 // Defaults to '' so all relative /api/* calls work when served by Flask.
 const API_BASE_URL = window.__API_BASE_URL__ || '';
 
+// Photos are sent to /api/upload/batch in chunks so the server can process
+// them in parallel while each request stays under MAX_CONTENT_LENGTH (16MB).
+const BATCH_CHUNK_MAX_FILES = 8;
+const BATCH_CHUNK_MAX_BYTES = 15 * 1024 * 1024;
+
 // HTML escaping utility to prevent XSS when injecting API data into the DOM
 function escapeHtml(str) {
       if (str === null || str === undefined) return '';
@@ -530,44 +535,55 @@ async function submitForm() {
             appState.setProcessing(true);
             const totalFiles = appState.getFileCount();
 
-            // Process each file
-            for (let i = 0; i < appState.selectedFiles.length; i++) {
-                  const file = appState.selectedFiles[i];
-                  updateProgress(i, totalFiles, `Processing ${i + 1} of ${totalFiles}...`);
+            // Send files in chunks; the server processes each chunk concurrently
+            const chunks = chunkFiles(appState.selectedFiles);
+            let done = 0;
+            for (const chunk of chunks) {
+                  updateProgress(
+                        done + chunk.length - 1,
+                        totalFiles,
+                        `Processing ${done + 1}-${done + chunk.length} of ${totalFiles}...`
+                  );
 
                   const formData = new FormData();
-                  formData.append('photo', file);
+                  chunk.forEach(file => formData.append('photos', file));
 
                   try {
-                        const response = await fetch(`${API_BASE_URL}/api/upload`, {
+                        const response = await fetch(`${API_BASE_URL}/api/upload/batch`, {
                               method: 'POST',
                               body: formData
                         });
 
                         const data = await response.json();
-
-                        if (!response.ok || !data.success) {
-                              console.warn(`Failed to process ${file.name}:`, data.error);
-                              appState.addResult({
-                                    filename: file.name,
-                                    success: false,
-                                    error: data.error || 'Unknown error'
-                              });
-                        } else {
-                              appState.addResult({
-                                    filename: file.name,
-                                    success: true,
-                                    data: data
-                              });
-                        }
+                        const results = Array.isArray(data.results) ? data.results : [];
+
+                        chunk.forEach((file, index) => {
+                              const result = results[index];
+                              if (!result || !result.success) {
+                                    const error = (result && result.error) || data.error || 'Unknown error';
+                                    console.warn(`Failed to process ${file.name}:`, error);
+                                    appState.addResult({
+                                          filename: file.name,
+                                          success: false,
+                                          error: error
+                                    });
+                              } else {
+                                    appState.addResult({
+                                          filename: file.name,
+                                          success: true,
+                                          data: result
+                                    });
+                              }
+                        });
                   } catch (error) {
-                        console.warn(`Error processing ${file.name}:`, error);
-                        appState.addResult({
+                        console.warn('Error processing batch:', error);
+                        chunk.forEach(file => appState.addResult({
                               filename: file.name,
                               success: false,
                               error: error.message
-                        });
+                        }));
                   }
+                  done += chunk.length;
             }
 
             // Display results
@@ -586,6 +602,26 @@ async function submitForm() {
       }
 }
 
+function chunkFiles(files) {
+      const chunks = [];
+      let current = [];
+      let currentBytes = 0;
+      for (const file of files) {
+            if (current.length && (current.length >= BATCH_CHUNK_MAX_FILES
+                  || currentBytes + file.size > BATCH_CHUNK_MAX_BYTES)) {
+                  chunks.push(current);
+                  current = [];
+                  currentBytes = 0;
+            }
+            current.push(file);
+            currentBytes += file.size;
+      }
+      if (current.length) {
+            chunks.push(current);
+      }
+      return chunks;
+}
+
 function updateProgress(current, total, message) {
       const percentage = ((current + 1) / total) * 100;
       progressFill.style.width = percentage + '%';
@@ -632,6 +668,9 @@ function createResultCard(data, filename) {
       const listings = data.comparable_listings;
       const price = data.suggested_price;
       const isHighValue = data.is_high_value === true;
+      const confidence = data.price_confidence || {};
+      // No usable comps (fallback price) or too few / too scattered ones
+      const isWeakPrice = data.price_warning === true || confidence.level === 'low';
 
       const card = document.createElement('div');
       card.className = 'result-card';
@@ -676,6 +715,7 @@ function createResultCard(data, filename) {
 
       card.innerHTML = `
             ${isHighValue ? '<div class="high-value-badge">🔥 High Value</div>' : ''}
+            ${isWeakPrice ? '<div class="price-warning-badge" title="Check the comparable listings before publishing">⚠️ Weak price</div>' : ''}
             <h3 style="margin: 0 0 15px 0; color: #333; word-break: break-word;">
                   📷 ${escapeHtml(filename)}
             </h3>
@@ -689,6 +729,7 @@ function createResultCard(data, filename) {
             <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 12px; border-radius: 8px; text-align: center; margin: 15px 0;">
                   <p style="margin: 0; font-size: 0.85em; opacity: 0.9;">Suggested Price</p>
                   <p style="margin: 4px 0; font-size: 1.4em; font-weight: bold;">$${parseFloat(price).toFixed(2)}</p>
+                  ${formatPriceConfidence(confidence)}
             </div>
             ${listingsTable}
             <div style="display:flex; gap:8px; margin-top:12px;">
@@ -703,6 +744,15 @@ function createResultCard(data, filename) {
       return card;
 }
 
+function formatPriceConfidence(confidence) {
+      if (!confidence || confidence.low == null || confidence.high == null) {
+            return '';
+      }
+      const range = `$${parseFloat(confidence.low).toFixed(2)} – $${parseFloat(confidence.high).toFixed(2)}`;
+      const comps = `${confidence.comps_used} comp${confidence.comps_used === 1 ? '' : 's'}`;
+      return `<p style="margin: 0; font-size: 0.8em; opacity: 0.9;">${range} · ${comps} · ${escapeHtml(confidence.level)} confidence</p>`;
+}
+
 function createErrorCard(filename, error) {
       const card = document.createElement('div');
       card.className = 'result-card';
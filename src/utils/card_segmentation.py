@@ -0,0 +1,264 @@
+"""
+Local segmentation of lot photos into per-card crops.
+
+A lot photo of 20+ cards forces the vision model to read many tiny cards at
+once.  ``find_cards`` locates card-shaped regions on a roughly uniform
+background with plain NumPy, and ``crop_cards`` cuts each one out of the
+full-resolution photo, deskewed, so every card can be analysed on its own.
+
+Detection works on a downscaled grayscale copy:
+
+1. foreground = pixels far from the background level (median of the border),
+   split with an Otsu threshold on that distance;
+2. a small morphological opening/closing removes specks and bridges glare,
+   and holes inside cards (artwork close to the background) are filled;
+3. connected components are labelled row run by row run;
+4. each component's orientation and side lengths come from a PCA of its
+   pixel coordinates, and only filled, card-proportioned ones are kept.
+
+Pillow and NumPy are optional: without them (or for undecodable bytes)
+``find_cards`` returns no regions and callers analyse the whole photo.
+"""
+import io
+import logging
+import math
+from typing import NamedTuple
+
+try:
+    import numpy as np
+    from PIL import Image, ImageOps
+    _HAS_IMAGING = True
+except ImportError:
+    _HAS_IMAGING = False
+
+from src.utils.image_prep import _as_file, _flatten
+
+logger = logging.getLogger(__name__)
+
+_WORK_EDGE = 768            # long edge of the detection copy, pixels
+_MIN_AREA_FRACTION = 0.004  # smallest card, as a fraction of the photo
+_MAX_AREA_FRACTION = 0.9    # anything bigger is the photo itself, not a card
+_MIN_FILL = 0.8             # component area / fitted rectangle area
+_ASPECT_RANGE = (0.5, 0.9)  # short / long side; cards are 0.71, slabs ~0.6
+_CROP_MARGIN = 0.03         # extra border kept around each crop
+
+
+class CardRegion(NamedTuple):
+    """A card-shaped region in original-photo pixels."""
+    center: tuple[float, float]   # (x, y)
+    size: tuple[float, float]     # (width, height) along the deskewed axes
+    angle: float                  # degrees to rotate (counter-clockwise) to deskew
+
+
+def find_cards(img_bytes) -> list[CardRegion]:
+    """Return the card regions in a photo in reading order (rows, then left to right)."""
+    if not _HAS_IMAGING:
+        return []
+    try:
+        with Image.open(_as_file(img_bytes)) as img:
+            img = ImageOps.exif_transpose(img)
+            scale = min(1.0, _WORK_EDGE / max(img.size))
+            work = _flatten(img).convert("L")
+            if scale < 1.0:
+                work = work.resize(
+                    (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                    Image.Resampling.BILINEAR,
+                )
+            gray = np.asarray(work, dtype=np.float32)
+    except Exception as exc:
+        logger.debug("Card segmentation skipped: %s", exc)
+        return []
+
+    regions = [
+        CardRegion((cx / scale, cy / scale), (w / scale, h / scale), angle)
+        for cx, cy, w, h, angle in _card_components(_foreground(gray))
+    ]
+    return _reading_order(regions)
+
+
+def crop_cards(img_bytes, regions: list[CardRegion], quality: int = 92) -> list[bytes]:
+    """Cut each region out of the full-resolution photo, deskewed, as JPEG bytes."""
+    if not _HAS_IMAGING or not regions:
+        return []
+    crops = []
+    with Image.open(_as_file(img_bytes)) as img:
+        photo = _flatten(ImageOps.exif_transpose(img))
+    for region in regions:
+        (cx, cy), (w, h) = region.center, region.size
+        w, h = w * (1 + 2 * _CROP_MARGIN), h * (1 + 2 * _CROP_MARGIN)
+        # Bounding box of the rotated rectangle, then rotate about its centre
+        rad = math.radians(region.angle)
+        half_w = (abs(w * math.cos(rad)) + abs(h * math.sin(rad))) / 2
+        half_h = (abs(w * math.sin(rad)) + abs(h * math.cos(rad))) / 2
+        box = (round(cx - half_w), round(cy - half_h), round(cx + half_w), round(cy + half_h))
+        patch = photo.crop(box).rotate(region.angle, resample=Image.Resampling.BICUBIC, fillcolor="white")
+        left, top = (patch.width - w) / 2, (patch.height - h) / 2
+        card = patch.crop((round(left), round(top), round(left + w), round(top + h)))
+
+        buf = io.BytesIO()
+        card.save(buf, format="JPEG", quality=quality)
+        crops.append(buf.getvalue())
+    return crops
+
+
+# ---------------------------------------------------------------------------
+# Detection stages
+# ---------------------------------------------------------------------------
+
+def _foreground(gray):
+    """Boolean mask of pixels that differ from the background level."""
+    border = np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])
+    distance = np.abs(gray - np.median(border))
+    mask = distance > _otsu_threshold(distance)
+
+    radius = max(1, round(max(gray.shape) / 384))
+    mask = _dilate(_erode(mask, radius), radius)    # opening: drop specks
+    mask = _erode(_dilate(mask, radius), radius)    # closing: bridge glare
+    return _fill_holes(mask)
+
+
+def _otsu_threshold(values) -> float:
+    """Threshold maximising between-class variance over a 256-bin histogram."""
+    hist, edges = np.histogram(values, bins=256)
+    hist = hist.astype(np.float64)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight_lo = np.cumsum(hist)
+    weight_hi = weight_lo[-1] - weight_lo
+    sum_lo = np.cumsum(hist * centers)
+    mean_lo = sum_lo / np.maximum(weight_lo, 1)
+    mean_hi = (sum_lo[-1] - sum_lo) / np.maximum(weight_hi, 1)
+    between = weight_lo * weight_hi * (mean_lo - mean_hi) ** 2
+    return float(centers[int(np.argmax(between))])
+
+
+def _dilate(mask, radius: int):
+    return _shift_reduce(mask, radius, np.logical_or, False)
+
+
+def _erode(mask, radius: int):
+    return _shift_reduce(mask, radius, np.logical_and, True)
+
+
+def _shift_reduce(mask, radius: int, op, pad_value: bool):
+    """Square-kernel morphology as two separable passes of shifted slices."""
+    out = mask
+    for axis in (0, 1):
+        padded = np.pad(out, [(radius, radius) if a == axis else (0, 0) for a in (0, 1)],
+                        constant_values=pad_value)
+        length = out.shape[axis]
+        acc = np.take(padded, range(0, length), axis=axis)
+        for offset in range(1, 2 * radius + 1):
+            acc = op(acc, np.take(padded, range(offset, offset + length), axis=axis))
+        out = acc
+    return out
+
+
+def _fill_holes(mask):
+    """Set background components that do not touch the border to foreground."""
+    labels, _ = _label(~mask)
+    edge_labels = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    holes = (labels > 0) & ~np.isin(labels, edge_labels)
+    return mask | holes
+
+
+def _label(mask):
+    """
+    4-connected component labels (0 = background) and the component count.
+
+    Each row is split into runs of True pixels; runs overlapping a run in
+    the previous row are merged with a union-find, then relabelled densely.
+    """
+    parent = [0]
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    rows = []
+    prev = []   # (start, end, label) runs of the previous row
+    for row in mask:
+        padded = np.concatenate(([False], row, [False])).astype(np.int8)
+        changes = np.flatnonzero(np.diff(padded))
+        runs = []
+        for start, end in zip(changes[::2], changes[1::2]):
+            label = 0
+            for p_start, p_end, p_label in prev:
+                if p_start < end and start < p_end:
+                    if label == 0:
+                        label = find(p_label)
+                    else:
+                        a, b = find(label), find(p_label)
+                        if a != b:
+                            parent[max(a, b)] = min(a, b)
+                            label = min(a, b)
+            if label == 0:
+                label = len(parent)
+                parent.append(label)
+            runs.append((start, end, label))
+        rows.append(runs)
+        prev = runs
+
+    roots = np.array([find(i) for i in range(len(parent))])
+    _, dense = np.unique(roots, return_inverse=True)   # root 0 stays 0
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    for y, runs in enumerate(rows):
+        for start, end, label in runs:
+            labels[y, start:end] = dense[label]
+    return labels, int(dense.max()) if len(dense) else 0
+
+
+def _card_components(mask):
+    """Yield ``(cx, cy, width, height, angle)`` for card-shaped components."""
+    labels, count = _label(mask)
+    if count == 0:
+        return
+    total = mask.size
+    flat = labels.ravel()
+    order = np.argsort(flat, kind="stable")
+    bounds = np.searchsorted(flat[order], np.arange(1, count + 2))
+    width = mask.shape[1]
+
+    for k in range(count):
+        pixels = order[bounds[k]:bounds[k + 1]]
+        area = len(pixels)
+        if not (_MIN_AREA_FRACTION * total <= area <= _MAX_AREA_FRACTION * total):
+            continue
+        coords = np.column_stack((pixels % width, pixels // width)).astype(np.float64)
+        center = coords.mean(axis=0)
+        centered = coords - center
+        _, vectors = np.linalg.eigh(np.cov(centered, rowvar=False))
+        major = vectors[:, 1]
+
+        # Deskew to the nearest axis; the card keeps its photographed orientation
+        theta = math.degrees(math.atan2(major[1], major[0]))
+        residual = (theta + 45) % 90 - 45
+        rad = math.radians(residual)
+        axis_x = np.array([math.cos(rad), math.sin(rad)])
+        axis_y = np.array([-math.sin(rad), math.cos(rad)])
+        w = np.ptp(centered @ axis_x) + 1
+        h = np.ptp(centered @ axis_y) + 1
+
+        if area / (w * h) < _MIN_FILL:
+            continue
+        if not _ASPECT_RANGE[0] <= min(w, h) / max(w, h) <= _ASPECT_RANGE[1]:
+            continue
+        # Image y points down, so a card turned counter-clockwise in the photo
+        # gets a negative angle here — exactly the Image.rotate() angle that undoes it.
+        yield float(center[0]), float(center[1]), float(w), float(h), residual
+
+
+def _reading_order(regions: list[CardRegion]) -> list[CardRegion]:
+    """Group regions into rows (centres within half a card height) and sort."""
+    if not regions:
+        return []
+    row_height = float(np.median([min(r.size) for r in regions])) / 2
+    ordered, row = [], []
+    for region in sorted(regions, key=lambda r: r.center[1]):
+        if row and region.center[1] - row[0].center[1] > row_height:
+            ordered.extend(sorted(row, key=lambda r: r.center[0]))
+            row = []
+        row.append(region)
+    ordered.extend(sorted(row, key=lambda r: r.center[0]))
+    return ordered
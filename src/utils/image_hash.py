@@ -0,0 +1,100 @@
+"""
+Perceptual image hashing and Hamming-distance lookup.
+
+A difference hash (dHash) survives recompression, small crops and phone
+re-saves, so two shots of the same card land a few bits apart while an
+exact byte hash would differ completely.  ``BKTree`` finds every stored hash
+within a given Hamming distance without scanning them all.
+
+Pillow and NumPy are optional: without them ``dhash`` returns None and
+callers simply skip near-duplicate matching.
+"""
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+    _HAS_IMAGING = True
+except ImportError:
+    _HAS_IMAGING = False
+
+from src.utils.image_prep import _as_file
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(img_bytes: bytes, hash_size: int = 8) -> int | None:
+    """
+    Return the ``hash_size``² -bit difference hash of an image, or None when
+    the bytes cannot be decoded (or Pillow/NumPy are not installed).
+    """
+    if not _HAS_IMAGING:
+        return None
+    try:
+        with Image.open(_as_file(img_bytes)) as img:
+            # Decode a JPEG in grayscale at up to 1/8 scale; the hash only needs a few pixels
+            img.draft("L", (hash_size * 8, hash_size * 8))
+            gray = img.convert("L").resize(
+                (hash_size + 1, hash_size), Image.Resampling.LANCZOS
+            )
+            pixels = np.asarray(gray, dtype=np.int16)
+    except Exception as exc:
+        logger.debug("Cannot compute perceptual hash: %s", exc)
+        return None
+
+    # One bit per horizontally adjacent pixel pair: is the right one brighter?
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance.
+
+    ``add`` stores a value under a hash; ``search`` returns ``(distance,
+    value)`` pairs for every hash within ``max_distance``, nearest first.
+    """
+
+    def __init__(self):
+        self._root = None   # [hash, [values], {distance: child}]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, value) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [hash_value, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(hash_value, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, [value], {}]
+                return
+            node = child
+
+    def search(self, hash_value: int, max_distance: int) -> list:
+        matches = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(hash_value, node[0])
+            if distance <= max_distance:
+                matches.extend((distance, value) for value in node[1])
+            # Triangle inequality: only children in [d - r, d + r] can match
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
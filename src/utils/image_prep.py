@@ -0,0 +1,99 @@
+"""
+Image preprocessing before a vision upload.
+
+Phone photos arrive as multi-megabyte JPEGs, sometimes rotated via EXIF or
+as animated GIFs.  The vision model downsamples large images anyway, so
+sending the original only costs upload time and request size.
+``prepare_image`` applies the EXIF orientation, keeps the first GIF frame,
+fits the image inside ``max_edge`` and re-encodes it as JPEG or WebP.  A
+large JPEG is decoded at a reduced DCT scale that still covers the target
+size, so a 12 MP photo never occupies ~36 MB of pixels just to be shrunk.
+
+Pillow is optional: without it (or for bytes it cannot decode) the
+original bytes are returned unchanged.
+"""
+import io
+import logging
+
+try:
+    from PIL import Image, ImageOps
+    _HAS_PIL = True
+except ImportError:
+    _HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+_OUTPUT_FORMATS = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+_EXIF_ORIENTATION = 0x0112
+
+
+def prepare_image(
+    img_bytes: bytes,
+    media_type: str,
+    max_edge: int = 1536,
+    output_format: str = "JPEG",
+    quality: int = 85,
+) -> tuple[bytes, str]:
+    """
+    Return ``(bytes, media_type)`` ready for upload.
+
+    The original is kept when it cannot be decoded, or when it already fits,
+    needs no rotation and re-encoding would not make it smaller.
+    """
+    output_format = output_format.upper()
+    if not _HAS_PIL or output_format not in _OUTPUT_FORMATS:
+        return img_bytes, media_type
+
+    try:
+        with Image.open(_as_file(img_bytes)) as img:
+            img.seek(0)  # first frame of animated GIFs
+            original_size = img.size
+            img.draft(None, _fit(original_size, max_edge))   # JPEG only; others decode in full
+            rotated = img.getexif().get(_EXIF_ORIENTATION, 1) != 1
+            # Work on the decoded image itself (no copy) while the file is open
+            frame = _flatten(ImageOps.exif_transpose(img) if rotated else img)
+            frame.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+            buf = io.BytesIO()
+            frame.save(buf, format=output_format, quality=quality, optimize=True)
+            prepared = buf.getvalue()
+    except Exception as exc:
+        logger.debug("Image preprocessing skipped: %s", exc)
+        return img_bytes, media_type
+
+    unchanged = frame.size == original_size and not rotated
+    if unchanged and len(prepared) >= len(img_bytes) and media_type in _OUTPUT_FORMATS.values():
+        logger.info("Image upload: %d bytes (kept original, %dx%d)", len(img_bytes), *original_size)
+        return img_bytes, media_type
+
+    logger.info(
+        "Image upload: %d → %d bytes (%dx%d → %dx%d %s)",
+        len(img_bytes), len(prepared), *original_size, *frame.size, output_format,
+    )
+    return prepared, _OUTPUT_FORMATS[output_format]
+
+
+def _fit(size: tuple[int, int], max_edge: int) -> tuple[int, int]:
+    """``size`` scaled down (never up) so its longer side is at most ``max_edge``."""
+    scale = min(1.0, max_edge / max(size))
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def _flatten(img):
+    """Convert to RGB, compositing any transparency onto white."""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, "white")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _as_file(data):
+    """File object over ``data``; memory maps are read in place rather than copied."""
+    if hasattr(data, "seek"):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
@@ -0,0 +1,236 @@
+"""
+Robust price estimation from comparable listings.
+
+``estimate`` is the vectorised core.  It works on plain arrays, so pricing
+thousands of comparables for one card takes well under a millisecond:
+
+1. every comp is put on one shipping basis: its delivered price (price +
+   shipping) minus the typical shipping cost of the set, so a $10 card with
+   free shipping and a $6 card with $4 shipping count the same;
+2. outliers are trimmed by robust z-score (median / MAD), or by the IQR
+   fences when more than half the prices are identical (MAD of 0);
+3. the price is the weighted median of what is left, using the weights
+   from ``weigh_comps`` (condition match × title similarity);
+4. a 95% interval comes from the MAD and the effective sample size, and
+   ``confidence`` (0–1) combines sample size with the interval's width.
+
+``estimate_price`` does the same for listing dicts.  Without NumPy the
+price is a plain median and the confidence is reported as unknown.
+"""
+import math
+import re
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from statistics import median
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+import src.config as config
+
+_MIN_COMPS_FOR_TRIMMING = 4   # fewer comps than this are all kept
+_MAD_TO_SIGMA = 1.4826        # MAD × this estimates the standard deviation
+_MEDIAN_SE_FACTOR = 1.2533    # standard error of a median ≈ this × σ / √n
+_Z_95 = 1.96
+_CONFIDENCE_HALF_N = 4        # effective comps at which the sample-size factor is 0.5
+_HIGH_CONFIDENCE = 0.6
+_MEDIUM_CONFIDENCE = 0.35
+
+_CONDITION_MATCH_WEIGHT = {True: 1.0, None: 0.8, False: 0.4}   # same / unknown / different group
+_MIN_TITLE_WEIGHT = 0.2       # weight of a comp sharing no words with the query
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class PriceEstimate:
+    price: float | None
+    low: float | None
+    high: float | None
+    confidence: float | None      # 0–1, None when it could not be assessed
+    level: str                    # high / medium / low; unknown without NumPy; none without a price
+    comps_used: int
+    outliers: int
+
+    def summary(self) -> dict:
+        """JSON-ready form returned to the UI."""
+        return asdict(self)
+
+
+_NO_ESTIMATE = PriceEstimate(None, None, None, None, "none", 0, 0)
+
+
+def estimate(prices, shipping=None, weights=None) -> PriceEstimate:
+    """
+    Estimate a price from arrays of comp prices, shipping costs (NaN when
+    unknown) and relative weights; non-finite or negative prices are ignored.
+    """
+    if not _HAS_NUMPY:
+        return _estimate_without_numpy(prices)
+
+    values = np.asarray(prices, dtype=float)
+    ship = np.full(values.shape, np.nan) if shipping is None else np.asarray(shipping, dtype=float)
+    w = np.ones(values.shape) if weights is None else np.asarray(weights, dtype=float)
+
+    valid = np.isfinite(values) & (values >= 0)
+    values, ship, w = values[valid], ship[valid], w[valid]
+    if values.size == 0:
+        return _NO_ESTIMATE
+
+    known = np.isfinite(ship)
+    if known.any():
+        typical = _median(ship[known])
+        values = values + np.where(known, ship, typical) - typical
+
+    w = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+    if w.sum() == 0:
+        w = np.ones(values.shape)
+
+    # Sort once: medians and quartiles become index lookups, and the kept
+    # comps stay sorted for the weighted median
+    order = np.argsort(values)
+    values, w = values[order], w[order]
+    keep = _inliers(values)
+    values, w = values[keep], w[keep]
+    price = max(0.0, _weighted_median(values, w))
+
+    n_eff = w.sum() ** 2 / np.square(w).sum()
+    sigma = _MAD_TO_SIGMA * _median(np.abs(values - _sorted_quantile(values, 0.5)))
+    half_width = _Z_95 * _MEDIAN_SE_FACTOR * sigma / math.sqrt(n_eff)
+    relative = half_width / price if price > 0 else 1.0
+    confidence = float(n_eff / (n_eff + _CONFIDENCE_HALF_N) * max(0.0, 1.0 - relative))
+
+    return PriceEstimate(
+        price=round(price, 2),
+        low=round(max(0.0, price - half_width), 2),
+        high=round(price + half_width, 2),
+        confidence=round(confidence, 3),
+        level=_level(confidence),
+        comps_used=int(values.size),
+        outliers=int(keep.size - keep.sum()),
+    )
+
+
+def estimate_price(listings: list) -> PriceEstimate:
+    """Estimate a price from comp dicts (``price``, optional ``shipping`` and ``weight``)."""
+    prices, shipping, weights = [], [], []
+    for listing in listings or []:
+        price = _number(listing.get("price"))
+        if price is None:
+            continue
+        ship = _number(listing.get("shipping"))
+        weight = _number(listing.get("weight"))
+        prices.append(price)
+        shipping.append(math.nan if ship is None else ship)
+        weights.append(1.0 if weight is None else weight)
+    if not prices:
+        return _NO_ESTIMATE
+    return estimate(prices, shipping, weights)
+
+
+def weigh_comps(listings: list, condition: str | None = None, reference: str | None = None) -> list:
+    """
+    Return copies of ``listings`` with a ``weight``: how closely each comp's
+    condition matches ``condition`` times how many of the words in
+    ``reference`` (the search query) its title contains.
+    """
+    group = _condition_group(condition)
+    wanted = set(_TOKEN_RE.findall(reference.lower())) if reference else set()
+    weighted = []
+    for listing in listings or []:
+        comp_group = _condition_group(listing.get("condition"))
+        match = None if group is None or comp_group is None else group == comp_group
+        weight = _CONDITION_MATCH_WEIGHT[match]
+        if wanted:
+            found = wanted.intersection(_TOKEN_RE.findall(str(listing.get("title", "")).lower()))
+            weight *= _MIN_TITLE_WEIGHT + (1 - _MIN_TITLE_WEIGHT) * len(found) / len(wanted)
+        weighted.append({**listing, "weight": round(weight, 4)})
+    return weighted
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _inliers(values: "np.ndarray") -> "np.ndarray":
+    """Boolean mask of the (sorted) values that are not outliers."""
+    if values.size < _MIN_COMPS_FOR_TRIMMING:
+        return np.ones(values.shape, dtype=bool)
+    distance = np.abs(values - _sorted_quantile(values, 0.5))
+    mad = _median(distance)
+    if mad > 0:
+        return distance <= config.PRICE_OUTLIER_Z * _MAD_TO_SIGMA * mad
+    q1, q3 = _sorted_quantile(values, 0.25), _sorted_quantile(values, 0.75)
+    fence = 1.5 * (q3 - q1)
+    return (values >= q1 - fence) & (values <= q3 + fence)
+
+
+def _weighted_median(values: "np.ndarray", weights: "np.ndarray") -> float:
+    """
+    Weighted median of sorted ``values``; with equal weights it is the
+    ordinary median, including the average of the two middle values for an
+    even count.
+    """
+    cumulative = np.cumsum(weights)
+    half = cumulative[-1] / 2
+    i = int(np.searchsorted(cumulative, half - 1e-9 * cumulative[-1]))   # tolerate float sums
+    if i + 1 < values.size and math.isclose(cumulative[i], half):
+        return float(values[i] + values[i + 1]) / 2
+    return float(values[i])
+
+
+def _sorted_quantile(values: "np.ndarray", q: float) -> float:
+    """Linearly interpolated quantile of sorted ``values`` (NumPy's default method)."""
+    position = q * (values.size - 1)
+    below = int(position)
+    above = min(below + 1, values.size - 1)
+    return float(values[below] + (values[above] - values[below]) * (position - below))
+
+
+def _median(values: "np.ndarray") -> float:
+    """Median of unsorted ``values`` by partial sort."""
+    half = values.size // 2
+    if values.size % 2:
+        return float(np.partition(values, half)[half])
+    part = np.partition(values, (half - 1, half))
+    return float(part[half - 1] + part[half]) / 2
+
+
+def _level(confidence: float) -> str:
+    if confidence >= _HIGH_CONFIDENCE:
+        return "high"
+    if confidence >= _MEDIUM_CONFIDENCE:
+        return "medium"
+    return "low"
+
+
+@lru_cache(maxsize=256)
+def _condition_group(condition) -> str | None:
+    """Coarse condition bucket shared by analysis output and eBay condition names."""
+    if not condition:
+        return None
+    text = str(condition).lower().replace("_", " ").replace("-", " ")
+    if "parts" in text or "not working" in text:
+        return "parts"
+    if "graded" in text and "ungraded" not in text:
+        return "graded"
+    if re.search(r"\bnew\b", text) and "like new" not in text:
+        return "new"
+    return "used"
+
+
+def _number(value) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _estimate_without_numpy(prices) -> PriceEstimate:
+    values = [p for p in (_number(p) for p in prices) if p is not None and p >= 0]
+    if not values:
+        return _NO_ESTIMATE
+    return PriceEstimate(round(median(values), 2), None, None, None, "unknown", len(values), 0)
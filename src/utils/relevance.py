@@ -0,0 +1,114 @@
+"""
+Relevance filtering of comparable listings before pricing.
+
+Keyword search returns lots, reprints and other players' cards next to the
+card we are pricing.  ``score_titles`` rates every comp title against the
+analysis fields (player, set, year, card number, grade, brand, model) in
+one pass over the comp list:
+
+1. the analysis fields become weighted reference terms — the player name
+   and card number count most;
+2. each reference term gets a smoothed IDF over the comp titles, so a term
+   every comp shares (the brand) says little and a rarer one (the player,
+   the card number) says a lot;
+3. a title's score is the share of the reference's TF-IDF mass it contains,
+   computed for all titles at once as a title × term presence matrix;
+4. titles with lot/reprint words the analysis does not have are penalised.
+
+``filter_comps`` drops comps scoring below ``PRICE_MIN_RELEVANCE`` times the
+best score.  The threshold is relative because eBay titles never repeat the
+analysis verbatim.  When no comp matches any reference term there is
+nothing to judge by, and every comp is kept.  Without NumPy no comps are
+dropped.
+"""
+import logging
+import re
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+import src.config as config
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Analysis field → weight of its terms in the reference
+_FIELD_WEIGHTS = {
+    'player_name': 3.0,
+    'card_number': 2.0,
+    'set_name': 1.5,
+    'year': 1.5,
+    'grade': 1.5,
+    'brand': 1.0,
+    'model': 1.0,
+}
+_NOISE_TERMS = frozenset({
+    'lot', 'lots', 'bundle', 'reprint', 'reprints', 'rp', 'proxy', 'replica', 'facsimile', 'novelty',
+})
+_NOISE_PENALTY = 0.25          # score multiplier for a title with a noise term
+
+
+def score_titles(titles: list, analysis: dict) -> "np.ndarray":
+    """Relevance of each title to ``analysis``, from 0 (nothing in common) to 1."""
+    reference = _reference_terms(analysis)
+    scores = np.zeros(len(titles))
+    if not titles or not reference:
+        return scores
+
+    # Only reference and noise terms matter, so they are the whole vocabulary
+    columns = {term: i for i, term in enumerate(reference)}
+    for term in _NOISE_TERMS.difference(reference):
+        columns[term] = len(columns)
+    rows, cols = [], []
+    for row, title in enumerate(titles):
+        for token in set(_TOKEN_RE.findall(str(title).lower())):
+            col = columns.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    present = np.zeros((len(titles), len(columns)), dtype=bool)
+    present[rows, cols] = True
+
+    k = len(reference)
+    idf = np.log((1 + len(titles)) / (1 + present[:, :k].sum(axis=0))) + 1
+    mass = np.fromiter(reference.values(), dtype=float, count=k) * idf
+    scores = present[:, :k] @ mass / mass.sum()
+    return np.where(present[:, k:].any(axis=1), scores * _NOISE_PENALTY, scores)
+
+
+def filter_comps(listings: list, analysis: dict) -> list:
+    """
+    The comps in ``listings`` relevant enough to price ``analysis`` from, in
+    their original order.
+    """
+    listings = list(listings or [])
+    if not _HAS_NUMPY or len(listings) < 2 or config.PRICE_MIN_RELEVANCE <= 0:
+        return listings
+    scores = score_titles([listing.get('title', '') for listing in listings], analysis)
+    best = scores.max()
+    if best <= 0:
+        return listings
+    keep = scores >= config.PRICE_MIN_RELEVANCE * best
+    if not keep.all():
+        logger.debug("Dropped %d of %d comps as irrelevant", int(keep.size - keep.sum()), keep.size)
+    return [listing for listing, kept in zip(listings, keep) if kept]
+
+
+def _reference_terms(analysis: dict) -> dict:
+    """Term → weight for the analysis fields; a term in several fields keeps its highest weight."""
+    terms = {}
+    for field, weight in _FIELD_WEIGHTS.items():
+        value = analysis.get(field)
+        if not value:
+            continue
+        text = str(value).lower()
+        if field == 'grade' and ('ungraded' in text or 'raw' in text):
+            continue        # sellers rarely write it, and condition weighting covers raw cards
+        for term in _TOKEN_RE.findall(text):
+            if terms.get(term, 0.0) < weight:
+                terms[term] = weight
+    return terms
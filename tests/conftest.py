@@ -4,11 +4,35 @@ import pytest
 
 
 @pytest.fixture(autouse=True)
-def force_mock_mode(monkeypatch):
+def force_mock_mode(monkeypatch, tmp_path):
     """Always run tests in safe mock mode and reload config-dependent clients."""
     monkeypatch.setenv("USE_OPENAI_MOCK", "True")
     monkeypatch.setenv("USE_EBAY_MOCK", "True")
 
+    # Keep settings and persisted tokens out of the real data dir and OS keychain
+    import src.settings_store as settings_store
+
+    monkeypatch.setenv("CARDS4SALE_DATA_DIR", str(tmp_path))
+    # create_app() attaches file log handlers; keep them out of the repo's logs/ dir
+    import src.logging_config as logging_config
+
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path / "logs")
+    monkeypatch.setattr(settings_store, "_keyring_get", lambda key: None)
+    monkeypatch.setattr(settings_store, "_keyring_set", lambda key, value: False)
+    monkeypatch.setattr(settings_store, "_keyring_delete", lambda key: None)
+
+    # Keep cache tables, counters and circuit breakers from leaking between tests
+    import src.database as db
+    from src.api import analysis_cache, comps_index, rate_limit, resilience, search_cache, single_flight
+
+    monkeypatch.setattr(db, "DATABASE_PATH", tmp_path / "conftest_listings.db")
+    analysis_cache.reset_stats()
+    search_cache.reset()
+    comps_index.reset()
+    single_flight.reset()
+    rate_limit.reset()
+    resilience.reset()
+
     import src.config as config
     import src.api.openai_client as openai_client
     import src.api.ebay_client as ebay_client
@@ -0,0 +1,240 @@
+"""
+Tests for the vision analysis cache — database helpers, key derivation,
+perceptual hashing and the describe_image integration.
+"""
+import json
+import time
+
+import pytest
+
+import src.database as db
+import src.api.openai_client as openai_client
+from src.api import http_session
+from src.api import analysis_cache
+
+CHROME = {"brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards", "condition": "Near Mint"}
+CHROME_REPLY = json.dumps(CHROME)
+
+
+@pytest.fixture
+def real_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    img_path = tmp_path / "card.jpg"
+    img_path.write_bytes(b"FAKE_JPEG_DATA")
+    return str(img_path)
+
+
+@pytest.fixture
+def counting_post(monkeypatch):
+    calls = []
+
+    class FakeResponse:
+        def __init__(self, content):
+            self._content = content
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"choices": [{"message": {"content": self._content}}]}
+
+    def install(content=CHROME_REPLY):
+        def fake_post(url, headers, json=None, timeout=None):
+            calls.append(json)
+            return FakeResponse(content)
+
+        monkeypatch.setattr(http_session, "post", fake_post)
+        return calls
+
+    return install
+
+
+# ---------------------------------------------------------------------------
+# Database helpers
+# ---------------------------------------------------------------------------
+
+def test_cache_round_trip_and_expiry(monkeypatch):
+    assert db.put_cached_analysis("k1", {"brand": "Topps"}, max_entries=10)
+    assert db.get_cached_analysis("k1", max_age_seconds=60) == {"brand": "Topps"}
+
+    real_time = time.time
+    monkeypatch.setattr(db.time, "time", lambda: real_time() + 120)
+    assert db.get_cached_analysis("k1", max_age_seconds=60) is None
+    assert db.get_analysis_cache_size() == 0
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(db.time, "time", lambda: next(clock))
+
+    db.put_cached_analysis("a", {"n": 1}, max_entries=2)
+    db.put_cached_analysis("b", {"n": 2}, max_entries=2)
+    assert db.get_cached_analysis("a", max_age_seconds=None) == {"n": 1}  # "a" now most recent
+    db.put_cached_analysis("c", {"n": 3}, max_entries=2)
+
+    assert db.get_cached_analysis("b", max_age_seconds=None) is None
+    assert db.get_cached_analysis("a", max_age_seconds=None) == {"n": 1}
+    assert db.get_cached_analysis("c", max_age_seconds=None) == {"n": 3}
+
+
+def test_cache_key_depends_on_bytes_model_and_prompt():
+    base = analysis_cache.cache_key(b"img", "gpt-4o", "prompt")
+    assert base == analysis_cache.cache_key(b"img", "gpt-4o", "prompt")
+    assert base != analysis_cache.cache_key(b"img2", "gpt-4o", "prompt")
+    assert base != analysis_cache.cache_key(b"img", "gpt-4o-mini", "prompt")
+    assert base != analysis_cache.cache_key(b"img", "gpt-4o", "prompt v2")
+
+
+# ---------------------------------------------------------------------------
+# describe_image integration
+# ---------------------------------------------------------------------------
+
+def test_repeat_upload_is_served_from_cache(real_mode, counting_post):
+    calls = counting_post()
+
+    first = openai_client.describe_image(real_mode)
+    second = openai_client.describe_image(real_mode)
+
+    assert first == second == CHROME
+    assert len(calls) == 1
+    stats = analysis_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+def test_bypass_flag_forces_fresh_call(real_mode, counting_post):
+    calls = counting_post()
+
+    openai_client.describe_image(real_mode)
+    openai_client.describe_image(real_mode, use_cache=False)
+
+    assert len(calls) == 2
+    assert analysis_cache.stats()["bypassed"] == 1
+
+
+def test_disabled_cache_never_stores(real_mode, counting_post, monkeypatch):
+    monkeypatch.setattr(openai_client, "ANALYSIS_CACHE_ENABLED", False)
+    calls = counting_post()
+
+    openai_client.describe_image(real_mode)
+    openai_client.describe_image(real_mode)
+
+    assert len(calls) == 2
+    assert db.get_analysis_cache_size() == 0
+
+
+def test_unparseable_reply_is_not_cached(real_mode, counting_post):
+    calls = counting_post("Sorry, I cannot help with that.")
+
+    result = openai_client.describe_image(real_mode)
+    openai_client.describe_image(real_mode)
+
+    assert result["brand"] == "Unknown"
+    vision_calls = [c for c in calls if c["messages"][0]["role"] == "user"]
+    assert len(vision_calls) == 2               # plus one text-only repair attempt each
+    assert len(calls) == 4
+    assert db.get_analysis_cache_size() == 0
+
+
+def test_analysis_cache_endpoints(real_mode, counting_post):
+    from src.app import create_app
+
+    counting_post()
+    openai_client.describe_image(real_mode)
+    client = create_app().test_client()
+
+    stats = client.get("/api/cache/analysis").get_json()
+    assert stats["entries"] == 1 and stats["misses"] == 1
+
+    cleared = client.delete("/api/cache/analysis").get_json()
+    assert cleared == {"success": True, "removed": 1}
+
+
+# ---------------------------------------------------------------------------
+# Perceptual hashing / near-duplicate reuse
+# ---------------------------------------------------------------------------
+
+def _card_photo(fmt="JPEG", quality=95, crop=0):
+    Image = pytest.importorskip("PIL.Image")
+    import io
+    import random
+
+    rng = random.Random(7)
+    img = Image.new("RGB", (240, 320), "white")
+    for _ in range(40):
+        x, y = rng.randrange(220), rng.randrange(300)
+        img.paste((rng.randrange(256), rng.randrange(256), rng.randrange(256)), (x, y, x + 20, y + 20))
+    if crop:
+        img = img.crop((crop, crop, 240 - crop, 320 - crop))
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=quality)
+    return buf.getvalue()
+
+
+def test_bk_tree_matches_brute_force():
+    import random
+    from src.utils.image_hash import BKTree, hamming
+
+    rng = random.Random(3)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    tree = BKTree()
+    for index, value in enumerate(hashes):
+        tree.add(value, index)
+
+    probe = hashes[42] ^ 0b1011
+    expected = sorted(i for i, value in enumerate(hashes) if hamming(probe, value) <= 12)
+    assert sorted(index for _, index in tree.search(probe, 12)) == expected
+    assert tree.search(probe, 12)[0] == (3, 42)
+
+
+def test_dhash_survives_recompression_and_small_crop():
+    from src.utils.image_hash import dhash, hamming
+
+    original = dhash(_card_photo())
+    assert original is not None
+    assert hamming(original, dhash(_card_photo(quality=40))) <= 6
+    assert hamming(original, dhash(_card_photo(fmt="PNG", crop=3))) <= 6
+    assert dhash(b"FAKE_JPEG_DATA") is None
+
+
+def test_resaved_photo_reuses_prior_analysis(real_mode, counting_post, tmp_path):
+    calls = counting_post()
+    original = tmp_path / "first.jpg"
+    original.write_bytes(_card_photo())
+    resaved = tmp_path / "resaved.jpg"
+    resaved.write_bytes(_card_photo(quality=40))
+
+    openai_client.describe_image(str(original))
+    result = openai_client.describe_image(str(resaved))
+
+    distance = result.pop("_cache_distance")
+    assert result == {**CHROME, "_cache": "near"} and 0 <= distance <= 6
+    assert len(calls) == 1
+    assert analysis_cache.stats()["near_hits"] == 1
+
+
+def test_near_duplicates_are_not_reused_across_a_model_change(real_mode, counting_post, tmp_path, monkeypatch):
+    calls = counting_post()
+    original = tmp_path / "first.jpg"
+    original.write_bytes(_card_photo())
+    resaved = tmp_path / "resaved.jpg"
+    resaved.write_bytes(_card_photo(quality=40))
+
+    openai_client.describe_image(str(original))
+    monkeypatch.setattr(openai_client, "OPENAI_MODEL", "gpt-other")
+    result = openai_client.describe_image(str(resaved))
+
+    assert result == CHROME
+    assert len(calls) == 2
+    assert analysis_cache.stats()["near_hits"] == 0
+
+
+def test_near_duplicate_lookup_can_be_disabled(real_mode, counting_post, tmp_path, monkeypatch):
+    monkeypatch.setattr(openai_client, "ANALYSIS_CACHE_PHASH_DISTANCE", -1)
+    calls = counting_post()
+    for name, quality in (("first.jpg", 95), ("resaved.jpg", 40)):
+        path = tmp_path / name
+        path.write_bytes(_card_photo(quality=quality))
+        openai_client.describe_image(str(path))
+
+    assert len(calls) == 2
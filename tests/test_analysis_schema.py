@@ -0,0 +1,135 @@
+"""
+Tests for src/api/analysis_schema.py and the structured-output / repair
+path of describe_image.
+"""
+import json
+
+import pytest
+
+import src.api.openai_client as openai_client
+from src.api import http_session
+from src.api.analysis_schema import ANALYSIS_SCHEMA, RESPONSE_FORMAT, parse_analysis
+
+ITEM = {
+    "brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards", "condition": "Near Mint",
+    "features": ["Refractor"], "estimated_value_range": "$10-20", "grading_notes": [],
+    "player_name": "Derek Jeter", "set_name": None, "year": "1996", "card_number": None, "grade": None,
+}
+
+
+def _strict_objects(schema):
+    if schema.get("type") == "object":
+        yield schema
+        for prop in schema["properties"].values():
+            yield from _strict_objects(prop)
+    elif schema.get("type") == "array":
+        yield from _strict_objects(schema["items"])
+
+
+def test_schema_satisfies_strict_mode_rules():
+    assert RESPONSE_FORMAT["json_schema"]["strict"] is True
+    for obj in _strict_objects(ANALYSIS_SCHEMA):
+        assert obj["additionalProperties"] is False
+        assert set(obj["required"]) == set(obj["properties"])
+
+
+def test_single_card_is_unwrapped_without_null_fields():
+    analysis, error = parse_analysis(json.dumps({"cards": [ITEM]}))
+
+    assert error == ""
+    assert analysis["player_name"] == "Derek Jeter"
+    assert "set_name" not in analysis and "cards" not in analysis
+
+
+def test_several_cards_keep_the_lot_shape():
+    analysis, _ = parse_analysis(json.dumps({"cards": [ITEM, {**ITEM, "model": "Finest"}]}))
+
+    assert [card["model"] for card in analysis["cards"]] == ["Chrome", "Finest"]
+
+
+@pytest.mark.parametrize("content, error", [
+    ("not json", "not valid JSON"),
+    ("[1, 2]", "must be a JSON object"),
+    (json.dumps({"cards": [{**ITEM, "condition": ""}]}), "condition"),
+    (json.dumps({"cards": []}), "Cards list is empty"),
+])
+def test_invalid_replies_explain_the_problem(content, error):
+    analysis, message = parse_analysis(content)
+
+    assert analysis is None
+    assert error in message
+
+
+def test_free_text_reply_with_embedded_object_still_parses():
+    analysis, _ = parse_analysis("Here you go:\n" + json.dumps(ITEM) + "\nThanks")
+
+    assert analysis["model"] == "Chrome"
+
+
+# ---------------------------------------------------------------------------
+# describe_image integration
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def replies(monkeypatch, tmp_path):
+    """Queue of reply contents; returns (image path, list of sent payloads)."""
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    img_path = tmp_path / "card.jpg"
+    img_path.write_bytes(b"FAKE_JPEG_DATA")
+    sent = []
+
+    def install(*contents):
+        queue = list(contents)
+
+        class FakeResponse:
+            def __init__(self, content):
+                self._content = content
+
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"choices": [{"message": {"content": self._content}}]}
+
+        def fake_post(url, headers, json=None, timeout=None):
+            sent.append(json)
+            return FakeResponse(queue.pop(0))
+
+        monkeypatch.setattr(http_session, "post", fake_post)
+        return str(img_path), sent
+
+    return install
+
+
+def test_vision_request_asks_for_strict_schema(replies):
+    path, sent = replies(json.dumps({"cards": [ITEM]}))
+
+    assert openai_client.describe_image(path)["brand"] == "Topps"
+    assert sent[0]["response_format"] == RESPONSE_FORMAT
+    assert len(sent) == 1
+
+
+def test_malformed_reply_is_repaired_without_a_second_vision_call(replies):
+    broken = '{"cards": [{"brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards"'
+    path, sent = replies(broken, json.dumps({"cards": [ITEM]}))
+
+    analysis = openai_client.describe_image(path)
+
+    assert analysis["model"] == "Chrome"
+    repair = sent[1]
+    assert all(isinstance(message["content"], str) for message in repair["messages"])  # no image
+    assert broken in repair["messages"][1]["content"]
+    # The repaired analysis is cached like any other
+    assert openai_client.describe_image(path)["model"] == "Chrome"
+    assert len(sent) == 2
+
+
+def test_repair_can_be_disabled(replies, monkeypatch):
+    monkeypatch.setattr(openai_client, "ANALYSIS_REPAIR_ENABLED", False)
+    monkeypatch.setattr(openai_client, "OPENAI_STRUCTURED_OUTPUT", False)
+    path, sent = replies("no json here")
+
+    assert openai_client.describe_image(path)["brand"] == "Unknown"
+    assert len(sent) == 1
+    assert "response_format" not in sent[0]
@@ -0,0 +1,157 @@
+"""
+Tests for the asyncio pipeline: async_openai_client, async_ebay_client and
+AsyncListingService.  HTTP is served by httpx.MockTransport — no network.
+"""
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import src.api.async_ebay_client as async_ebay
+import src.api.async_openai_client as async_openai
+import src.api.ebay_client as ebay_client
+import src.api.openai_client as openai_client
+import src.config as config
+from src.services.async_listing_service import AsyncListingService
+
+
+@pytest.fixture
+def real_modes(monkeypatch):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "fake-client-id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "fake-client-secret")
+    monkeypatch.setattr(ebay_client, "EBAY_API_ENDPOINT", "https://api.sandbox.ebay.com")
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_async_describe_image_parses_response(real_modes, tmp_path):
+    img_path = tmp_path / "card.png"
+    img_path.write_bytes(b"FAKE_PNG_DATA")
+    seen = {}
+
+    def handler(request):
+        seen["body"] = json.loads(request.content)
+        content = json.dumps({"brand": "Topps", "model": "Rookie", "category": "Cards", "condition": "Good"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    async def run():
+        async with _client(handler) as client:
+            return await async_openai.describe_image(str(img_path), client=client)
+
+    result = asyncio.run(run())
+    assert result["brand"] == "Topps"
+    image_url = seen["body"]["messages"][0]["content"][1]["image_url"]["url"]
+    assert image_url.startswith("data:image/png;base64,")
+
+
+def test_async_describe_image_falls_back_to_mock_after_retries(real_modes, monkeypatch, tmp_path):
+    img_path = tmp_path / "card.jpg"
+    img_path.write_bytes(b"FAKE")
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0.0)
+
+    async def run():
+        async with _client(lambda request: httpx.Response(500)) as client:
+            return await async_openai.describe_image(str(img_path), client=client)
+
+    result = asyncio.run(run())
+    assert "brand" in result
+
+
+def test_async_search_ebay_parses_finding_response(real_modes):
+    data = {"findItemsByKeywordsResponse": [{"searchResult": [{"item": [{
+        "title": ["Sony WH-1000XM4"],
+        "sellingStatus": [{"currentPrice": [{"__value__": "280.00"}]}],
+        "viewItemURL": ["https://www.ebay.com/itm/12345"],
+    }]}]}]}
+
+    async def run():
+        async with _client(lambda request: httpx.Response(200, json=data)) as client:
+            return await async_ebay.search_ebay("Sony", limit=1, client=client)
+
+    assert asyncio.run(run()) == [
+        {"title": "Sony WH-1000XM4", "price": 280.0, "url": "https://www.ebay.com/itm/12345"}
+    ]
+
+
+def test_async_search_ebay_failure_returns_no_comps(real_modes, monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0.0)
+
+    async def run():
+        async with _client(lambda request: httpx.Response(503)) as client:
+            return await async_ebay.search_ebay("Sony", limit=3, client=client)
+
+    assert asyncio.run(run()) == []
+
+
+def test_async_publish_listing_runs_full_flow(real_modes, monkeypatch):
+    monkeypatch.setattr(ebay_client, "_cached_token", None)
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, request.url.path))
+        if request.url.path.endswith("/oauth2/token"):
+            return httpx.Response(200, json={"access_token": "tok", "expires_in": 7200})
+        if request.method == "PUT":
+            return httpx.Response(204)
+        if request.url.path.endswith("/publish"):
+            return httpx.Response(200, json={"listingId": "LIVE-1"})
+        return httpx.Response(200, json={"offerId": "offer-1"})
+
+    async def run():
+        async with _client(handler) as client:
+            return await async_ebay.publish_listing({"sku": "SKU-1", "price": {"value": "9.99"}}, client=client)
+
+    result = asyncio.run(run())
+    assert result == {"status": "published", "external_listing_id": "LIVE-1", "mode": "real"}
+    assert [method for method, _ in calls] == ["POST", "PUT", "POST", "POST"]
+
+
+def test_async_listing_service_overlaps_card_searches():
+    async def describe(_path):
+        return {"cards": [{"brand": "Topps", "model": f"Card {i}", "category": "Cards"} for i in range(10)]}
+
+    async def search(_query, limit=8):
+        await asyncio.sleep(0.1)
+        return [{"title": "x", "price": 12.0, "url": "u"}]
+
+    service = AsyncListingService(
+        describe_image_fn=describe,
+        search_ebay_fn=search,
+        build_listing_payload_fn=lambda title, description, price, condition="USED_GOOD": {},
+        save_listing_fn=lambda **kwargs: 1,
+        max_in_flight=10,
+    )
+    started = time.monotonic()
+    result = asyncio.run(service.process_image("lot.jpg", "lot.jpg"))
+    assert result["success"] is True
+    assert [l["analysis"]["model"] for l in result["listings"]] == [f"Card {i}" for i in range(10)]
+    assert time.monotonic() - started < 0.5
+
+
+def test_async_listing_service_process_images_reports_failures():
+    async def describe(path):
+        if path == "bad.jpg":
+            raise RuntimeError("vision down")
+        return {"brand": "Sony", "model": "X", "category": "Electronics"}
+
+    async def search(_query, limit=8):
+        return []
+
+    service = AsyncListingService(
+        describe_image_fn=describe,
+        search_ebay_fn=search,
+        build_listing_payload_fn=lambda title, description, price, condition="USED_GOOD": {},
+        save_listing_fn=lambda **kwargs: 3,
+    )
+    results = asyncio.run(service.process_images([("good.jpg", "good.jpg"), ("bad.jpg", "bad.jpg")]))
+    assert results[0]["success"] is True
+    assert results[0]["listings"][0]["price_warning"] is True
+    assert results[1]["success"] is False
+    assert results[1]["error"] == "Failed to generate listing"      # not the exception text
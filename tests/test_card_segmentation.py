@@ -0,0 +1,209 @@
+"""
+Tests for local lot-photo segmentation — card detection, deskewed crops and
+the per-crop describe wrapper used by process_listing.
+"""
+import io
+import threading
+import time
+
+import pytest
+
+from src.services.lot_segmentation import merge_card_analyses, with_card_segmentation
+from src.utils.card_segmentation import crop_cards, find_cards
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+np = pytest.importorskip("numpy")
+
+# (centre x, centre y, counter-clockwise tilt in degrees)
+LAYOUT = [(300, 300, 0), (700, 300, 12), (1100, 300, -8), (300, 800, 25), (700, 800, 90), (1150, 850, 5)]
+
+
+def _lot_photo(layout=LAYOUT, size=(1600, 1200)):
+    photo = Image.new("RGB", size, (40, 90, 40))
+    for n, (cx, cy, tilt) in enumerate(layout):
+        card = Image.new("RGB", (250, 350), (230, 230, 220))
+        ImageDraw.Draw(card).rectangle((20, 20, 230, 200), fill=(40 + n * 30, 100, 200))
+        rotated = card.convert("RGBA").rotate(tilt, expand=True)
+        photo.paste(rotated, (cx - rotated.width // 2, cy - rotated.height // 2), rotated)
+    buf = io.BytesIO()
+    photo.save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Detection and cropping
+# ---------------------------------------------------------------------------
+
+def test_find_cards_locates_every_card_in_reading_order():
+    regions = find_cards(_lot_photo())
+
+    assert len(regions) == len(LAYOUT)
+    for region, (cx, cy, tilt) in zip(regions, LAYOUT):
+        assert region.center == pytest.approx((cx, cy), abs=4)
+        assert sorted(region.size) == pytest.approx([250, 350], abs=6)
+        # The deskew angle undoes the tilt (modulo quarter turns)
+        assert (region.angle + tilt + 45) % 90 - 45 == pytest.approx(0, abs=1.5)
+
+
+def test_crops_are_deskewed_card_sized_jpegs():
+    data = _lot_photo()
+    crops = crop_cards(data, find_cards(data))
+
+    assert len(crops) == len(LAYOUT)
+    for crop in crops:
+        img = Image.open(io.BytesIO(crop))
+        assert img.format == "JPEG"
+        assert sorted(img.size) == pytest.approx([265, 371], abs=10)
+        # The artwork block is an upright rectangle once the card is deskewed
+        pixels = np.asarray(img.convert("RGB")).astype(int)
+        artwork = pixels[..., 2] - pixels[..., 1] > 50
+        ys, xs = np.nonzero(artwork)
+        assert artwork.sum() / ((np.ptp(ys) + 1) * (np.ptp(xs) + 1)) > 0.95
+
+
+def test_find_cards_ignores_plain_and_undecodable_photos():
+    blank = io.BytesIO()
+    Image.new("RGB", (640, 480), "white").save(blank, format="PNG")
+
+    assert find_cards(blank.getvalue()) == []
+    assert find_cards(b"FAKE_JPEG_DATA") == []
+
+
+# ---------------------------------------------------------------------------
+# with_card_segmentation
+# ---------------------------------------------------------------------------
+
+def test_lot_photo_is_described_crop_by_crop_concurrently(tmp_path):
+    photo = tmp_path / "lot.jpg"
+    photo.write_bytes(_lot_photo())
+    seen, active, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def fake_describe(path):
+        with lock:
+            seen.append(path)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        n = int(path.rsplit("-", 1)[1].split(".")[0])
+        if n == 2:
+            raise RuntimeError("vision call failed")
+        if n == 4:
+            return {"cards": [{"brand": "Topps", "n": 4}, {"brand": "Topps", "n": 40}]}
+        return {"brand": "Topps", "n": n}
+
+    analysis = with_card_segmentation(fake_describe, max_in_flight=3)(str(photo))
+
+    assert [card["n"] for card in analysis["cards"]] == [0, 1, 3, 4, 40, 5]
+    assert str(photo) not in seen and len(seen) == len(LAYOUT)
+    assert peak[0] > 1
+
+
+def test_single_card_photo_is_described_whole(tmp_path):
+    photo = tmp_path / "single.jpg"
+    photo.write_bytes(_lot_photo(layout=[(400, 400, 3)], size=(800, 800)))
+    calls = []
+
+    def fake_describe(path):
+        calls.append(path)
+        return {"brand": "Panini"}
+
+    assert with_card_segmentation(fake_describe)(str(photo)) == {"brand": "Panini"}
+    assert calls == [str(photo)]
+
+
+def test_whole_photo_fallback_when_every_crop_fails(tmp_path):
+    photo = tmp_path / "lot.jpg"
+    photo.write_bytes(_lot_photo())
+
+    def fake_describe(path):
+        if path != str(photo):
+            raise RuntimeError("vision call failed")
+        return {"cards": [{"brand": "Topps"}]}
+
+    assert with_card_segmentation(fake_describe)(str(photo)) == {"cards": [{"brand": "Topps"}]}
+
+
+def test_merge_card_analyses_flattens_and_skips_junk():
+    merged = merge_card_analyses([{"brand": "A"}, None, {"cards": [{"brand": "B"}, "x"]}, "junk"])
+    assert merged == [{"brand": "A"}, {"brand": "B"}]
+
+
+def test_process_listing_uses_segmentation_when_enabled(monkeypatch, tmp_path):
+    import src.app as app_module
+
+    photo = tmp_path / "lot.jpg"
+    photo.write_bytes(_lot_photo(layout=LAYOUT[:3]))
+    described = []
+
+    def fake_describe(path):
+        described.append(path)
+        return {"brand": "Topps", "model": f"Card {len(described)}", "category": "Sports Trading Cards"}
+
+    monkeypatch.setattr(app_module, "CARD_SEGMENTATION_ENABLED", True)
+    monkeypatch.setattr(app_module, "describe_image", fake_describe)
+    monkeypatch.setattr(app_module, "generate_listing_from_analysis", lambda analysis, *a, **k: analysis)
+
+    result = app_module.process_listing(str(photo), "lot.jpg")
+
+    assert result["success"] and result["count"] == 3
+    assert str(photo) not in described
+
+
+def test_streamed_process_listing_also_segments(monkeypatch, tmp_path):
+    import src.app as app_module
+
+    photo = tmp_path / "lot.jpg"
+    photo.write_bytes(_lot_photo(layout=LAYOUT[:3]))
+    monkeypatch.setattr(app_module, "VISION_STREAMING", True)
+    monkeypatch.setattr(app_module, "CARD_SEGMENTATION_ENABLED", True)
+    monkeypatch.setattr(app_module, "describe_image", lambda path: {"brand": "Topps", "model": path[-7:-4]})
+    monkeypatch.setattr(app_module, "describe_image_stream", lambda path: pytest.fail("whole lot streamed"))
+    monkeypatch.setattr(app_module, "generate_listing_from_analysis", lambda analysis, *a, **k: analysis)
+
+    result = app_module.process_listing(str(photo), "lot.jpg")
+
+    assert [listing["model"] for listing in result["listings"]] == ["000", "001", "002"]
+
+
+def test_listing_services_segment_lot_photos(tmp_path):
+    import asyncio
+
+    from src.services.async_listing_service import AsyncListingService
+    from src.services.listing_service import ListingService
+
+    photo = tmp_path / "lot.jpg"
+    photo.write_bytes(_lot_photo(layout=LAYOUT[:3]))
+    common = dict(
+        build_listing_payload_fn=lambda **kwargs: {},
+        save_listing_fn=lambda **kwargs: 1,
+        card_segmentation=True,
+    )
+
+    def describe(path):
+        return {"brand": "Topps", "model": path[-7:-4], "category": "Sports Trading Cards"}
+
+    async def describe_async(path):
+        return describe(path)
+
+    async def search_async(_query, limit=8):
+        return []
+
+    sync = ListingService(describe_image_fn=describe, search_ebay_fn=lambda _q, limit=8: [], **common)
+    streamed = ListingService(
+        describe_image_fn=describe,
+        describe_image_stream_fn=lambda path: pytest.fail("whole lot streamed"),
+        search_ebay_fn=lambda _q, limit=8: [],
+        **common,
+    )
+    async_service = AsyncListingService(describe_image_fn=describe_async, search_ebay_fn=search_async, **common)
+
+    for result in (
+        sync.process_image(str(photo), "lot.jpg"),
+        streamed.process_image(str(photo), "lot.jpg"),
+        asyncio.run(async_service.process_image(str(photo), "lot.jpg")),
+    ):
+        assert [listing["analysis"]["model"] for listing in result["listings"]] == ["000", "001", "002"]
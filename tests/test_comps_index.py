@@ -0,0 +1,172 @@
+"""
+Tests for the local comparables index — upsert by item, FTS matching,
+freshness and coverage thresholds, retention and the search_ebay
+integration.
+"""
+import time
+
+import pytest
+
+import src.config as config
+import src.api.ebay_client as ebay_client
+from src import database
+from src.api import comps_index, http_session
+
+
+def _comps(count, title="2018 Topps Update Shohei Ohtani US1 Rookie", **extra):
+    return [
+        {"title": f"{title} #{n}", "price": 100.0 + n, "url": f"https://www.ebay.com/itm/{n}", **extra}
+        for n in range(count)
+    ]
+
+
+@pytest.fixture
+def finding_api(monkeypatch):
+    """Real-mode search_ebay against a fake Finding API returning ``items``; returns the call log."""
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    calls = []
+
+    class FakeResponse:
+        def __init__(self, items):
+            self._items = items
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"findItemsByKeywordsResponse": [{"searchResult": [{"item": self._items}]}]}
+
+    def install(items):
+        finding_items = [
+            {
+                "title": [item["title"]],
+                "sellingStatus": [{"currentPrice": [{"__value__": str(item["price"])}]}],
+                "viewItemURL": [item["url"]],
+            }
+            for item in items
+        ]
+
+        def fake_get(url, params=None, timeout=None):
+            calls.append(params["keywords"])
+            return FakeResponse(finding_items)
+
+        monkeypatch.setattr(http_session, "get", fake_get)
+        return calls
+
+    return install
+
+
+def test_query_is_answered_when_enough_fresh_comps_match_every_word():
+    comps_index.record(_comps(10), "finding")
+
+    results = comps_index.lookup("ohtani TOPPS  rookie", 8, "finding")
+
+    assert len(results) == 8
+    assert all("Ohtani" in r["title"] for r in results)
+    assert set(results[0]) == {"title", "price", "url"}
+    assert comps_index.lookup("topps ohtani psa", 8, "finding") is None           # "psa" matches nothing
+    assert comps_index.stats() == {"hits": 1, "misses": 1, "recorded": 10, "hit_rate": 0.5, "entries": 10}
+
+
+def test_thin_coverage_goes_to_the_api(monkeypatch):
+    comps_index.record(_comps(5), "finding")
+    assert comps_index.lookup("ohtani", 8, "finding") is None
+
+    monkeypatch.setattr(config, "COMPS_INDEX_MIN_MATCHES", 3)
+    assert len(comps_index.lookup("ohtani", 8, "finding")) == 5
+
+
+def test_comps_are_upserted_by_item_and_stale_ones_ignored():
+    stale = time.time() - config.COMPS_INDEX_MAX_AGE_SECONDS - 60
+    database.upsert_comps([{**c, "comp_key": c["url"]} for c in _comps(10)], "finding", fetched_at=stale)
+    assert comps_index.lookup("ohtani", 8, "finding") is None
+
+    comps_index.record(_comps(10), "finding")       # same URLs, fetched again now
+    assert comps_index.stats()["entries"] == 10
+    assert len(comps_index.lookup("ohtani", 8, "finding")) == 8
+
+
+def test_comps_not_seen_again_are_dropped_after_retention():
+    old = time.time() - (config.COMPS_INDEX_RETENTION_DAYS + 1) * 86400
+    database.upsert_comps([{"comp_key": "old", "title": "Old comp", "price": 1.0}], "finding", fetched_at=old)
+
+    comps_index.record(_comps(1), "finding")
+
+    assert comps_index.stats()["entries"] == 1
+
+
+def test_browse_fields_survive_the_index():
+    comps_index.record(
+        _comps(8, condition="Ungraded", shipping=4.99, sold=False, currency="USD", item_id=None), "browse"
+    )
+    result = comps_index.lookup("ohtani", 8, "browse")[0]
+    assert result["condition"] == "Ungraded" and result["shipping"] == 4.99 and result["sold"] is False
+
+
+@pytest.mark.parametrize("query", ['AND "OR* (x) NEAR', "", "   ", "-"])
+def test_fts_operators_in_queries_are_harmless(query):
+    comps_index.record(_comps(10), "finding")
+    assert comps_index.lookup(query, 8, "finding") is None
+
+
+def test_comps_only_answer_searches_from_the_same_backend_and_environment():
+    comps_index.record(_comps(10), "finding-sandbox")
+    comps_index.record(_comps(10, title="2018 Bowman Chrome Ohtani"), "finding")
+
+    assert comps_index.lookup("topps ohtani", 8, "finding") is None
+    assert comps_index.lookup("ohtani", 8, "browse") is None
+    assert len(comps_index.lookup("topps ohtani", 8, "finding-sandbox")) == 8
+    assert comps_index.stats()["entries"] == 20         # same URLs, kept apart per scope
+
+
+def test_wide_searches_need_proportional_coverage(monkeypatch):
+    comps_index.record(_comps(60), "browse")
+
+    assert comps_index.lookup("ohtani", 200, "browse") is None          # 60 of the 100 needed
+    assert len(comps_index.lookup("ohtani", 50, "browse")) == 50
+    monkeypatch.setattr(config, "COMPS_INDEX_MIN_COVERAGE", 0.25)
+    assert len(comps_index.lookup("ohtani", 200, "browse")) == 60
+
+
+def test_sandbox_results_are_not_reused_in_production(finding_api, monkeypatch):
+    calls = finding_api(_comps(10))
+    monkeypatch.setattr(ebay_client, "EBAY_SANDBOX", True)
+    ebay_client.search_ebay("Topps Ohtani", limit=8)
+
+    monkeypatch.setattr(ebay_client, "EBAY_SANDBOX", False)
+    ebay_client.search_ebay("Shohei Ohtani", limit=8)
+
+    assert calls == ["Topps Ohtani", "Shohei Ohtani"]
+
+
+def test_new_queries_are_answered_from_earlier_searches(finding_api):
+    calls = finding_api(_comps(10))
+
+    first = ebay_client.search_ebay("Topps Ohtani", limit=8)
+    second = ebay_client.search_ebay("Shohei Ohtani Rookie", limit=8)     # never sent to eBay
+    third = ebay_client.search_ebay("Aaron Judge Rookie", limit=8)
+
+    assert len(first) == 10 and len(second) == 8 and third      # the fake API ignores the page size
+    assert calls == ["Topps Ohtani", "Aaron Judge Rookie"]
+
+
+def test_disabled_index_neither_records_nor_answers(finding_api, monkeypatch):
+    monkeypatch.setattr(config, "COMPS_INDEX_ENABLED", False)
+    calls = finding_api(_comps(10))
+
+    ebay_client.search_ebay("Topps Ohtani", limit=8)
+    ebay_client.search_ebay("Shohei Ohtani", limit=8)
+
+    assert len(calls) == 2 and database.count_comps() == 0
+
+
+def test_comps_index_endpoints():
+    from src.app import create_app
+
+    comps_index.record(_comps(3), "finding")
+    client = create_app().test_client()
+
+    assert client.get("/api/cache/comps").get_json()["entries"] == 3
+    assert client.delete("/api/cache/comps").get_json() == {"success": True, "removed": 3}
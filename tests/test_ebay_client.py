@@ -6,9 +6,9 @@ and leaves credentials unset.  These tests explicitly override module-level
 attributes to exercise branches that only run with real credentials or real mode.
 """
 import pytest
-import requests
 
 import src.api.ebay_client as ebay_client
+from src.api import http_session
 
 
 @pytest.fixture
@@ -66,7 +66,7 @@ def test_get_ebay_token_success(real_ebay_mode, monkeypatch):
         def json(self):
             return {"access_token": "real-token-abc123"}
 
-    monkeypatch.setattr(requests, "post", lambda *a, **kw: FakeTokenResponse())
+    monkeypatch.setattr(http_session, "post", lambda *a, **kw: FakeTokenResponse())
 
     token = ebay_client.get_ebay_token()
     assert token == "real-token-abc123"
@@ -103,7 +103,7 @@ def test_search_ebay_real_mode_success(real_ebay_mode, monkeypatch):
         def json(self):
             return mock_api_data
 
-    monkeypatch.setattr(requests, "get", lambda *a, **kw: FakeResponse())
+    monkeypatch.setattr(http_session, "get", lambda *a, **kw: FakeResponse())
 
     results = ebay_client.search_ebay("Sony WH-1000XM4", limit=1)
     assert len(results) == 1
@@ -123,23 +123,21 @@ def test_search_ebay_real_mode_empty_results(real_ebay_mode, monkeypatch):
         def json(self):
             return empty_response
 
-    monkeypatch.setattr(requests, "get", lambda *a, **kw: FakeResponse())
+    monkeypatch.setattr(http_session, "get", lambda *a, **kw: FakeResponse())
 
     results = ebay_client.search_ebay("xyzzy nonexistent item", limit=5)
     assert results == []
 
 
-def test_search_ebay_real_mode_api_exception_falls_back_to_mock(real_ebay_mode, monkeypatch):
-    """search_ebay should fall back to mock data when the HTTP call fails."""
+def test_search_ebay_real_mode_api_exception_returns_no_comps(real_ebay_mode, monkeypatch):
+    """search_ebay should return no comps, not mock data, when the HTTP call fails."""
 
     def raise_error(*args, **kwargs):
         raise ConnectionError("simulated network failure")
 
-    monkeypatch.setattr(requests, "get", raise_error)
+    monkeypatch.setattr(http_session, "get", raise_error)
 
-    results = ebay_client.search_ebay("laptop", limit=3)
-    assert isinstance(results, list)
-    assert all("title" in r and "price" in r and "url" in r for r in results)
+    assert ebay_client.search_ebay("laptop", limit=3) == []
 
 
 # ---------------------------------------------------------------------------
@@ -207,8 +205,8 @@ def test_publish_listing_real_mode_success(real_ebay_mode, monkeypatch):
         call_log.append(("put", url))
         return FakePutResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
-    monkeypatch.setattr(requests, "put", fake_put)
+    monkeypatch.setattr(http_session, "post", fake_post)
+    monkeypatch.setattr(http_session, "put", fake_put)
 
     payload = {
         "sku": "REAL-SKU-999",
@@ -258,7 +256,7 @@ def test_create_offer_returns_offer_id(real_ebay_mode, monkeypatch):
         posted_bodies.append(kwargs.get("json", {}))
         return FakeOfferResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
 
     offer_id = ebay_client.create_offer("MY-SKU", "12.50", "USD")
     assert offer_id == "offer-xyz"
@@ -294,7 +292,7 @@ def test_create_offer_raises_when_no_offer_id(real_ebay_mode, monkeypatch):
             return FakeTokenResponse()
         return FakeOfferResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
     with pytest.raises(ValueError, match="offerId"):
         ebay_client.create_offer("SKU-X", "5.00", "USD")
 
@@ -329,7 +327,7 @@ def test_publish_offer_returns_listing_id(real_ebay_mode, monkeypatch):
             return FakeTokenResponse()
         return FakePublishResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
 
     listing_id = ebay_client.publish_offer("offer-abc")
     assert listing_id == "LIVE-12345"
@@ -359,6 +357,6 @@ def test_publish_offer_raises_when_no_listing_id(real_ebay_mode, monkeypatch):
             return FakeTokenResponse()
         return FakePublishResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
     with pytest.raises(ValueError, match="listingId"):
         ebay_client.publish_offer("offer-xyz")
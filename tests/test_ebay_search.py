@@ -0,0 +1,214 @@
+"""
+Tests for the pluggable eBay search backends — Browse parsing, parallel
+pagination, per-backend caching and the async client.  The Browse API is
+played by a local stand-in serving a catalogue by offset.
+"""
+import asyncio
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+import src.config as config
+import src.api.async_ebay_client as async_ebay
+import src.api.ebay_client as ebay_client
+from src.api import ebay_search, http_session, search_cache
+
+
+def _summary(n, **extra):
+    item = {
+        "itemId": f"v1|{n}|0",
+        "title": f"Topps Chrome #{n}",
+        "price": {"value": f"{10 + n % 7}.00", "currency": "USD"},
+        "itemWebUrl": f"https://www.ebay.com/itm/{n}",
+        "condition": "Used",
+        "shippingOptions": [{"shippingCost": {"value": "4.99", "currency": "USD"}}],
+    }
+    item.update(extra)
+    return item
+
+
+class FakeBrowseAPI:
+    """Local stand-in for item_summary/search: pages a catalogue by offset and limit."""
+
+    def __init__(self, total, delay=0.0, fail_offsets=()):
+        self.catalogue = [_summary(n) for n in range(total)]
+        self.delay = delay
+        self.fail_offsets = set(fail_offsets)
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def page(self, params, headers):
+        offset, limit = int(params["offset"]), int(params["limit"])
+        with self._lock:
+            self.requests.append({"offset": offset, "limit": limit, "q": params["q"], "headers": dict(headers)})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if offset in self.fail_offsets:
+                raise ConnectionError(f"page at offset {offset} failed")
+            return {"total": len(self.catalogue), "itemSummaries": self.catalogue[offset:offset + limit]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def offsets(self):
+        return sorted(request["offset"] for request in self.requests)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def browse(monkeypatch):
+    """Real-mode search_ebay on the Browse backend; returns an installer for the stand-in."""
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(ebay_client, "_cached_token", "browse-token")
+    monkeypatch.setattr(ebay_client, "_token_expires_at", time.time() + 3600)
+    monkeypatch.setattr(config, "EBAY_SEARCH_BACKEND", "browse")
+    monkeypatch.setattr(config, "EBAY_BROWSE_PAGE_SIZE", 50)
+    monkeypatch.setattr(config, "EBAY_BROWSE_MAX_RESULTS", 200)
+
+    def install(api):
+        def fake_get(url, params=None, headers=None, timeout=None):
+            assert url.endswith("/buy/browse/v1/item_summary/search")
+            return FakeResponse(api.page(params, headers or {}))
+
+        monkeypatch.setattr(http_session, "get", fake_get)
+        return api
+
+    return install
+
+
+def test_browse_items_carry_condition_shipping_and_sold_status():
+    data = {"itemSummaries": [
+        _summary(1),
+        _summary(2, shippingOptions=[{"shippingCost": {"value": "0.00"}}, {"shippingCost": {"value": "9.50"}}]),
+        _summary(3, shippingOptions=[{"shippingCostType": "CALCULATED"}]),
+        _summary(4, price={}),                              # no usable price: skipped
+    ]}
+
+    results = ebay_search.get_backend("browse").parse(data)
+
+    assert results[0] == {
+        "title": "Topps Chrome #1", "price": 11.0, "currency": "USD", "url": "https://www.ebay.com/itm/1",
+        "item_id": "v1|1|0", "condition": "Used", "shipping": 4.99, "sold": False,
+    }
+    assert [r["shipping"] for r in results] == [4.99, 0.0, None]
+
+
+def test_pages_after_the_first_are_fetched_concurrently(browse):
+    api = browse(FakeBrowseAPI(total=230, delay=0.05))
+
+    results = ebay_client.search_ebay("Topps Chrome", limit=8)
+
+    assert len(results) == 200
+    assert api.offsets() == [0, 50, 100, 150]
+    assert {r["limit"] for r in api.requests} == {50}
+    assert api.max_in_flight > 1
+    headers = api.requests[0]["headers"]
+    assert headers["Authorization"] == "Bearer browse-token"
+    assert headers["X-EBAY-C-MARKETPLACE-ID"] == ebay_client.EBAY_MARKETPLACE_ID
+
+
+def test_only_the_pages_the_result_set_needs_are_requested(browse):
+    api = browse(FakeBrowseAPI(total=60))
+
+    assert len(ebay_client.search_ebay("Topps", limit=8)) == 60
+    assert api.offsets() == [0, 50]
+
+
+def test_failed_later_page_is_skipped_but_failed_first_page_returns_no_comps(browse):
+    api = browse(FakeBrowseAPI(total=150, fail_offsets={50}))
+    results = ebay_client.search_ebay("Topps", limit=8)
+    assert len(results) == 100 and sorted(set(api.offsets())) == [0, 50, 100]   # 50 after its retries
+
+    browse(FakeBrowseAPI(total=150, fail_offsets={0}))
+    assert ebay_client.search_ebay("Bowman", limit=8) == []     # never mock comparables
+
+
+def test_duplicates_across_shifting_pages_are_dropped():
+    pages = [[{"item_id": "a", "url": "u1"}, {"item_id": "b", "url": "u2"}], [{"item_id": "b", "url": "u2"}]]
+    assert [i["item_id"] for i in ebay_search.get_backend("browse").collect(pages, 8)] == ["a", "b"]
+
+
+def test_backends_are_cached_separately(browse, monkeypatch):
+    api = browse(FakeBrowseAPI(total=3))
+    ebay_client.search_ebay("Topps", limit=8)
+    ebay_client.search_ebay("topps", limit=8)
+    assert len(api.requests) == 1
+
+    browse_key = ebay_client._search_cache_key("Topps", 8)
+    monkeypatch.setattr(config, "EBAY_SEARCH_BACKEND", "finding")
+    assert ebay_client._search_cache_key("Topps", 8) != browse_key
+    assert len(search_cache.lookup(browse_key)) == 3
+
+
+def test_backend_without_a_parser_cannot_be_created():
+    class RequestOnly(ebay_search.SearchBackend):
+        name = "partial"
+
+        def first_request(self, query, limit, token):
+            return ebay_search.PageRequest("https://comps.local/search", {"q": query})
+
+    with pytest.raises(TypeError):
+        RequestOnly()
+
+
+def test_custom_backend_can_be_registered(browse, monkeypatch):
+    class LocalBackend(ebay_search.SearchBackend):
+        name = "local"
+
+        def first_request(self, query, limit, token):
+            return ebay_search.PageRequest("https://comps.local/search", {"q": query})
+
+        def parse(self, data):
+            return [{"title": t, "price": 5.0, "url": ""} for t in data["titles"]]
+
+    seen = []
+
+    def fake_get(url, params=None, timeout=None):
+        seen.append(url)
+        return FakeResponse({"titles": ["Local comp"]})
+
+    monkeypatch.setitem(ebay_search._backends, "local", LocalBackend())
+    monkeypatch.setattr(config, "EBAY_SEARCH_BACKEND", "local")
+    monkeypatch.setattr(http_session, "get", fake_get)
+
+    assert ebay_client.search_ebay("anything", limit=3) == [{"title": "Local comp", "price": 5.0, "url": ""}]
+    assert seen == ["https://comps.local/search"]
+
+    monkeypatch.setattr(config, "EBAY_SEARCH_BACKEND", "nonsense")
+    assert ebay_search.get_backend().name == "finding"
+
+
+def test_async_search_gathers_browse_pages(browse):
+    api = FakeBrowseAPI(total=120)
+
+    def handler(request):
+        params = {k: v[0] for k, v in parse_qs(urlparse(str(request.url)).query).items()}
+        return httpx.Response(200, json=api.page(params, request.headers))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await async_ebay.search_ebay("Topps Chrome", limit=8, client=client)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 120 and results[0]["condition"] == "Used"
+    assert api.offsets() == [0, 50, 100]
+    assert api.requests[0]["headers"]["authorization"] == "Bearer browse-token"
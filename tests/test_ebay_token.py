@@ -0,0 +1,168 @@
+"""
+Tests for the persisted eBay OAuth token — encrypted storage, reuse across
+restarts/reloads and workers, and the background refresher.
+"""
+import importlib
+import threading
+import time
+
+import pytest
+
+import src.config as config
+import src.api.ebay_client as ebay_client
+import src.settings_store as settings_store
+from src.api import http_session, token_store
+
+pytest.importorskip("cryptography")
+
+
+@pytest.fixture
+def real_ebay(monkeypatch):
+    """Reload the client with real-mode credentials; returns the token-call log."""
+    monkeypatch.setenv("USE_EBAY_MOCK", "False")
+    monkeypatch.setenv("EBAY_CLIENT_ID", "client-id")
+    monkeypatch.setenv("EBAY_CLIENT_SECRET", "client-secret")
+    importlib.reload(config)
+    importlib.reload(ebay_client)
+    calls = []
+
+    class FakeResponse:
+        def __init__(self, n):
+            self._n = n
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"access_token": f"token-{self._n}", "expires_in": 7200}
+
+    def fake_post(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(len(calls))
+
+    monkeypatch.setattr(http_session, "post", fake_post)
+    return calls
+
+
+def _restart():
+    """What a new worker process (or a settings reload) starts with."""
+    importlib.reload(ebay_client)
+
+
+# ---------------------------------------------------------------------------
+# token_store
+# ---------------------------------------------------------------------------
+
+def test_token_is_stored_encrypted_and_bound_to_secret_and_scope():
+    assert token_store.save("TOKEN", "secret", "client|prod", "abc123", 2_000_000_000.0)
+
+    assert token_store.load("TOKEN", "secret", "client|prod") == ("abc123", 2_000_000_000.0)
+    assert token_store.load("TOKEN", "other-secret", "client|prod") is None
+    assert token_store.load("TOKEN", "secret", "client|sandbox") is None
+    assert "abc123" not in settings_store._fallback_path().read_text()
+
+
+def test_token_is_not_loaded_into_the_environment():
+    token_store.save("EBAY_OAUTH_TOKEN", "secret", "scope", "abc123", 2_000_000_000.0)
+    assert "EBAY_OAUTH_TOKEN" not in settings_store.load_all()
+
+
+# ---------------------------------------------------------------------------
+# get_ebay_token
+# ---------------------------------------------------------------------------
+
+def test_persisted_token_survives_a_restart(real_ebay):
+    assert ebay_client.get_ebay_token() == "token-1"
+    _restart()
+
+    assert ebay_client.get_ebay_token() == "token-1"
+    assert len(real_ebay) == 1
+
+
+def test_expired_persisted_token_is_replaced(real_ebay):
+    ebay_client.get_ebay_token()
+    token_store.save(
+        ebay_client._TOKEN_STORE_KEY, "client-secret", ebay_client._token_scope(), "stale", time.time() + 30
+    )
+    _restart()
+
+    assert ebay_client.get_ebay_token() == "token-2"
+
+
+def test_persistence_can_be_disabled(real_ebay, monkeypatch):
+    monkeypatch.setattr(ebay_client, "EBAY_TOKEN_PERSIST", False)
+    ebay_client.get_ebay_token()
+    assert settings_store.get_credential(ebay_client._TOKEN_STORE_KEY) is None
+
+
+def test_fresh_token_is_returned_while_a_refresh_holds_the_lock(real_ebay):
+    ebay_client.get_ebay_token()
+    result = []
+
+    with ebay_client._token_lock:         # e.g. the refresher mid-renewal
+        reader = threading.Thread(target=lambda: result.append(ebay_client.get_ebay_token()))
+        reader.start()
+        reader.join(2)
+
+    assert result == ["token-1"]
+
+
+# ---------------------------------------------------------------------------
+# Background refresher
+# ---------------------------------------------------------------------------
+
+def test_refresher_renews_ahead_of_expiry(real_ebay, monkeypatch):
+    ebay_client.get_ebay_token()
+    expiring = time.time() + 200          # inside the 300s margin, in memory and persisted
+    monkeypatch.setattr(ebay_client, "_token_expires_at", expiring)
+    token_store.save(ebay_client._TOKEN_STORE_KEY, "client-secret", ebay_client._token_scope(), "token-1", expiring)
+
+    delay = ebay_client._refresh_once()
+
+    assert real_ebay == [ebay_client.EBAY_OAUTH_ENDPOINT] * 2
+    assert ebay_client._cached_token == "token-2"
+    assert 7200 - 300 - 5 <= delay <= 7200 - 300 + 80
+
+
+def test_refresher_adopts_a_token_another_worker_renewed(real_ebay, monkeypatch):
+    ebay_client.get_ebay_token()
+    monkeypatch.setattr(ebay_client, "_token_expires_at", time.time() + 200)
+    token_store.save(
+        ebay_client._TOKEN_STORE_KEY, "client-secret", ebay_client._token_scope(), "from-worker-2", time.time() + 7000
+    )
+
+    ebay_client._refresh_once()
+
+    assert ebay_client._cached_token == "from-worker-2"
+    assert len(real_ebay) == 1
+
+
+def test_refresher_idles_in_mock_mode_and_retries_after_failure(real_ebay, monkeypatch):
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", True)
+    assert ebay_client._refresh_once() == 60.0
+    assert real_ebay == []
+
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+
+    def down(*args, **kwargs):
+        raise ConnectionError("eBay OAuth down")
+
+    monkeypatch.setattr(http_session, "post", down)
+    assert ebay_client._refresh_once() == 30.0
+
+
+def test_refresh_loop_stops_and_thread_is_started_once(real_ebay, monkeypatch):
+    stop = threading.Event()
+    stop.set()
+    ebay_client._refresh_loop(stop)          # returns after one pass
+    assert ebay_client._cached_token == "token-1"
+
+    started = []
+    monkeypatch.setattr(ebay_client, "_refresh_loop", lambda: started.append(1) or time.sleep(0.5))
+    first = ebay_client.start_token_refresher()
+    assert ebay_client.start_token_refresher() is first
+    first.join(2)
+    assert started == [1]
+
+    monkeypatch.setattr(ebay_client, "EBAY_TOKEN_REFRESH_ENABLED", False)
+    assert ebay_client.start_token_refresher() is None
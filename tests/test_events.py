@@ -0,0 +1,89 @@
+"""
+Tests for src/services/events.py and pipeline progress events.
+"""
+from src.services.events import EventBus
+from src.services.listing_service import ListingService
+
+
+def test_subscriber_receives_live_events():
+    bus = EventBus()
+    subscription = bus.subscribe('job-1')
+    bus.publish('job-1', 'analyzed', {'cards': 2})
+    event = subscription.get(timeout=1)
+    assert event['event'] == 'analyzed'
+    assert event['cards'] == 2
+    assert event['topic'] == 'job-1'
+    subscription.close()
+
+
+def test_late_subscriber_gets_history_replayed():
+    bus = EventBus()
+    bus.publish('job-2', 'analyzed')
+    bus.publish('job-2', 'saved')
+    subscription = bus.subscribe('job-2')
+    assert [subscription.get(timeout=1)['event'] for _ in range(2)] == ['analyzed', 'saved']
+    assert subscription.get(timeout=0.01) is None
+
+
+def test_topics_are_isolated_and_history_bounded():
+    bus = EventBus(history_size=2, max_topics=1)
+    bus.publish('a', 'one')
+    bus.publish('b', 'one')
+    bus.publish('b', 'two')
+    bus.publish('b', 'three')
+    assert bus.history('a') == []
+    assert [e['event'] for e in bus.history('b')] == ['two', 'three']
+
+
+def test_retained_topics_keep_every_event_until_released():
+    bus = EventBus(history_size=2, max_topics=1)
+    bus.publish('job', 'queued')
+    bus.retain('job')
+    for n in range(5):
+        bus.publish('job', f'saved-{n}')
+    bus.publish('other', 'one')
+
+    assert [e['event'] for e in bus.history('job')][::5] == ['queued', 'saved-4']
+    assert bus.subscribe('job').get(timeout=1)['event'] == 'queued'
+    bus.release('job')
+    assert bus.history('job') == []
+
+
+def test_job_queue_retains_job_history_until_the_job_is_pruned():
+    from src.services.job_queue import JobQueue
+
+    bus = EventBus(history_size=1)
+    queue = JobQueue(max_workers=1, max_retained=1, event_bus=bus)
+    first = queue.submit(lambda: None)
+    queue.wait(first, timeout=5)
+    assert [e['state'] for e in bus.history(first)] == ['queued', 'running', 'succeeded']
+
+    second = queue.submit(lambda: None)
+    queue.wait(second, timeout=5)
+    assert queue.get(first) is None and bus.history(first) == []
+    queue.shutdown()
+
+
+def test_listing_service_publishes_stage_events():
+    bus = EventBus()
+    service = ListingService(
+        describe_image_fn=lambda _p: {'cards': [
+            {'brand': 'Topps', 'model': 'A', 'category': 'Sports Trading Cards'},
+            {'brand': 'Topps', 'model': 'B', 'category': 'Sports Trading Cards'},
+        ]},
+        search_ebay_fn=lambda _q, limit=8: [{'title': 'x', 'price': 10.0, 'url': 'u'}],
+        build_listing_payload_fn=lambda title, description, price, condition='USED_GOOD': {},
+        save_listing_fn=lambda **kwargs: 1,
+        event_bus=bus,
+    )
+    service.process_image('lot.jpg', 'lot.jpg', topic='job-3')
+
+    events = [e['event'] for e in bus.history('job-3')]
+    assert events[0] == 'analyzed'
+    assert events[-1] == 'completed'
+    assert events.count('comps_fetched') == 2
+    assert events.count('priced') == 2
+    assert events.count('saved') == 2
+    saved = [e for e in bus.history('job-3') if e['event'] == 'saved']
+    assert sorted(e['index'] for e in saved) == [0, 1]
+    assert saved[0]['listing']['listing_id'] == 1
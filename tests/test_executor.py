@@ -0,0 +1,116 @@
+"""
+Tests for src/services/executor.py and the concurrent per-card fan-out in
+ListingService.process_image.
+"""
+import threading
+import time
+
+from src.services.executor import BoundedExecutor
+from src.services.listing_service import ListingService
+
+
+def test_map_preserves_input_order():
+    def slow_echo(x):
+        time.sleep(0.01 * (5 - x))
+        return x * 10
+
+    outcomes = BoundedExecutor(max_in_flight=5).map(slow_echo, range(5))
+    assert [value for value, _ in outcomes] == [0, 10, 20, 30, 40]
+    assert all(error is None for _, error in outcomes)
+
+
+def test_map_returns_per_item_errors():
+    def maybe_fail(x):
+        if x == 1:
+            raise ValueError("boom")
+        return x
+
+    outcomes = BoundedExecutor(max_in_flight=3).map(maybe_fail, [0, 1, 2])
+    assert outcomes[0] == (0, None)
+    assert outcomes[1][0] is None
+    assert isinstance(outcomes[1][1], ValueError)
+    assert outcomes[2] == (2, None)
+
+
+def test_map_respects_max_in_flight():
+    lock = threading.Lock()
+    state = {'current': 0, 'peak': 0}
+
+    def track(_x):
+        with lock:
+            state['current'] += 1
+            state['peak'] = max(state['peak'], state['current'])
+        time.sleep(0.02)
+        with lock:
+            state['current'] -= 1
+
+    BoundedExecutor(max_in_flight=2).map(track, range(8))
+    assert state['peak'] <= 2
+
+
+def test_map_empty_input():
+    assert BoundedExecutor().map(lambda x: x, []) == []
+
+
+def _make_service(save_listing_fn, search_delay=0.0, max_in_flight=4):
+    def search(_query, limit=8):
+        time.sleep(search_delay)
+        return [{'title': 'x', 'price': 10.0, 'url': 'u'}]
+
+    return ListingService(
+        describe_image_fn=lambda _p: {
+            'cards': [
+                {'brand': 'Topps', 'model': f'Card {i}', 'category': 'Sports Trading Cards'}
+                for i in range(6)
+            ]
+        },
+        search_ebay_fn=search,
+        build_listing_payload_fn=lambda title, description, price, condition='USED_GOOD': {
+            'product': {'title': title},
+        },
+        save_listing_fn=save_listing_fn,
+        max_in_flight=max_in_flight,
+    )
+
+
+def test_process_image_runs_cards_concurrently_and_keeps_order():
+    counter = {'n': 0}
+    lock = threading.Lock()
+
+    def save(**kwargs):
+        with lock:
+            counter['n'] += 1
+            return counter['n']
+
+    service = _make_service(save, search_delay=0.1, max_in_flight=6)
+    started = time.monotonic()
+    result = service.process_image('lot.jpg', 'lot.jpg')
+    elapsed = time.monotonic() - started
+
+    assert result['success'] is True
+    assert result['count'] == 6
+    assert result['errors'] == []
+    assert [l['analysis']['model'] for l in result['listings']] == [f'Card {i}' for i in range(6)]
+    # Six 100 ms searches in parallel should take well under 6 × 100 ms
+    assert elapsed < 0.4
+
+
+def test_process_image_reports_per_card_errors():
+    def save(**kwargs):
+        return None if kwargs['analysis']['model'] == 'Card 2' else 1
+
+    result = _make_service(save).process_image('lot.jpg', 'lot.jpg')
+    assert result['success'] is True
+    assert result['count'] == 5
+    assert result['errors'] == [{
+        'index': 2,
+        'stage': 'save_listing',
+        'error': 'Failed to generate listing',
+    }]
+
+
+def test_process_image_fails_when_every_card_fails():
+    result = _make_service(lambda **kwargs: None).process_image('lot.jpg', 'lot.jpg')
+    assert result['success'] is False
+    assert result['listings'] == []
+    assert len(result['errors']) == 6
@@ -0,0 +1,99 @@
+"""
+Tests for src/api/http_session.py — pooled keep-alive sessions.
+
+A local HTTP/1.1 server records the client port of every request, so
+connection reuse is observable without touching the network.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import src.config as config
+from src.api import http_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_PUT = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.client_ports = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    http_session.reset()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    http_session.reset()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sequential_calls_reuse_one_connection(server):
+    httpd, base = server
+
+    for method in (http_session.get, http_session.post, http_session.put):
+        assert method(f"{base}/x", timeout=5).text == "ok"
+
+    assert len(httpd.client_ports) == 3
+    assert len(set(httpd.client_ports)) == 1
+
+
+def test_threads_share_the_host_pool(server, monkeypatch):
+    httpd, base = server
+    monkeypatch.setattr(config, "HTTP_POOL_SIZE", 3)
+    barrier = threading.Barrier(3)
+
+    def worker():
+        barrier.wait()
+        for _ in range(4):
+            http_session.get(f"{base}/y", timeout=5)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(httpd.client_ports) == 12
+    assert len(set(httpd.client_ports)) <= 3
+    assert http_session.pool_stats() == {base: 3}
+
+
+def test_reset_drops_pooled_connections(server):
+    httpd, base = server
+
+    http_session.get(f"{base}/a", timeout=5)
+    http_session.reset()
+    http_session.get(f"{base}/b", timeout=5)
+
+    assert len(set(httpd.client_ports)) == 2
+
+
+def test_settings_save_resets_pools(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARDS4SALE_DATA_DIR", str(tmp_path))
+    from src.app import create_app
+    import src.settings_store as settings_store
+
+    monkeypatch.setattr(settings_store, "save_all", lambda values: None)
+    resets = []
+    monkeypatch.setattr(http_session, "reset", lambda: resets.append(True))
+
+    response = create_app().test_client().post("/api/settings", json={"USE_EBAY_MOCK": True})
+
+    assert response.status_code == 200
+    assert resets == [True]
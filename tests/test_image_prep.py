@@ -0,0 +1,111 @@
+"""
+Tests for src/utils/image_prep.py and its use in describe_image.
+"""
+import base64
+import io
+
+import pytest
+
+import src.api.openai_client as openai_client
+from src.api import http_session
+from src.utils.image_prep import prepare_image
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _encode(img, fmt, **kwargs):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **kwargs)
+    return buf.getvalue()
+
+
+def _noisy(size):
+    import random
+
+    rng = random.Random(1)
+    return Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+
+
+def _decode(data):
+    return Image.open(io.BytesIO(data))
+
+
+def test_large_photo_is_downscaled_and_shrinks():
+    original = _encode(_noisy((1600, 1200)), "PNG")
+
+    prepared, media_type = prepare_image(original, "image/png", max_edge=800)
+
+    assert media_type == "image/jpeg"
+    assert _decode(prepared).size == (800, 600)
+    assert len(prepared) * 10 < len(original)
+
+
+def test_exif_orientation_is_applied():
+    img = Image.new("RGB", (200, 100), "red")
+    exif = img.getexif()
+    exif[0x0112] = 6  # rotate 90° clockwise on display
+    original = _encode(img, "JPEG", exif=exif)
+
+    prepared, _ = prepare_image(original, "image/jpeg")
+
+    assert _decode(prepared).size == (100, 200)
+
+
+def test_gif_keeps_first_frame_as_jpeg():
+    frames = [Image.new("RGB", (64, 64), colour) for colour in ("blue", "yellow")]
+    buf = io.BytesIO()
+    frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:])
+
+    prepared, media_type = prepare_image(buf.getvalue(), "image/gif", output_format="WEBP")
+
+    assert media_type == "image/webp"
+    r, g, b = _decode(prepared).convert("RGB").getpixel((32, 32))
+    assert b > 200 and r < 60
+
+
+def test_transparent_png_is_flattened_onto_white():
+    original = _encode(Image.new("RGBA", (40, 40), (0, 0, 0, 0)), "PNG")
+
+    prepared, _ = prepare_image(original, "image/png")
+
+    assert _decode(prepared).getpixel((20, 20)) >= (250, 250, 250)
+
+
+def test_small_jpeg_is_sent_unchanged():
+    original = _encode(_noisy((120, 80)), "JPEG", quality=30)
+
+    assert prepare_image(original, "image/jpeg", quality=95) == (original, "image/jpeg")
+
+
+def test_undecodable_bytes_pass_through():
+    assert prepare_image(b"FAKE_JPEG_DATA", "image/png") == (b"FAKE_JPEG_DATA", "image/png")
+
+
+def test_describe_image_uploads_prepared_image_with_detail(monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    monkeypatch.setattr(openai_client, "IMAGE_MAX_EDGE", 512)
+    monkeypatch.setattr(openai_client, "OPENAI_IMAGE_DETAIL", "low")
+    img_path = tmp_path / "card.png"
+    img_path.write_bytes(_encode(_noisy((1024, 768)), "PNG"))
+    captured = {}
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"choices": [{"message": {"content": '{"brand": "Topps", "model": "Chrome", "category": "Cards", "condition": "Good"}'}}]}
+
+    def fake_post(url, headers, json=None, timeout=None):
+        captured["payload"] = json
+        return FakeResponse()
+
+    monkeypatch.setattr(http_session, "post", fake_post)
+    openai_client.describe_image(str(img_path))
+
+    image_url = captured["payload"]["messages"][0]["content"][1]["image_url"]
+    assert image_url["detail"] == "low"
+    prefix = "data:image/jpeg;base64,"
+    assert image_url["url"].startswith(prefix)
+    assert _decode(base64.b64decode(image_url["url"][len(prefix):])).size == (512, 384)
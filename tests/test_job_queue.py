@@ -0,0 +1,65 @@
+"""
+Tests for src/services/job_queue.py.
+"""
+import threading
+
+import pytest
+
+from src.services.job_queue import JOB_ERROR_MESSAGE, JobQueue, JobQueueFullError
+
+
+def test_submit_runs_job_and_records_result():
+    queue = JobQueue(max_workers=1)
+    job_id = queue.submit(lambda a, b: a + b, 2, 3, label='add')
+    job = queue.wait(job_id, timeout=5)
+    assert job['state'] == 'succeeded'
+    assert job['result'] == 5
+    assert job['started_at'] <= job['finished_at']
+    queue.shutdown()
+
+
+def test_cleanup_runs_even_when_job_fails():
+    queue = JobQueue(max_workers=1)
+    cleaned = threading.Event()
+
+    def fail():
+        raise ValueError('nope')
+
+    job_id = queue.submit(fail, cleanup=cleaned.set)
+    job = queue.wait(job_id, timeout=5)
+    assert job['state'] == 'failed'
+    assert job['error'] == JOB_ERROR_MESSAGE
+    assert cleaned.is_set()
+    queue.shutdown()
+
+
+def test_submit_raises_when_queue_is_full():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    queue.submit(block)
+    started.wait(5)
+    queue.submit(lambda: None)  # waits behind the blocking job
+    with pytest.raises(JobQueueFullError):
+        queue.submit(lambda: None)
+    release.set()
+    queue.shutdown()
+
+
+def test_finished_jobs_are_pruned_beyond_retention():
+    queue = JobQueue(max_workers=1, max_retained=2)
+    first = queue.submit(lambda: 1)
+    queue.wait(first, timeout=5)
+    second = queue.submit(lambda: 2)
+    queue.wait(second, timeout=5)
+    third = queue.submit(lambda: 3)
+    queue.wait(third, timeout=5)
+
+    assert queue.get(first) is None
+    assert queue.get(third)['result'] == 3
+    queue.shutdown()
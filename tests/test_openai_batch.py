@@ -0,0 +1,186 @@
+"""
+Tests for src/api/openai_batch.py and the ``batch`` CLI command.
+
+A local HTTP server stands in for the OpenAI Files and Batches endpoints:
+it stores uploaded JSONL, reports a batch in progress on the first poll and
+completed on the next, and answers each request line with a canned analysis.
+"""
+import json
+import random
+import threading
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import src.api.openai_client as openai_client
+import src.main as cli_main
+from src.api import analysis_cache, openai_batch, vision_metrics
+
+
+class _BatchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        state = self.server.state
+        if self.path == "/v1/files":
+            form = BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            parts = {part.get_param("name", header="content-disposition"): part for part in form.get_payload()}
+            assert parts["purpose"].get_payload() == "batch"
+            file_id = f"file-{len(state['files'])}"
+            state["files"][file_id] = parts["file"].get_payload(decode=True).decode()
+            state["uploads"].append(file_id)
+            return self._json({"id": file_id, "purpose": "batch"})
+        if self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(state['batches'])}"
+            state["batches"][batch_id] = {"request": request, "polls": 0}
+            return self._json({"id": batch_id, "status": "validating"})
+        self._json({"error": "not found"}, status=404)
+
+    def do_GET(self):
+        state = self.server.state
+        if self.path.startswith("/v1/batches/"):
+            batch_id = self.path.rsplit("/", 1)[1]
+            batch = state["batches"][batch_id]
+            batch["polls"] += 1
+            if batch["polls"] < 2:
+                return self._json({"id": batch_id, "status": "in_progress"})
+            output_id = f"out-{batch_id}"
+            lines = state["files"][batch["request"]["input_file_id"]].splitlines()
+            state["files"][output_id] = "\n".join(self.server.answer(json.loads(line)) for line in lines)
+            return self._json({"id": batch_id, "status": "completed", "output_file_id": output_id})
+        if self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+            return self._raw(state["files"][self.path.split("/")[3]].encode())
+        self._json({"error": "not found"}, status=404)
+
+    def _json(self, data, status=200):
+        self._raw(json.dumps(data).encode(), status)
+
+    def _raw(self, body, status=200):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _answer(line):
+    """Reply to one request line; ``img-000001`` fails to exercise the fallback."""
+    custom_id = line["custom_id"]
+    if custom_id == "img-000001":
+        return json.dumps({"custom_id": custom_id, "response": None, "error": {"code": "server_error"}})
+    content = json.dumps({"brand": "Topps", "model": f"Card {custom_id}", "category": "Sports Trading Cards", "condition": "Near Mint"})
+    return json.dumps({
+        "custom_id": custom_id,
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+        "error": None,
+    })
+
+
+@pytest.fixture
+def batch_server(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _BatchHandler)
+    httpd.state = {"files": {}, "batches": {}, "uploads": []}
+    httpd.answer = _answer
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    monkeypatch.setattr(openai_client, "OPENAI_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}/v1")
+    monkeypatch.setattr(openai_client, "IMAGE_PREPROCESS_ENABLED", False)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def photos(tmp_path):
+    folder = tmp_path / "intake"
+    folder.mkdir()
+    paths = []
+    for n in range(3):
+        path = folder / f"photo{n}.jpg"
+        path.write_bytes(random.Random(n).randbytes(2000))
+        paths.append(path)
+    return paths
+
+
+def test_batch_round_trip_maps_results_back_by_custom_id(batch_server, photos, tmp_path):
+    polls = []
+
+    results = openai_batch.describe_images_batch(photos, tmp_path / "work", poll_seconds=0, sleep=polls.append)
+
+    assert list(results) == [str(path) for path in photos]
+    assert results[str(photos[0])]["model"] == "Card img-000000"
+    assert results[str(photos[1])] is None          # failed line → caller falls back
+    assert results[str(photos[2])]["model"] == "Card img-000002"
+    assert polls == [0]                              # one in-progress poll, then completed
+
+    (batch,) = batch_server.state["batches"].values()
+    assert batch["request"]["endpoint"] == "/v1/chat/completions"
+    submitted = [json.loads(line) for line in batch_server.state["files"]["file-0"].splitlines()]
+    assert [line["custom_id"] for line in submitted] == ["img-000000", "img-000001", "img-000002"]
+    assert submitted[0]["body"]["model"] == openai_client.OPENAI_MODEL
+
+    (row,) = vision_metrics.rollup()["by_kind"]
+    assert row["key"] == "batch" and row["calls"] == 3 and row["errors"] == 1
+
+
+def test_batch_skips_cached_photos_and_caches_replies(batch_server, photos, tmp_path):
+    openai_batch.describe_images_batch(photos[:1], tmp_path / "first", poll_seconds=0, sleep=lambda _s: None)
+    before = analysis_cache.stats()["stores"]
+
+    results = openai_batch.describe_images_batch(photos[:1], tmp_path / "second", poll_seconds=0, sleep=lambda _s: None)
+
+    assert results[str(photos[0])]["brand"] == "Topps"
+    assert len(batch_server.state["batches"]) == 1   # answered from the cache
+    assert analysis_cache.stats()["stores"] == before
+
+
+def test_batch_splits_large_runs_across_input_files(batch_server, photos, tmp_path, monkeypatch):
+    import src.config as config
+
+    monkeypatch.setattr(config, "BATCH_MAX_FILE_BYTES", 3000)
+
+    results = openai_batch.describe_images_batch(photos, tmp_path / "work", poll_seconds=0, sleep=lambda _s: None)
+
+    assert len(batch_server.state["batches"]) == 3
+    assert results[str(photos[2])]["model"] == "Card img-000002"
+
+
+def test_resume_continues_from_the_manifest(batch_server, photos, tmp_path):
+    work = tmp_path / "work"
+    with pytest.raises(TimeoutError):
+        openai_batch.describe_images_batch(photos, work, poll_seconds=5, timeout=1)
+
+    results = openai_batch.resume(work, poll_seconds=0, sleep=lambda _s: None)
+
+    assert len(batch_server.state["uploads"]) == 1   # not resubmitted
+    assert results[str(photos[0])]["brand"] == "Topps"
+
+
+def test_batch_cli_creates_listings_and_falls_back_for_failures(batch_server, photos, monkeypatch):
+    interactive = []
+    monkeypatch.setattr("src.app.describe_image", lambda path: interactive.append(path) or {"brand": "Fallback"})
+    monkeypatch.setattr("src.app.search_ebay", lambda _q, limit=8: [{"title": "x", "price": 10.0, "url": "u"}])
+    saved = []
+    monkeypatch.setattr("src.app.save_listing", lambda **kwargs: saved.append(kwargs["analysis"]) or len(saved))
+
+    summary = cli_main.cli(["batch", str(photos[0].parent), "--poll-seconds", "0"])
+
+    assert summary == {"photos": 3, "listings": 3, "failed": [], "interactive": 1}
+    assert interactive == [str(photos[1])]
+    assert [analysis["brand"] for analysis in saved] == ["Topps", "Fallback", "Topps"]
+
+
+def test_batch_mock_mode_makes_no_requests(photos, tmp_path):
+    results = openai_batch.describe_images_batch(photos, tmp_path / "work")
+
+    assert all(isinstance(analysis, dict) for analysis in results.values())
+    assert not (tmp_path / "work").exists()
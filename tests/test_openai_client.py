@@ -7,9 +7,9 @@ exercise the branches that only run when a real API key is configured.
 """
 import json
 import pytest
-import requests
 
 import src.api.openai_client as openai_client
+from src.api import http_session
 
 
 @pytest.fixture
@@ -50,7 +50,7 @@ def test_describe_image_api_exception_falls_back_to_mock(real_mode, monkeypatch,
     def raise_error(*args, **kwargs):
         raise ConnectionError("simulated network failure")
 
-    monkeypatch.setattr(requests, "post", raise_error)
+    monkeypatch.setattr(http_session, "post", raise_error)
 
     result = openai_client.describe_image(str(img_path))
     assert isinstance(result, dict)
@@ -76,7 +76,7 @@ def test_describe_image_successful_real_api_call(real_mode, monkeypatch, tmp_pat
         "grading_notes": [],
     }
 
-    monkeypatch.setattr(requests, "post", lambda *a, **kw: _make_fake_response(json.dumps(expected)))
+    monkeypatch.setattr(http_session, "post", lambda *a, **kw: _make_fake_response(json.dumps(expected)))
 
     result = openai_client.describe_image(str(img_path))
     assert result["brand"] == "Topps"
@@ -103,7 +103,7 @@ def test_describe_image_extracts_json_from_response_with_extra_text(real_mode, m
     }
     wrapped = f"Here is the analysis:\n{json.dumps(inner)}\nEnd of analysis."
 
-    monkeypatch.setattr(requests, "post", lambda *a, **kw: _make_fake_response(wrapped))
+    monkeypatch.setattr(http_session, "post", lambda *a, **kw: _make_fake_response(wrapped))
 
     result = openai_client.describe_image(str(img_path))
     assert result["brand"] == "Sony"
@@ -116,7 +116,7 @@ def test_describe_image_non_json_response_returns_fallback_dict(real_mode, monke
     img_path.write_bytes(b"FAKE_JPEG_DATA")
 
     monkeypatch.setattr(
-        requests, "post", lambda *a, **kw: _make_fake_response("This is not JSON at all.")
+        http_session, "post", lambda *a, **kw: _make_fake_response("This is not JSON at all.")
     )
 
     result = openai_client.describe_image(str(img_path))
@@ -156,7 +156,7 @@ def test_describe_image_uses_png_media_type(real_mode, monkeypatch, tmp_path):
         captured["payload"] = json
         return FakeResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
     openai_client.describe_image(str(img_path))
 
     content = captured["payload"]["messages"][0]["content"]
@@ -190,7 +190,7 @@ def test_describe_image_uses_gif_media_type(real_mode, monkeypatch, tmp_path):
         captured["payload"] = json
         return FakeResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
     openai_client.describe_image(str(img_path))
 
     content = captured["payload"]["messages"][0]["content"]
@@ -224,9 +224,101 @@ def test_describe_image_defaults_to_jpeg_for_other_extensions(real_mode, monkeyp
         captured["payload"] = json
         return FakeResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_session, "post", fake_post)
     openai_client.describe_image(str(img_path))
 
     content = captured["payload"]["messages"][0]["content"]
     image_url = content[1]["image_url"]["url"]
     assert image_url.startswith("data:image/jpeg;base64,")
+
+
+# ---------------------------------------------------------------------------
+# Multi-image packing
+# ---------------------------------------------------------------------------
+
+_ITEM = {"model": "Card", "category": "Sports Trading Cards", "condition": "Good"}
+_SINGLE_REPLY = json.dumps({**_ITEM, "brand": "Single"})
+
+
+def _photos(tmp_path, count):
+    paths = []
+    for n in range(count):
+        path = tmp_path / f"photo{n}.jpg"
+        path.write_bytes(f"FAKE_JPEG_DATA_{n}".encode())
+        paths.append(str(path))
+    return paths
+
+
+def _packing_post(requests_seen, packed_reply):
+    """Fake post: packed requests get ``packed_reply(count)``, single ones a per-photo analysis."""
+    def fake_post(url, headers, timeout=None, json=None, data=None):
+        images = [part for part in json["messages"][0]["content"] if part["type"] == "image_url"]
+        requests_seen.append(len(images))
+        if len(images) > 1:
+            return _make_fake_response(packed_reply(len(images)))
+        return _make_fake_response(_SINGLE_REPLY)
+
+    return fake_post
+
+
+def test_packed_photos_share_one_request_and_map_back_by_index(real_mode, monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "VISION_PACK_SIZE", 4)
+    requests_seen = []
+    reply = lambda count: json.dumps({"results": [
+        {"index": n, "analysis": {**_ITEM, "brand": f"Photo {n}"}} for n in reversed(range(1, count + 1))
+    ]})
+    monkeypatch.setattr(http_session, "post", _packing_post(requests_seen, reply))
+    paths = _photos(tmp_path, 3)
+
+    results = openai_client.describe_images_packed(paths)
+
+    assert requests_seen == [3]
+    assert [r["brand"] for r in results] == ["Photo 1", "Photo 2", "Photo 3"]
+    # Each photo's result is cached on its own
+    assert openai_client.describe_image(paths[1])["brand"] == "Photo 2"
+    assert requests_seen == [3]
+
+
+def test_packed_index_mismatch_falls_back_to_single_calls(real_mode, monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "VISION_PACK_SIZE", 4)
+    requests_seen = []
+    reply = lambda count: json.dumps({"results": [
+        {"index": 1, "analysis": {"brand": "Photo 1"}},
+        {"index": 3, "analysis": {"brand": "Photo 3"}},
+    ]})
+    monkeypatch.setattr(http_session, "post", _packing_post(requests_seen, reply))
+
+    results = openai_client.describe_images_packed(_photos(tmp_path, 3))
+
+    assert requests_seen == [3, 1, 1, 1]
+    assert [r["brand"] for r in results] == ["Single"] * 3
+
+
+def test_invalid_packed_results_are_not_cached_and_fall_back(real_mode, monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "VISION_PACK_SIZE", 4)
+    requests_seen = []
+    reply = lambda count: json.dumps({"results": [
+        {"index": 1, "analysis": {**_ITEM, "brand": "Photo 1", "grade": None}},
+        {"index": 2, "analysis": {"brand": "Photo 2"}},            # missing required fields
+        {"index": 3, "analysis": "not an object"},
+    ]})
+    monkeypatch.setattr(http_session, "post", _packing_post(requests_seen, reply))
+
+    results = openai_client.describe_images_packed(_photos(tmp_path, 3))
+
+    assert requests_seen == [3, 1, 1]
+    assert [r["brand"] for r in results] == ["Photo 1", "Single", "Single"]
+    assert "grade" not in results[0]                                # cleaned like a single reply
+
+
+def test_packed_requests_hold_at_most_pack_size_photos(real_mode, monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "VISION_PACK_SIZE", 2)
+    requests_seen = []
+    reply = lambda count: "not json"
+    monkeypatch.setattr(http_session, "post", _packing_post(requests_seen, reply))
+
+    results = openai_client.describe_images_packed(_photos(tmp_path, 5))
+
+    # Two packs of two (unparseable → singles), and the odd photo sent alone
+    assert requests_seen == [2, 2, 1, 1, 1, 1, 1]
+    assert len(results) == 5
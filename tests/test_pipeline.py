@@ -1,3 +1,5 @@
+import pytest
+
 from src.main import main
 from src.app import process_listing
 
@@ -21,7 +23,6 @@ def test_process_listing_title_includes_brand_and_model(monkeypatch):
         "features": ["Noise Canceling"],
     })
     monkeypatch.setattr("src.app.search_ebay", lambda _q, limit=5: [{"title": "x", "price": 100.0, "url": "u"}])
-    monkeypatch.setattr("src.app.suggest_price", lambda _l: 100.0)
 
     captured = {}
 
@@ -68,7 +69,6 @@ def test_process_listing_multi_card_photo(monkeypatch):
     })
 
     monkeypatch.setattr("src.app.search_ebay", lambda _q, limit=8: [{"title": "x", "price": 100.0, "url": "u"}])
-    monkeypatch.setattr("src.app.suggest_price", lambda _l: 100.0)
     monkeypatch.setattr("src.app.build_listing_payload", lambda title, description, price, condition="USED_GOOD": {"product": {"title": title}, "price": {"value": str(price)}, "condition": condition})
 
     counter = {'n': 0}
@@ -94,7 +94,6 @@ def test_process_listing_high_value_flag(monkeypatch):
         'grading_notes': ['Minor corner whitening'],
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 35.0, 'url': 'u'}])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: 35.0)
     monkeypatch.setattr('src.app.build_listing_payload', lambda title, description, price, condition='USED_GOOD': {'product': {'title': title}, 'price': {'value': str(price)}, 'condition': condition})
     monkeypatch.setattr('src.app.save_listing', lambda **kwargs: 1)
 
@@ -114,7 +113,6 @@ def test_process_listing_low_value_flag(monkeypatch):
         'grading_notes': ['Visible edge wear'],
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 12.0, 'url': 'u'}])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: 12.0)
     monkeypatch.setattr('src.app.build_listing_payload', lambda title, description, price, condition='USED_GOOD': {'product': {'title': title}, 'price': {'value': str(price)}, 'condition': condition})
     monkeypatch.setattr('src.app.save_listing', lambda **kwargs: 1)
 
@@ -134,7 +132,6 @@ def test_process_listing_player_name_in_card_title(monkeypatch):
         'player_name': 'Mike Trout',
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 30.0, 'url': 'u'}])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: 30.0)
 
     captured = {}
 
@@ -161,7 +158,6 @@ def test_process_listing_player_name_not_duplicated_when_already_in_model(monkey
         'player_name': 'Mike Trout',
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 30.0, 'url': 'u'}])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: 30.0)
 
     captured = {}
 
@@ -177,8 +173,8 @@ def test_process_listing_player_name_not_duplicated_when_already_in_model(monkey
     assert captured['title'].count('Mike Trout') == 1
 
 
-def test_process_listing_price_fallback_when_suggest_returns_none(monkeypatch):
-    """When suggest_price returns None the pipeline should use the $5 default."""
+def test_process_listing_price_fallback_when_no_comp_has_a_price(monkeypatch):
+    """Without a priced comp the pipeline should use the $5 default."""
     monkeypatch.setattr('src.app.describe_image', lambda _p: {
         'brand': 'Unknown',
         'model': 'Item',
@@ -187,7 +183,6 @@ def test_process_listing_price_fallback_when_suggest_returns_none(monkeypatch):
         'features': [],
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: None)
     monkeypatch.setattr('src.app.build_listing_payload', lambda title, description, price, condition='USED_GOOD': {'product': {'title': title}, 'price': {'value': str(price)}})
     monkeypatch.setattr('src.app.save_listing', lambda **kwargs: 1)
 
@@ -207,7 +202,6 @@ def test_process_listing_save_failure_returns_error(monkeypatch):
         'features': [],
     })
     monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 10.0, 'url': 'u'}])
-    monkeypatch.setattr('src.app.suggest_price', lambda _l: 10.0)
     monkeypatch.setattr('src.app.build_listing_payload', lambda title, description, price, condition='USED_GOOD': {'product': {'title': title}})
     monkeypatch.setattr('src.app.save_listing', lambda **kwargs: None)
 
@@ -223,3 +217,49 @@ def test_process_listing_returns_error_when_no_analyses_detected(monkeypatch):
     result = process_listing('item.jpg', 'item.jpg')
     assert result['success'] is False
     assert 'No items detected' in result.get('error', '') or 'No items detected' in result.get('message', '')
+
+
+def test_process_listing_partial_card_failure_keeps_other_cards(monkeypatch):
+    """One failing card in a lot photo should not discard the other listings."""
+    monkeypatch.setattr('src.app.describe_image', lambda _p: {
+        'cards': [
+            {'brand': 'Topps', 'model': 'Good Card', 'category': 'Sports Trading Cards'},
+            {'brand': 'Topps', 'model': 'Bad Card', 'category': 'Sports Trading Cards'},
+        ]
+    })
+    monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 10.0, 'url': 'u'}])
+    monkeypatch.setattr('src.app.build_listing_payload', lambda title, description, price, condition='USED_GOOD': {'product': {'title': title}})
+    monkeypatch.setattr(
+        'src.app.save_listing',
+        lambda **kwargs: None if kwargs['analysis']['model'] == 'Bad Card' else 7,
+    )
+
+    result = process_listing('lot.jpg', 'lot.jpg')
+    assert result['success'] is True
+    assert result['count'] == 1
+    assert result['listings'][0]['analysis']['model'] == 'Good Card'
+    assert result['errors'][0]['index'] == 1
+    assert result['errors'][0]['stage'] == 'save_listing'
+
+
+def test_process_batch_packs_photos_when_enabled(monkeypatch):
+    from src.app import process_batch
+
+    monkeypatch.setattr('src.app.VISION_PACK_SIZE', 2)
+    packs = []
+
+    def fake_packed(paths):
+        packs.append(list(paths))
+        return [{'brand': 'Topps', 'model': path} for path in paths]
+
+    monkeypatch.setattr('src.app.describe_images_packed', fake_packed)
+    monkeypatch.setattr('src.app.describe_image', lambda _p: pytest.fail('single vision call made'))
+    monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 10.0, 'url': 'u'}])
+    monkeypatch.setattr('src.app.save_listing', lambda **kwargs: 1)
+
+    entries = [('a.jpg', 'a.jpg', None), ('b.jpg', 'b.jpg', None), ('c.exe', 'c.exe', 'bad type'), ('d.jpg', 'd.jpg', None)]
+    result = process_batch(entries)
+
+    assert sorted(packs) == [['a.jpg', 'b.jpg'], ['d.jpg']]
+    assert result['succeeded'] == 3
+    assert result['results'][3]['listings'][0]['analysis']['model'] == 'd.jpg'
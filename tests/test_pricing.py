@@ -0,0 +1,125 @@
+"""
+Tests for the pricing engine — outlier trimming, shipping normalisation,
+condition/title weighting, confidence, speed and the pipeline result.
+"""
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.app import process_listing
+from src.utils import pricing
+from src.utils.pricing import estimate, estimate_price, weigh_comps
+
+
+def test_equal_weights_give_the_plain_median():
+    assert estimate([100, 200, 150]).price == 150.0
+    assert estimate([50, 100]).price == 75.0
+    assert estimate_price([{"title": "no price"}, {"price": "n/a"}]).level == "none"
+
+
+def test_outliers_are_trimmed_by_mad_or_iqr():
+    result = estimate([19, 20, 20, 21, 22, 20.5, 480, 0.99])
+    assert result.price == 20.25
+    assert result.outliers == 2 and result.comps_used == 6
+
+    identical = estimate([10, 10, 10, 10, 10, 40])          # MAD is 0: IQR fences apply
+    assert identical.price == 10.0 and identical.outliers == 1
+
+
+def test_comps_are_compared_on_delivered_price():
+    # $10 shipped free and $6 + $4 shipping are the same deal; $12 + $4 is dearer
+    result = estimate([10.0, 6.0, 12.0], shipping=[0.0, 4.0, 4.0])
+    assert result.price == 6.0            # item price on the typical $4-shipping basis
+    assert estimate([10.0, 6.0, 12.0]).price == 10.0
+
+
+def test_weights_favour_matching_condition_and_title():
+    comps = [
+        {"title": "2018 Topps Update Shohei Ohtani US1 rookie", "price": 100.0, "condition": "Ungraded"},
+        {"title": "2018 Topps Update Shohei Ohtani US1 rookie", "price": 110.0, "condition": "Ungraded"},
+        {"title": "Lot of 50 baseball cards", "price": 15.0, "condition": "Used"},
+    ] + [
+        {"title": "Shohei Ohtani PSA 10 Topps Update US1", "price": price, "condition": "Graded"}
+        for price in (400.0, 410.0, 420.0)
+    ]
+
+    weighted = weigh_comps(comps, condition="Near Mint", reference="Topps Shohei Ohtani 2018 US1")
+
+    assert [c["weight"] for c in weighted] == [1.0, 1.0, 0.2, 0.336, 0.336, 0.336]
+    assert "weight" not in comps[0]
+    assert estimate_price(weighted).price == 110.0
+    assert estimate_price(comps).price == 255.0            # unweighted, the graded slabs drag it up
+    assert weigh_comps(comps)[0]["weight"] == 0.8          # nothing to match against
+
+
+def test_confidence_reflects_sample_size_and_spread():
+    rng = np.random.default_rng(7)
+
+    single = estimate([25.0])
+    tight = estimate(rng.normal(25, 1, 60))
+    scattered = estimate(rng.uniform(5, 60, 6))
+
+    assert single.level == "low"
+    assert tight.level == "high" and tight.low < tight.price < tight.high
+    assert scattered.level == "low"
+    assert tight.summary()["confidence"] == tight.confidence
+
+
+def test_thousands_of_comps_price_in_about_a_millisecond():
+    rng = np.random.default_rng(0)
+    prices, shipping, weights = rng.lognormal(3, 0.4, 5000), rng.uniform(0, 6, 5000), rng.uniform(0.2, 1, 5000)
+    estimate(prices, shipping, weights)
+
+    best = min(_timed(estimate, prices, shipping, weights) for _ in range(20))
+
+    assert best < 0.005            # typically well under 1 ms; generous for slow CI machines
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def test_pipeline_result_carries_price_confidence(monkeypatch):
+    monkeypatch.setattr("src.app.describe_image", lambda _p: {
+        "brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards", "condition": "Near Mint",
+    })
+    comps = [{"title": "Topps Chrome", "price": p, "url": "u"} for p in (10.0, 11.0, 10.5, 90.0)]
+    monkeypatch.setattr("src.app.search_ebay", lambda _q, limit=8: comps)
+    monkeypatch.setattr("src.app.save_listing", lambda **kwargs: 1)
+
+    listing = process_listing("card.jpg", "card.jpg")["listings"][0]
+
+    assert listing["suggested_price"] == 10.5
+    assert listing["price_confidence"]["outliers"] == 1
+    assert listing["price_confidence"]["level"] in {"low", "medium", "high"}
+    assert listing["price_warning"] is False
+
+
+def test_without_numpy_the_price_is_a_plain_median(monkeypatch):
+    monkeypatch.setattr(pricing, "_HAS_NUMPY", False)
+    result = estimate([100, 200, 150, 10_000])
+    assert result.price == 175.0 and result.level == "unknown"
+
+
+def test_listing_service_prices_once_and_falls_back_to_the_configured_price(monkeypatch):
+    import src.config as config
+    from src.services.listing_service import ListingService
+
+    monkeypatch.setattr(config, "PRICE_FALLBACK", 7.5)
+    calls = []
+    service = ListingService(
+        describe_image_fn=lambda _p: {"brand": "Topps", "model": "A", "category": "Sports Trading Cards"},
+        search_ebay_fn=lambda _q, limit=8: [],
+        build_listing_payload_fn=lambda **kwargs: {},
+        save_listing_fn=lambda **kwargs: 1,
+        estimate_price_fn=lambda comps: calls.append(comps) or estimate_price(comps),
+    )
+
+    listing = service.process_image("card.jpg", "card.jpg")["listings"][0]
+
+    assert listing["suggested_price"] == 7.5 and listing["price_warning"] is True
+    assert len(calls) == 1
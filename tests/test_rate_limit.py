@@ -0,0 +1,187 @@
+"""
+Tests for the token-bucket rate limiter — bursts, refill, the would-wait
+probe, daily quotas, async acquire, backends and the eBay integration.
+"""
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import src.config as config
+import src.api.ebay_client as ebay_client
+from src.api import http_session, rate_limit, resilience
+from src.api.rate_limit import MemoryBackend, RateLimiter, SQLiteBackend
+from src.exceptions import QuotaExceededError
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_is_free_then_calls_are_spaced_at_the_rate():
+    clock = FakeClock()
+    limiter = RateLimiter("test.burst", rate=2, burst=3, backend=MemoryBackend(), clock=clock)
+
+    waits = [limiter.reserve() for _ in range(5)]
+
+    assert waits == pytest.approx([0, 0, 0, 0.5, 1.0])
+    clock.now += 3          # refill: 6 tokens earned, capped at the burst of 3
+    assert [limiter.reserve() for _ in range(3)] == pytest.approx([0, 0, 0])
+
+
+def test_would_wait_probe_claims_nothing():
+    clock = FakeClock()
+    limiter = RateLimiter("test.probe", rate=4, burst=1, backend=MemoryBackend(), clock=clock)
+
+    assert limiter.would_wait_ms() == 0
+    limiter.reserve()
+    assert limiter.would_wait_ms() == 250.0
+    assert limiter.would_wait_ms() == 250.0
+    assert limiter.reserve() == pytest.approx(0.25)
+
+
+def test_daily_quota_refuses_without_taking_a_token_and_resets_next_day():
+    clock = FakeClock()
+    limiter = RateLimiter("test.quota", rate=100, burst=5, daily_quota=2, backend=MemoryBackend(), clock=clock)
+
+    limiter.reserve()
+    limiter.reserve()
+    assert limiter.quota_remaining() == 0
+    with pytest.raises(QuotaExceededError):
+        limiter.reserve()
+
+    clock.now += 86400
+    assert limiter.quota_remaining() == 2
+    assert limiter.reserve() == 0
+
+
+def test_waiting_caller_does_not_block_others():
+    limiter = RateLimiter("test.nolock", rate=1, burst=1, backend=MemoryBackend())
+    limiter.reserve()
+    sleeping, release = threading.Event(), threading.Event()
+
+    def blocking_sleep(seconds):
+        sleeping.set()
+        release.wait(5)
+
+    waiter = threading.Thread(target=limiter.acquire, kwargs={"sleep": blocking_sleep})
+    waiter.start()
+    assert sleeping.wait(5)
+
+    # Another caller can still reserve (and is queued behind the sleeper)
+    assert limiter.reserve() == pytest.approx(2.0, abs=0.1)
+    release.set()
+    waiter.join(5)
+
+
+def test_acquire_async_awaits_its_turn():
+    limiter = RateLimiter("test.async", rate=50, burst=1, backend=MemoryBackend())
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire_async() for _ in range(3)))
+
+    waits = asyncio.run(run())
+    assert waits[0] == 0 and waits[2] == pytest.approx(0.04, abs=0.01)
+    assert limiter.metrics()["delayed"] == 2
+
+
+def test_sqlite_backend_shares_one_budget_across_processes(tmp_path):
+    db_path = tmp_path / "limits.db"
+    script = (
+        "from src.api.rate_limit import RateLimiter, SQLiteBackend\n"
+        f"limiter = RateLimiter('shared', rate=0.01, burst=3, daily_quota=10, backend=SQLiteBackend({str(db_path)!r}))\n"
+        "print([limiter.reserve() > 0 for _ in range(2)])\n"
+    )
+    worker = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert worker.stdout.strip() == "[False, False]", worker.stderr
+
+    limiter = RateLimiter("shared", rate=0.01, burst=3, daily_quota=10, backend=SQLiteBackend(db_path))
+    assert limiter.quota_remaining() == 8
+    assert limiter.reserve() == 0           # the burst's last token
+    assert limiter.reserve() > 0            # the other worker spent the rest
+
+
+def test_sqlite_backend_is_selected_from_config(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_BACKEND", "sqlite")
+    assert isinstance(rate_limit.get_backend(), SQLiteBackend)
+
+    limiter = RateLimiter("test.sqlite", rate=1, burst=1, daily_quota=5)
+    limiter.reserve()
+    assert limiter.quota_remaining() == 4
+
+
+def test_custom_backend_can_be_plugged_in(monkeypatch):
+    class RecordingBackend(MemoryBackend):
+        def __init__(self):
+            super().__init__()
+            self.reserved = []
+
+        def reserve(self, name, rate, burst, now, peek=False):
+            if not peek:
+                self.reserved.append(name)
+            return super().reserve(name, rate, burst, now, peek)
+
+    backend = RecordingBackend()
+    rate_limit.set_backend(backend)
+    try:
+        RateLimiter("test.custom", rate=10, burst=1).reserve()
+    finally:
+        rate_limit.set_backend(None)
+    assert backend.reserved == ["test.custom"]
+
+
+def test_incomplete_backend_cannot_be_created():
+    class ReserveOnly(rate_limit.RateLimitBackend):
+        def reserve(self, name, rate, burst, now, peek=False):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        ReserveOnly()
+
+
+def test_finding_quota_exhaustion_returns_no_comps_without_tripping_breaker(monkeypatch):
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(ebay_client._finding_limiter, "daily_quota", 1)
+    calls = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"findItemsByKeywordsResponse": [{"searchResult": [{}]}]}
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append(params["keywords"])
+        return FakeResponse()
+
+    monkeypatch.setattr(http_session, "get", fake_get)
+
+    assert ebay_client.search_ebay("first", limit=3) == []
+    assert ebay_client.search_ebay("second", limit=3) == []     # never mock comparables
+    assert calls == ["first"]
+    assert all(host["state"] == "closed" for host in resilience.metrics().values())
+
+
+def test_rate_limit_metrics_endpoint():
+    from src.app import create_app
+
+    body = create_app().test_client().get("/api/metrics/ratelimits").get_json()
+
+    assert set(body) >= {"ebay.finding", "ebay.inventory", "ebay.oauth"}
+    finding = body["ebay.finding"]
+    assert finding["daily_quota"] == config.EBAY_FINDING_DAILY_QUOTA
+    assert finding["would_wait_ms"] == 0
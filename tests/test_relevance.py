@@ -0,0 +1,91 @@
+"""
+Tests for the comp relevance filter — dropping other players, lots and
+reprints, the relative threshold, speed and the pipeline integration.
+"""
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import src.config as config
+from src.app import process_listing
+from src.utils import relevance
+from src.utils.relevance import filter_comps, score_titles
+
+OHTANI = {
+    "brand": "Topps", "model": "Update", "category": "Sports Trading Cards", "condition": "Near Mint",
+    "player_name": "Shohei Ohtani", "set_name": "Topps Update", "year": "2018", "card_number": "US1",
+    "grade": "Ungraded",
+}
+TITLES = [
+    "2018 Topps Update Shohei Ohtani #US1 Rookie RC Angels",
+    "Shohei Ohtani 2018 Topps Update Rookie US1 NM-MT",
+    "2018 Topps Update Aaron Judge #US99 All-Star",
+    "Lot of 25 2018 Topps Update cards Ohtani Judge Acuna",
+    "Shohei Ohtani 2018 Topps Update US1 REPRINT",
+]
+
+
+def test_other_players_lots_and_reprints_are_dropped():
+    comps = [{"title": title, "price": 100.0} for title in TITLES]
+
+    kept = filter_comps(comps, OHTANI)
+
+    assert [c["title"] for c in kept] == TITLES[:2]
+    assert kept[0] is comps[0]
+
+
+def test_scores_weigh_rare_and_important_terms():
+    scores = score_titles(TITLES, OHTANI)
+
+    assert scores[0] == pytest.approx(1.0) and scores[1] == pytest.approx(1.0)
+    assert scores[2] < 0.5 and scores[3] < 0.25 and scores[4] == pytest.approx(0.25)
+    assert score_titles(TITLES, {})[0] == 0.0
+    # Graded analyses need the grade; "Ungraded" is not a search term
+    slab, raw = score_titles([TITLES[0] + " PSA 10", TITLES[0]], {**OHTANI, "grade": "PSA 10"})
+    assert slab == pytest.approx(1.0) and raw < 1.0
+
+
+def test_comps_are_kept_when_nothing_can_be_judged(monkeypatch):
+    generic = [{"title": "Rookie Card"}, {"title": "Serial Numbered Card"}]
+    assert filter_comps(generic, OHTANI) == generic
+
+    comps = [{"title": title} for title in TITLES]
+    monkeypatch.setattr(config, "PRICE_MIN_RELEVANCE", 0.0)
+    assert filter_comps(comps, OHTANI) == comps
+    monkeypatch.setattr(relevance, "_HAS_NUMPY", False)
+    monkeypatch.setattr(config, "PRICE_MIN_RELEVANCE", 0.5)
+    assert filter_comps(comps, OHTANI) == comps
+
+
+def test_scoring_takes_microseconds_per_comp():
+    titles = [f"{TITLES[n % len(TITLES)]} {n}" for n in range(2000)]
+    score_titles(titles, OHTANI)
+
+    best = min(_timed(score_titles, titles, OHTANI) for _ in range(5))
+
+    assert best / len(titles) < 20e-6          # typically a few µs; generous for slow CI machines
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def test_irrelevant_comps_do_not_move_the_price(monkeypatch):
+    monkeypatch.setattr("src.app.describe_image", lambda _p: OHTANI)
+    comps = [{"title": TITLES[n % 2], "price": 100.0 + n, "url": "u"} for n in range(4)] + [
+        {"title": TITLES[3], "price": 20.0, "url": "u"},
+        {"title": TITLES[4], "price": 3.0, "url": "u"},
+        {"title": TITLES[2], "price": 30.0, "url": "u"},
+    ]
+    monkeypatch.setattr("src.app.search_ebay", lambda _q, limit=8: comps)
+    monkeypatch.setattr("src.app.save_listing", lambda **kwargs: 1)
+
+    listing = process_listing("card.jpg", "card.jpg")["listings"][0]
+
+    assert listing["suggested_price"] == 101.5
+    assert listing["price_confidence"]["comps_used"] == 4
+    assert len(listing["comparable_listings"]) == 7
@@ -0,0 +1,187 @@
+"""
+Tests for src/api/resilience.py — back-off, retry budget and circuit breaker.
+"""
+import asyncio
+from email.utils import formatdate
+import time
+
+import pytest
+
+import src.api.ebay_client as ebay_client
+import src.config as config
+from src.api import http_session, resilience
+from src.exceptions import CircuitOpenError, QuotaExceededError
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = type("R", (), {"status_code": status, "headers": headers or {}})()
+
+
+def _flaky(*outcomes):
+    """Callable raising/returning the given outcomes in order; counts calls."""
+    outcomes = list(outcomes)
+
+    def fn():
+        fn.calls += 1
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    fn.calls = 0
+    return fn
+
+
+def test_backoff_is_jittered_exponential_and_capped(monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(config, "RETRY_MAX_DELAY", 5.0)
+
+    for attempt, ceiling in ((0, 1.0), (1, 2.0), (2, 4.0), (6, 5.0)):
+        delays = [resilience.backoff_delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling / 2  # actually spread, not fixed
+
+    assert resilience.backoff_delay(0, retry_after=3.0) >= 3.0
+
+
+def test_retry_after_parses_seconds_and_http_dates():
+    assert resilience.retry_after_seconds(FakeHTTPError(429, {"Retry-After": "7"}).response) == 7.0
+    future = formatdate(time.time() + 30, usegmt=True)
+    parsed = resilience.retry_after_seconds(FakeHTTPError(503, {"Retry-After": future}).response)
+    assert 25 <= parsed <= 31
+    assert resilience.retry_after_seconds(FakeHTTPError(503).response) is None
+
+
+def test_retries_transient_errors_honouring_retry_after(monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0.01)
+    slept = []
+    fn = _flaky(FakeHTTPError(429, {"Retry-After": "2"}), ConnectionError("reset"), "ok")
+
+    assert resilience.call(fn, "api.example", max_attempts=3, sleep=slept.append) == "ok"
+
+    assert fn.calls == 3
+    assert slept[0] >= 2.0 and slept[1] <= 0.02
+    assert resilience.metrics()["api.example"]["retries"] == 2
+
+
+def test_client_errors_and_long_retry_after_are_not_retried():
+    slept = []
+    with pytest.raises(FakeHTTPError):
+        resilience.call(_flaky(FakeHTTPError(400)), "api.example", sleep=slept.append)
+    with pytest.raises(FakeHTTPError):
+        resilience.call(
+            _flaky(FakeHTTPError(503, {"Retry-After": "3600"})), "api.example", sleep=slept.append
+        )
+    assert slept == []
+
+
+def test_breaker_opens_fails_fast_then_half_opens_and_closes():
+    clock = [0.0]
+    breaker = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: clock[0])
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+    clock[0] = 10.0
+    assert breaker.allow()          # the single half-open probe
+    assert not breaker.allow()      # everyone else still fails fast
+    breaker.record_success()
+
+    assert breaker.state == resilience.CLOSED
+    assert breaker.transitions == {"open": 1, "half_open": 1, "closed": 1}
+    assert breaker.short_circuited == 2
+
+
+def _half_open(monkeypatch, host):
+    """Open ``host``'s circuit and let its cool-down elapse, so the next call is the probe."""
+    monkeypatch.setattr(config, "BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(config, "BREAKER_RESET_SECONDS", 0.0)
+    with pytest.raises(ConnectionError):
+        resilience.call(_flaky(ConnectionError("down")), host, max_attempts=1)
+
+
+def test_a_probe_refused_by_the_quota_does_not_wedge_the_breaker(monkeypatch):
+    _half_open(monkeypatch, "quota.example")
+
+    with pytest.raises(QuotaExceededError):
+        resilience.call(_flaky(QuotaExceededError("eBay", 10)), "quota.example")
+
+    assert resilience.call(_flaky("ok"), "quota.example") == "ok"
+    assert resilience.metrics()["quota.example"]["state"] == "closed"
+
+
+def test_a_cancelled_async_probe_does_not_wedge_the_breaker(monkeypatch):
+    _half_open(monkeypatch, "slow.example")
+
+    async def hang():
+        await asyncio.sleep(3600)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        probe = asyncio.ensure_future(resilience.call_async(hang, "slow.example"))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await resilience.call_async(ok, "slow.example")
+
+    assert asyncio.run(run()) == "ok"
+    assert resilience.metrics()["slow.example"]["state"] == "closed"
+
+
+def test_open_circuit_short_circuits_calls(monkeypatch):
+    monkeypatch.setattr(config, "BREAKER_FAILURE_THRESHOLD", 2)
+    fn = _flaky(*[ConnectionError("down")] * 5)
+
+    with pytest.raises(ConnectionError):
+        resilience.call(fn, "down.example", max_attempts=5, sleep=lambda _delay: None)
+    with pytest.raises(CircuitOpenError):
+        resilience.call(fn, "down.example", sleep=lambda _delay: None)
+
+    assert fn.calls == 2
+    metrics = resilience.metrics()["down.example"]
+    assert metrics["state"] == "open" and metrics["opened"] == 1 and metrics["short_circuited"] == 1
+
+
+def test_retry_budget_caps_retries_to_a_fraction_of_traffic():
+    budget = resilience.RetryBudget(ratio=0.5, min_retries=1, clock=lambda: 0.0)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+
+
+def test_search_ebay_does_not_call_a_host_with_an_open_circuit(monkeypatch):
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(config, "BREAKER_FAILURE_THRESHOLD", 1)
+    calls = []
+
+    def down(*args, **kwargs):
+        calls.append(args)
+        raise ConnectionError("eBay down")
+
+    monkeypatch.setattr(http_session, "get", down)
+
+    first = ebay_client.search_ebay("Topps", limit=2)
+    second = ebay_client.search_ebay("Topps", limit=2)
+
+    assert len(calls) == 1
+    assert first == second == []    # no made-up comparables while eBay is down
+
+
+def test_resilience_metrics_endpoint():
+    from src.app import create_app
+
+    resilience.call(_flaky("ok"), "api.example")
+    body = create_app().test_client().get("/api/metrics/resilience").get_json()
+
+    assert body["api.example"]["state"] == "closed"
@@ -0,0 +1,159 @@
+"""
+Tests for the eBay search cache — key normalisation, TTL and negative TTL,
+LRU bounds, SQLite persistence and the search_ebay integration.
+"""
+import pytest
+
+import src.config as config
+import src.api.ebay_client as ebay_client
+from src.api import http_session, search_cache
+
+FINDING_ITEM = {
+    "title": ["Topps Chrome Rookie"],
+    "sellingStatus": [{"currentPrice": [{"__value__": "12.50"}]}],
+    "viewItemURL": ["https://www.ebay.com/itm/1"],
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(search_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def finding_api(monkeypatch):
+    """Real-mode search_ebay against a fake Finding API; returns the call log."""
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    calls = []
+
+    class FakeResponse:
+        def __init__(self, items):
+            self._items = items
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            result = {"item": self._items} if self._items else {}
+            return {"findItemsByKeywordsResponse": [{"searchResult": [result]}]}
+
+    def install(items=(FINDING_ITEM,)):
+        def fake_get(url, params=None, timeout=None):
+            calls.append(params["keywords"])
+            return FakeResponse(list(items))
+
+        monkeypatch.setattr(http_session, "get", fake_get)
+        return calls
+
+    return install
+
+
+def test_cache_key_normalises_case_and_whitespace():
+    key = search_cache.cache_key("  Topps   CHROME\t2020 ", 5)
+    assert key == search_cache.cache_key("topps chrome 2020", 5)
+    assert key != search_cache.cache_key("topps chrome 2020", 10)
+    assert key != search_cache.cache_key("topps chrome 2020", 5, scope="browse")
+
+
+def test_entries_expire_after_ttl_and_empty_results_sooner(clock, monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_CACHE_TTL_SECONDS", 100)
+    monkeypatch.setattr(config, "SEARCH_CACHE_NEGATIVE_TTL_SECONDS", 10)
+    search_cache.store("found", [{"title": "a", "price": 1.0}])
+    search_cache.store("nothing", [])
+
+    clock[0] += 11
+    assert search_cache.lookup("found") == [{"title": "a", "price": 1.0}]
+    assert search_cache.lookup("nothing") is None
+    clock[0] += 90
+    assert search_cache.lookup("found") is None
+
+    stats = search_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["expired"] == 2
+
+
+def test_negative_hit_is_counted_separately():
+    search_cache.store("nothing", [])
+    assert search_cache.lookup("nothing") == []
+    assert search_cache.stats()["negative_hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_CACHE_MAX_ENTRIES", 2)
+    search_cache.store("a", [{"n": 1}])
+    search_cache.store("b", [{"n": 2}])
+    search_cache.lookup("a")
+    search_cache.store("c", [{"n": 3}])
+
+    assert search_cache.lookup("b") is None
+    assert search_cache.lookup("a") == [{"n": 1}]
+    assert search_cache.stats()["evictions"] == 1
+
+
+def test_cached_results_are_copies():
+    search_cache.store("k", [{"title": "a"}])
+    search_cache.lookup("k")[0]["title"] = "mutated"
+    assert search_cache.lookup("k") == [{"title": "a"}]
+
+
+def test_persisted_entries_survive_a_restart(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_CACHE_PERSIST", True)
+    search_cache.store("warm", [{"title": "a"}])
+    search_cache.reset()   # what a new process starts with
+
+    assert search_cache.lookup("warm") == [{"title": "a"}]
+    assert search_cache.stats()["entries"] == 1
+    assert search_cache.clear() == 1
+    search_cache.reset()
+    assert search_cache.lookup("warm") is None
+
+
+def test_repeat_search_skips_the_api(finding_api):
+    calls = finding_api()
+
+    first = ebay_client.search_ebay("Topps Chrome", limit=3)
+    second = ebay_client.search_ebay("topps  chrome", limit=3)
+
+    assert first == second == [{"title": "Topps Chrome Rookie", "price": 12.5, "url": "https://www.ebay.com/itm/1"}]
+    assert calls == ["Topps Chrome"]
+    assert search_cache.stats()["hit_rate"] == 0.5
+
+
+def test_empty_search_is_cached_but_error_fallback_is_not(finding_api, monkeypatch):
+    calls = finding_api(items=())
+    assert ebay_client.search_ebay("xyzzy", limit=3) == []
+    assert ebay_client.search_ebay("xyzzy", limit=3) == []
+    assert len(calls) == 1
+
+    def down(*args, **kwargs):
+        raise ConnectionError("eBay down")
+
+    monkeypatch.setattr(http_session, "get", down)
+    assert ebay_client.search_ebay("laptop", limit=3) == []
+    assert search_cache.lookup(ebay_client._search_cache_key("laptop", 3)) is None
+
+
+def test_disabled_cache_always_calls_the_api(finding_api, monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_CACHE_ENABLED", False)
+    calls = finding_api()
+
+    ebay_client.search_ebay("Topps", limit=3)
+    ebay_client.search_ebay("Topps", limit=3)
+
+    assert len(calls) == 2
+
+
+def test_search_cache_endpoints(finding_api):
+    from src.app import create_app
+
+    finding_api()
+    ebay_client.search_ebay("Topps", limit=3)
+    client = create_app().test_client()
+
+    stats = client.get("/api/cache/search").get_json()
+    assert stats["entries"] == 1 and stats["misses"] == 1
+
+    assert client.delete("/api/cache/search").get_json() == {"success": True, "removed": 1}
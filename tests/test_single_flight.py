@@ -0,0 +1,159 @@
+"""
+Tests for single-flight coalescing — shared results and errors for threads
+and coroutines, per-call-site counters and the eBay search integration.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+import src.api.async_ebay_client as async_ebay
+import src.api.ebay_client as ebay_client
+from src.api import http_session, single_flight
+from src.api.single_flight import SingleFlight
+
+FINDING_DATA = {"findItemsByKeywordsResponse": [{"searchResult": [{"item": [{
+    "title": ["Topps Chrome Rookie"],
+    "sellingStatus": [{"currentPrice": [{"__value__": "12.50"}]}],
+    "viewItemURL": ["https://www.ebay.com/itm/1"],
+}]}]}]}
+
+
+def _run_concurrently(fn, n):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(fn) for _ in range(n)]
+        return [future.result() for future in futures]
+
+
+def _gated(result=None, error=None):
+    """A call that blocks until released, counting how often it runs."""
+    release, runs = threading.Event(), []
+
+    def fn():
+        runs.append(1)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, release, runs
+
+
+def _when_waiting(flight, waiters, release):
+    """Release the leader once ``waiters`` callers have joined the flight."""
+    def watch():
+        while flight.metrics()["calls"] < waiters:
+            threading.Event().wait(0.005)
+        release.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test.share")
+    fn, release, runs = _gated(result=["comps"])
+    _when_waiting(flight, 5, release)
+
+    results = _run_concurrently(lambda: flight.do("topps", fn), 5)
+
+    assert results == [["comps"]] * 5
+    assert len(runs) == 1
+    assert flight.metrics() == {"calls": 5, "executions": 1, "suppressed": 4}
+
+
+def test_error_is_shared_and_key_is_released():
+    flight = SingleFlight("test.error")
+    fn, release, runs = _gated(error=ConnectionError("eBay down"))
+    _when_waiting(flight, 3, release)
+
+    def call():
+        with pytest.raises(ConnectionError):
+            flight.do("topps", fn)
+
+    _run_concurrently(call, 3)
+    assert len(runs) == 1
+    assert flight.do("topps", lambda: "retried") == "retried"
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight("test.keys")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.metrics()["suppressed"] == 0
+
+
+def test_async_callers_share_one_execution():
+    flight = SingleFlight("test.async")
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return "comps"
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("topps", fetch) for _ in range(4)))
+
+    assert asyncio.run(run()) == ["comps"] * 4
+    assert len(runs) == 1
+    assert flight.metrics()["suppressed"] == 3
+
+
+def test_duplicate_searches_from_a_lot_photo_make_one_request(monkeypatch):
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    release, calls = threading.Event(), []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return FINDING_DATA
+
+    def slow_get(url, params=None, timeout=None):
+        calls.append(params["keywords"])
+        release.wait(5)
+        return FakeResponse()
+
+    monkeypatch.setattr(http_session, "get", slow_get)
+    _when_waiting(ebay_client._search_flight, 4, release)
+
+    results = _run_concurrently(lambda: ebay_client.search_ebay("Topps Chrome", limit=3), 4)
+
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results) and results[0][0]["price"] == 12.5
+    assert results[0][0] is not results[1][0]   # each caller gets its own dicts
+    assert single_flight.metrics()["ebay.search"]["suppressed"] == 3
+
+
+def test_async_duplicate_searches_make_one_request(monkeypatch):
+    monkeypatch.setattr(ebay_client, "USE_EBAY_MOCK", False)
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_ID", "id")
+    monkeypatch.setattr(ebay_client, "EBAY_CLIENT_SECRET", "secret")
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json=FINDING_DATA)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(
+                *(async_ebay.search_ebay("Topps Chrome", limit=3, client=client) for _ in range(3))
+            )
+
+    results = asyncio.run(run())
+    assert len(requests) == 1 and len(results) == 3
+    assert single_flight.metrics()["ebay.search_async"] == {"calls": 3, "executions": 1, "suppressed": 2}
+
+
+def test_single_flight_metrics_endpoint():
+    from src.app import create_app
+
+    body = create_app().test_client().get("/api/metrics/singleflight").get_json()
+    assert body["ebay.search"] == {"calls": 0, "executions": 0, "suppressed": 0}
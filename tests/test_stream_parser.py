@@ -0,0 +1,188 @@
+"""
+Tests for streamed vision parsing — CardStreamParser, describe_image_stream
+and the streamed ListingService / process_listing paths.
+"""
+import json
+import threading
+
+import pytest
+
+import src.api.openai_client as openai_client
+from src.api import http_session
+from src.api.stream_parser import CardStreamParser
+from src.services.listing_service import ListingService
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _sse_lines(content, size=7):
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": piece}}]})
+        for piece in _chunks(content, size)
+    ]
+    return lines + ["", "data: [DONE]"]
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self._lines = lines
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self._lines
+
+    def close(self):
+        self.closed = True
+
+
+LOT_REPLY = json.dumps({
+    "cards": [
+        {"brand": "Topps", "model": "Jeter {RC}", "features": ["a \"quoted\" ] note"]},
+        {"brand": "Panini", "model": "Prizm", "grading_notes": [{"corner": "soft"}]},
+    ]
+})
+
+
+# ---------------------------------------------------------------------------
+# CardStreamParser
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("size", [1, 3, 16, len(LOT_REPLY)])
+def test_parser_yields_each_card_regardless_of_chunking(size):
+    parser = CardStreamParser()
+    cards = []
+    for piece in _chunks("```json\n" + LOT_REPLY + "\n```", size):
+        cards.extend(parser.feed(piece))
+
+    assert cards == json.loads(LOT_REPLY)["cards"]
+    assert parser.cards_seen == 2
+
+
+def test_parser_emits_card_as_soon_as_it_closes():
+    parser = CardStreamParser()
+    first_end = LOT_REPLY.index("}, {") + 1
+
+    assert parser.feed(LOT_REPLY[:first_end - 1]) == []
+    assert parser.feed(LOT_REPLY[first_end - 1:first_end]) == [{
+        "brand": "Topps", "model": "Jeter {RC}", "features": ["a \"quoted\" ] note"],
+    }]
+
+
+def test_parser_ignores_single_item_replies():
+    parser = CardStreamParser()
+    reply = '{"brand": "Nike", "features": [{"cards": 2}], "model": "cards"}'
+
+    assert parser.feed(reply) == []
+    assert parser.text == reply
+
+
+# ---------------------------------------------------------------------------
+# describe_image_stream
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def real_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    img_path = tmp_path / "lot.jpg"
+    img_path.write_bytes(b"FAKE_JPEG_DATA")
+    return str(img_path)
+
+
+def test_describe_image_stream_requests_stream_and_yields_cards(real_mode, monkeypatch):
+    captured = {}
+    response = FakeStreamResponse(_sse_lines(LOT_REPLY))
+
+    def fake_post(url, headers, json=None, timeout=None, stream=False):
+        captured.update(payload=json, stream=stream)
+        return response
+
+    monkeypatch.setattr(http_session, "post", fake_post)
+
+    cards = list(openai_client.describe_image_stream(real_mode))
+
+    assert [card["brand"] for card in cards] == ["Topps", "Panini"]
+    assert captured["payload"]["stream"] is True
+    assert captured["stream"] is True
+    assert response.closed
+
+
+def test_describe_image_stream_single_item_yields_whole_analysis(real_mode, monkeypatch):
+    reply = '{"brand": "Nike", "model": "Air Max", "category": "Shoes", "condition": "New"}'
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeStreamResponse(_sse_lines(reply)))
+
+    assert list(openai_client.describe_image_stream(real_mode)) == [json.loads(reply)]
+
+
+def test_describe_image_stream_broken_stream_keeps_cards_already_seen(real_mode, monkeypatch):
+    first_card = LOT_REPLY[:LOT_REPLY.index("}, {") + 1]
+    lines = _sse_lines(first_card)[:-2] + ["data: {not json"]
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeStreamResponse(lines))
+
+    cards = list(openai_client.describe_image_stream(real_mode))
+
+    assert [card["brand"] for card in cards] == ["Topps"]
+
+
+def test_describe_image_stream_mock_mode_splits_cards():
+    cards = list(openai_client.describe_image_stream("/nonexistent/image.jpg"))
+    assert cards and all(isinstance(card, dict) for card in cards)
+
+
+# ---------------------------------------------------------------------------
+# Pipelines
+# ---------------------------------------------------------------------------
+
+def test_listing_service_searches_first_card_while_stream_continues():
+    first_searched = threading.Event()
+
+    def stream(_path):
+        yield {"brand": "Topps", "model": "A"}
+        # The second card is only produced after the first one's search ran
+        assert first_searched.wait(timeout=5)
+        yield {"brand": "Panini", "model": "B"}
+
+    def search(query, limit=5):
+        first_searched.set()
+        return [{"title": query, "price": 10.0}]
+
+    # Ids follow the card, not which worker thread happens to save first
+    saved = {"Topps A": 1, "Panini B": 2}
+    service = ListingService(
+        describe_image_fn=lambda _path: pytest.fail("non-streamed describe called"),
+        search_ebay_fn=search,
+        build_listing_payload_fn=lambda **kwargs: {"title": kwargs["title"]},
+        save_listing_fn=lambda **kwargs: saved[kwargs["title"]],
+        describe_image_stream_fn=stream,
+    )
+
+    result = service.process_image("lot.jpg", "lot.jpg")
+
+    assert result["success"] is True
+    assert [listing["listing_id"] for listing in result["listings"]] == [1, 2]
+
+
+def test_process_listing_uses_stream_when_enabled(monkeypatch):
+    import src.app as app_module
+
+    monkeypatch.setattr(app_module, "VISION_STREAMING", True)
+    monkeypatch.setattr(app_module, "describe_image", lambda _path: pytest.fail("non-streamed describe called"))
+    monkeypatch.setattr(
+        app_module,
+        "describe_image_stream",
+        lambda _path: iter([{"brand": "Topps", "model": "A"}, {"brand": "Panini", "model": "B"}]),
+    )
+    monkeypatch.setattr(app_module, "search_ebay", lambda query, limit=8: [{"title": query, "price": 12.0}])
+    monkeypatch.setattr(app_module, "build_listing_payload", lambda **kwargs: {"title": kwargs["title"]})
+    ids = iter([7, 8])
+    monkeypatch.setattr(app_module, "save_listing", lambda **kwargs: next(ids))
+
+    result = app_module.process_listing("lot.jpg", "lot.jpg")
+
+    assert result["success"] is True
+    assert result["count"] == 2
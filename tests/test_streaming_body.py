@@ -0,0 +1,165 @@
+"""
+Tests for src/api/streaming_body.py and the streamed vision request path.
+"""
+import base64
+import json
+import random
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+import requests
+
+import src.api.openai_client as openai_client
+from src.api import http_session
+from src.api.streaming_body import IMAGE_PLACEHOLDER, Base64JSONBody
+
+ANALYSIS = '{"brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards", "condition": "Good"}'
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Peak RSS growth (MiB) of one real-mode describe_image call on argv[1]; the
+# fake post consumes the body the way requests would
+_DESCRIBE_PEAK_SCRIPT = """
+import json, sys
+import src.api.openai_client as openai_client
+from src.api import http_session
+
+class Response:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": sys.argv[2]}}]}
+
+def post(url, headers, timeout=None, json=None, data=None):
+    if data is None:
+        globals()["json"].dumps(json).encode()
+    else:
+        for _chunk in data:
+            pass
+    return Response()
+
+def high_water_kib():
+    # VmHWM starts afresh at exec; ru_maxrss would carry over the parent's peak
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+
+http_session.post = post
+before = high_water_kib()
+openai_client.describe_image(sys.argv[1], use_cache=False)
+print((high_water_kib() - before) / 1024)
+"""
+
+
+def _payload(url):
+    return {"model": "m", "messages": [{"content": [{"image_url": {"url": url}}]}], "stream": True}
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 1000, 3 * 64 * 1024 + 1])
+def test_body_matches_json_serialization(size):
+    image = random.Random(size).randbytes(size)
+    body = Base64JSONBody(_payload("data:image/jpeg;base64," + IMAGE_PLACEHOLDER), image)
+
+    data = b"".join(body)
+
+    expected = _payload("data:image/jpeg;base64," + base64.b64encode(image).decode())
+    assert json.loads(data) == expected
+    assert len(body) == len(data)
+    assert b"".join(body) == data  # re-iterable for retries
+
+
+def test_body_requires_single_placeholder():
+    with pytest.raises(ValueError):
+        Base64JSONBody(_payload("no placeholder"), b"x")
+
+
+def test_requests_sends_content_length_not_chunked():
+    body = Base64JSONBody(_payload(IMAGE_PLACEHOLDER), b"abcdef")
+
+    prepared = requests.Request("POST", "https://example.invalid", data=body).prepare()
+
+    assert prepared.headers["Content-Length"] == str(len(body))
+    assert "Transfer-Encoding" not in prepared.headers
+
+
+def test_streamed_body_peak_memory_is_a_fraction_of_json(tmp_path):
+    path = tmp_path / "big.jpg"
+    path.write_bytes(random.Random(0).randbytes(8 * 1024 * 1024))
+
+    def peak(fn):
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def in_memory():
+        img_bytes = path.read_bytes()
+        json.dumps(openai_client._build_payload(img_bytes, "image/jpeg")).encode()
+
+    def streamed():
+        with openai_client._map_image(str(path)) as image:
+            for _chunk in openai_client._request_body(image, "image/jpeg")["data"]:
+                pass
+
+    assert peak(streamed) * 20 < peak(in_memory)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="reads the peak RSS from /proc")
+def test_describe_image_peak_memory_on_a_phone_photo(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    photo = tmp_path / "phone.jpg"
+    Image.effect_noise((4032, 3024), 40).convert("RGB").save(photo, quality=90)
+    full_decode_mib = 4032 * 3024 * 4 / 2**20     # Pillow keeps RGB as 4 bytes per pixel
+
+    def peak(**env):
+        run = subprocess.run(
+            [sys.executable, "-c", _DESCRIBE_PEAK_SCRIPT, str(photo), ANALYSIS],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=60,
+            env={
+                "PATH": "", "CARDS4SALE_DATA_DIR": str(tmp_path),
+                "USE_OPENAI_MOCK": "False", "OPENAI_API_KEY": "fake-test-key", **env,
+            },
+        )
+        assert run.returncode == 0, run.stderr
+        return float(run.stdout.split()[-1])
+
+    # Default config: the photo is hashed and shrunk from reduced-scale JPEG
+    # decodes, never held at full resolution; the small upload goes as json=
+    assert peak() < full_decode_mib
+    # Uploading originals: the streamed body avoids the base64 + JSON copies
+    streamed = peak(IMAGE_PREPROCESS_ENABLED="False")
+    in_memory = peak(IMAGE_PREPROCESS_ENABLED="False", STREAMING_BODY_MIN_BYTES=str(2**40))
+    assert streamed * 2 < in_memory
+
+
+def test_describe_image_streams_large_uploads(monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    monkeypatch.setattr(openai_client, "STREAMING_BODY_MIN_BYTES", 1024)
+    image = random.Random(5).randbytes(4096)
+    img_path = tmp_path / "big.jpg"
+    img_path.write_bytes(image)
+    captured = {}
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"choices": [{"message": {"content": ANALYSIS}}]}
+
+    def fake_post(url, headers, timeout=None, json=None, data=None):
+        captured["json"], captured["body"] = json, b"".join(data)
+        return FakeResponse()
+
+    monkeypatch.setattr(http_session, "post", fake_post)
+
+    assert openai_client.describe_image(str(img_path)) == json.loads(ANALYSIS)
+    assert captured["json"] is None
+    sent = json.loads(captured["body"])
+    image_url = sent["messages"][0]["content"][1]["image_url"]["url"]
+    assert image_url == "data:image/jpeg;base64," + base64.b64encode(image).decode()
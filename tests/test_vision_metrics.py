@@ -0,0 +1,168 @@
+"""
+Tests for src/api/vision_metrics.py — per-call OpenAI accounting.
+"""
+import json
+
+import pytest
+
+import src.api.openai_client as openai_client
+import src.config as config
+import src.database as db
+from src.api import http_session, vision_metrics
+
+ANALYSIS = {"brand": "Topps", "model": "Chrome", "category": "Sports Trading Cards", "condition": "Good"}
+USAGE = {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200}
+
+
+class FakeResponse:
+    def __init__(self, content, usage=USAGE):
+        self._body = {"choices": [{"message": {"content": content}}], "usage": usage}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture
+def real_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "USE_OPENAI_MOCK", False)
+    monkeypatch.setattr(openai_client, "OPENAI_API_KEY", "fake-test-key")
+    monkeypatch.setattr(openai_client, "IMAGE_PREPROCESS_ENABLED", False)
+    img_path = tmp_path / "card.jpg"
+    img_path.write_bytes(b"FAKE_JPEG_DATA")
+    return str(img_path)
+
+
+def test_cost_uses_configured_prices_and_batch_discount(monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_INPUT_PRICE_PER_MTOK", 2.0)
+    monkeypatch.setattr(config, "OPENAI_OUTPUT_PRICE_PER_MTOK", 10.0)
+
+    assert vision_metrics.cost(1_000_000, 100_000) == pytest.approx(3.0)
+    assert vision_metrics.cost(1_000_000, 100_000, batch=True) == pytest.approx(1.5)
+
+
+def test_vision_call_then_cache_hit_are_recorded(real_mode, monkeypatch):
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeResponse(json.dumps(ANALYSIS)))
+
+    openai_client.describe_image(real_mode)
+    openai_client.describe_image(real_mode)
+
+    totals = vision_metrics.rollup()["totals"]
+    assert totals["calls"] == 2
+    assert totals["cache_hits"] == 1 and totals["near_hits"] == 0
+    assert totals["cache_hit_rate"] == 0.5
+    assert totals["prompt_tokens"] == 1000 and totals["completion_tokens"] == 200
+    assert totals["image_bytes"] == len(b"FAKE_JPEG_DATA")
+    assert totals["cost_usd"] == pytest.approx(vision_metrics.cost(1000, 200))
+
+
+def test_near_duplicate_hits_are_counted_apart():
+    vision_metrics.record_cache_hit("vision", "gpt-test")
+    vision_metrics.record_cache_hit("vision", "gpt-test", near=True)
+
+    totals = vision_metrics.rollup()["totals"]
+    assert totals["cache_hits"] == 2 and totals["near_hits"] == 1
+
+
+def test_retries_and_failures_are_counted(real_mode, monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0.0)
+    outcomes = [ConnectionError("reset"), FakeResponse(json.dumps(ANALYSIS))]
+
+    def flaky(*args, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(http_session, "post", flaky)
+    openai_client.describe_image(real_mode, use_cache=False)
+
+    def down(*args, **kwargs):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(http_session, "post", down)
+    openai_client.describe_image(real_mode, use_cache=False)
+
+    (row,) = vision_metrics.rollup()["by_kind"]
+    assert row["key"] == "vision"
+    assert row["calls"] == 2 and row["errors"] == 1
+    assert row["retries"] == 1 + 2
+    with db.get_db_connection() as conn:
+        caches = [r[0] for r in conn.execute("SELECT cache FROM vision_calls ORDER BY id")]
+    assert caches == ["bypass", "bypass"]
+
+
+def test_repair_calls_are_a_separate_kind(real_mode, monkeypatch):
+    replies = ["not json", json.dumps(ANALYSIS)]
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeResponse(replies.pop(0)))
+
+    openai_client.describe_image(real_mode)
+
+    kinds = {row["key"]: row["calls"] for row in vision_metrics.rollup()["by_kind"]}
+    assert kinds == {"repair": 1, "vision": 1}
+
+
+def test_streamed_call_records_final_usage_chunk(real_mode, monkeypatch):
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": json.dumps(ANALYSIS)}}]}),
+        "data: " + json.dumps({"choices": [], "usage": USAGE}),
+        "data: [DONE]",
+    ]
+    sent = {}
+
+    class FakeStream:
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self, decode_unicode=False):
+            return iter(lines)
+
+        def close(self):
+            pass
+
+    def fake_post(url, **kwargs):
+        sent.update(kwargs["json"])
+        return FakeStream()
+
+    monkeypatch.setattr(http_session, "post", fake_post)
+    list(openai_client.describe_image_stream(real_mode))
+
+    assert sent["stream_options"] == {"include_usage": True}
+    (row,) = vision_metrics.rollup()["by_kind"]
+    assert row["key"] == "stream" and row["prompt_tokens"] == 1000
+
+
+def test_metrics_can_be_disabled(real_mode, monkeypatch):
+    monkeypatch.setattr(config, "VISION_METRICS_ENABLED", False)
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeResponse(json.dumps(ANALYSIS)))
+
+    openai_client.describe_image(real_mode)
+
+    assert vision_metrics.rollup()["totals"]["calls"] == 0
+
+
+def test_old_records_are_pruned(monkeypatch):
+    db.record_vision_call({"kind": "vision", "success": True})
+    with db.get_db_connection() as conn:
+        conn.execute("UPDATE vision_calls SET created_at = created_at - 10 * 86400")
+
+    db.record_vision_call({"kind": "vision", "success": True}, retention_seconds=86400)
+
+    assert vision_metrics.rollup()["totals"]["calls"] == 1
+
+
+def test_vision_metrics_endpoint(real_mode, monkeypatch):
+    from src.app import create_app
+
+    monkeypatch.setattr(http_session, "post", lambda *a, **k: FakeResponse(json.dumps(ANALYSIS)))
+    openai_client.describe_image(real_mode)
+    client = create_app().test_client()
+
+    body = client.get("/api/metrics/vision?hours=1").get_json()
+
+    assert body["totals"]["calls"] == 1
+    assert body["by_model"][0]["key"] == openai_client.OPENAI_MODEL
+    assert len(body["by_day"]) == 1
+    assert client.get("/api/metrics/vision?hours=0").status_code == 400
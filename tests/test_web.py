@@ -303,3 +303,160 @@ def test_get_listings_returns_list_sorted_newest_first(client):
     assert response.status_code == 200
     titles = [l['title'] for l in data]
     assert titles[0] == 'Second'  # newest first
+
+
+# ---------------------------------------------------------------------------
+# Asynchronous uploads / job polling
+# ---------------------------------------------------------------------------
+
+def test_upload_async_returns_202_and_job_completes(client, monkeypatch):
+    """?async=true should queue the upload and expose the result via /api/jobs/<id>."""
+    seen = {}
+
+    def fake_process_listing(path, filename, topic=None):
+        import os
+        seen['existed'] = os.path.exists(path)
+        seen['path'] = path
+        return {'success': True, 'listings': [], 'count': 0, 'message': 'ok'}
+
+    monkeypatch.setattr('src.app.process_listing', fake_process_listing)
+    data = {'photo': (io.BytesIO(b'fake image data'), 'test.jpg')}
+    response = client.post('/api/upload?async=true', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['state'] == 'queued'
+    assert response.headers['Location'] == body['status_url']
+
+    job = client.get(f"{body['status_url']}?wait=5").get_json()
+    assert job['state'] == 'succeeded'
+    assert job['result']['success'] is True
+    assert job['label'] == 'test.jpg'
+
+    import os
+    assert seen['existed'] is True
+    assert not os.path.exists(seen['path'])  # temp file cleaned up by the worker
+
+
+def test_upload_async_job_failure_is_reported(client, monkeypatch):
+    def explode(path, filename, topic=None):
+        raise RuntimeError('pipeline exploded')
+
+    monkeypatch.setattr('src.app.process_listing', explode)
+    data = {'photo': (io.BytesIO(b'fake image data'), 'test.jpg'), 'async': '1'}
+    response = client.post('/api/upload', data=data, content_type='multipart/form-data')
+    assert response.status_code == 202
+
+    job = client.get(f"/api/jobs/{response.get_json()['job_id']}?wait=5").get_json()
+    assert job['state'] == 'failed'
+    assert job['error'] == 'Processing failed. Please try again.'
+
+
+def test_get_unknown_job_returns_404(client):
+    response = client.get('/api/jobs/does-not-exist')
+    assert response.status_code == 404
+
+
+def test_list_jobs_returns_list(client):
+    response = client.get('/api/jobs')
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list)
+
+
+# ---------------------------------------------------------------------------
+# Batch uploads
+# ---------------------------------------------------------------------------
+
+def test_upload_batch_processes_each_photo_in_order(client, monkeypatch):
+    monkeypatch.setattr('src.app.process_listing', lambda path, filename, topic=None: {
+        'success': True, 'listings': [{'listing_id': 1}], 'count': 1, 'message': filename,
+    })
+    data = {'photos': [
+        (io.BytesIO(b'one'), 'a.jpg'),
+        (io.BytesIO(b'two'), 'b.png'),
+        (io.BytesIO(b'bad'), 'c.exe'),
+    ]}
+    response = client.post('/api/upload/batch', data=data, content_type='multipart/form-data')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r['filename'] for r in body['results']] == ['a.jpg', 'b.png', 'c.exe']
+    assert body['succeeded'] == 2
+    assert body['failed'] == 1
+    assert body['results'][2]['success'] is False
+    assert 'Unsupported file type' in body['results'][2]['error']
+
+
+def test_upload_batch_without_photos_returns_400(client):
+    response = client.post('/api/upload/batch', data={}, content_type='multipart/form-data')
+    assert response.status_code == 400
+
+
+def test_upload_batch_pipeline_exception_is_per_file(client, monkeypatch):
+    def flaky(path, filename, topic=None):
+        if filename == 'bad.jpg':
+            raise RuntimeError('boom')
+        return {'success': True, 'listings': [], 'count': 0}
+
+    monkeypatch.setattr('src.app.process_listing', flaky)
+    data = {'photos': [(io.BytesIO(b'1'), 'good.jpg'), (io.BytesIO(b'2'), 'bad.jpg')]}
+    body = client.post('/api/upload/batch', data=data, content_type='multipart/form-data').get_json()
+    assert body['results'][0]['success'] is True
+    assert body['results'][1]['success'] is False
+
+
+def test_upload_batch_async_runs_as_job(client, monkeypatch):
+    monkeypatch.setattr('src.app.process_listing', lambda path, filename, topic=None: {
+        'success': True, 'listings': [], 'count': 0,
+    })
+    data = {'photos': [(io.BytesIO(b'1'), 'a.jpg'), (io.BytesIO(b'2'), 'b.jpg')]}
+    response = client.post('/api/upload/batch?async=1', data=data, content_type='multipart/form-data')
+    assert response.status_code == 202
+
+    job = client.get(f"{response.get_json()['status_url']}?wait=5").get_json()
+    assert job['state'] == 'succeeded'
+    assert job['result']['total'] == 2
+
+
+def test_job_events_stream_reports_pipeline_stages(client, monkeypatch):
+    """The SSE stream should relay per-stage events and end with the job state."""
+    monkeypatch.setattr('src.app.describe_image', lambda _p: {
+        'brand': 'Topps', 'model': 'Card', 'category': 'Sports Trading Cards', 'condition': 'Good',
+    })
+    monkeypatch.setattr('src.app.search_ebay', lambda _q, limit=8: [{'title': 'x', 'price': 10.0, 'url': 'u'}])
+    monkeypatch.setattr('src.app.save_listing', lambda **kwargs: 42)
+
+    data = {'photo': (io.BytesIO(b'fake image data'), 'card.jpg')}
+    response = client.post('/api/upload?async=true', data=data, content_type='multipart/form-data')
+    job_id = response.get_json()['job_id']
+
+    stream = client.get(f'/api/jobs/{job_id}/events')
+    assert stream.status_code == 200
+    assert stream.mimetype == 'text/event-stream'
+    body = stream.get_data(as_text=True)
+
+    events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+    for stage in ('analyzed', 'comps_fetched', 'priced', 'saved', 'completed'):
+        assert stage in events
+    assert events[-1] == 'job'
+    assert '"state": "succeeded"' in body
+
+
+def test_job_events_stream_of_a_finished_job_closes_at_once(client, monkeypatch):
+    """A finished job's stream ends with its state even when its event history is gone."""
+    from src.services.events import event_bus
+
+    monkeypatch.setattr('src.app.process_listing', lambda path, filename, topic=None: {'success': True})
+    data = {'photo': (io.BytesIO(b'fake image data'), 'card.jpg')}
+    job_id = client.post('/api/upload?async=true', data=data, content_type='multipart/form-data').get_json()['job_id']
+    client.get(f'/api/jobs/{job_id}?wait=5')
+    event_bus.release(job_id)
+
+    body = client.get(f'/api/jobs/{job_id}/events').get_data(as_text=True)
+
+    assert body.count('event: ') == 1
+    assert 'event: job' in body and '"state": "succeeded"' in body
+
+
+def test_job_events_unknown_job_returns_404(client):
+    response = client.get('/api/jobs/nope/events')
+    assert response.status_code == 404